@@ -0,0 +1,83 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from datetime import datetime, timezone
+from typing import List, Optional
+import logging
+import os
+from api.news_routes import breaking_store, rss_service, to_news_article
+from api.lebanon_routes import headlines_store, lebanon_service
+from services.article_timeline import ArticleFilters, ArticleTimeline, InvalidCursor, decode_cursor, encode_cursor
+from services.http_cache import RenderedBody, cache_control, cached_response
+from services.serialization import dumps
+from models.news import NewsPage
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/news", tags=["news"])
+
+# كل المقالات المجلوبة مرتبة زمنياً، تُستخدم عندما لا تتوفر MongoDB
+article_timeline = ArticleTimeline(max_articles=int(os.environ.get('ARTICLE_TIMELINE_MAX_ARTICLES', 50000)))
+breaking_store.add_listener(lambda source_name, articles: article_timeline.add_articles(articles))
+headlines_store.add_listener(lambda source_name, articles: article_timeline.add_articles(articles))
+
+ARTICLES_CACHE_CONTROL = cache_control(
+    max_age=int(os.environ.get('ARTICLES_HTTP_MAX_AGE', 30)),
+    stale_while_revalidate=int(os.environ.get('ARTICLES_HTTP_STALE_WHILE_REVALIDATE', 60))
+)
+
+def _source_name(key: str) -> str:
+    """اسم المصدر من اسمه أو معرفه المختصر في أي من المجموعتين"""
+    source = rss_service.sources.get(key) or lebanon_service.newspapers.get(key)
+    return source["name"] if source else key
+
+def _as_stored(moment: Optional[datetime]) -> Optional[datetime]:
+    """التواريخ مخزنة بدون منطقة زمنية (UTC)"""
+    if moment is not None and moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+@router.get("", response_model=NewsPage)
+async def list_articles(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    source: Optional[List[str]] = Query(None),
+    category: Optional[str] = None,
+    is_breaking: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """كل المقالات (الأحدث أولاً) مقسمة إلى صفحات بمؤشر على (published_at, id)
+
+    المرشحات: source (يتكرر، بالاسم أو المعرف المختصر)، category، is_breaking، since و until
+    (على تاريخ النشر). الصفحة التالية تُطلب بـ cursor=next_cursor مع نفس المرشحات.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="مؤشر الصفحة غير صالح")
+
+    try:
+        filters = ArticleFilters(
+            sources=tuple(_source_name(key) for key in source) if source else None,
+            category=category if category != "الكل" else None,
+            is_breaking=is_breaking,
+            since=_as_stored(since),
+            until=_as_stored(until)
+        )
+        article_store = getattr(request.app.state, "article_store", None)
+        if article_store is not None:
+            articles, has_more = await article_store.page_articles(filters, after, limit)
+        else:
+            articles, has_more = article_timeline.page(filters, after, limit)
+
+        news_articles = [to_news_article(article) for article in articles]
+        body = RenderedBody(dumps(NewsPage(
+            articles=news_articles,
+            count=len(news_articles),
+            next_cursor=encode_cursor(articles[-1]) if has_more else None,
+            has_more=has_more
+        )))
+        return cached_response(request, body, ARTICLES_CACHE_CONTROL)
+
+    except Exception as e:
+        logger.error(f"Error listing articles: {str(e)}")
+        raise HTTPException(status_code=500, detail="خطأ في جلب المقالات")
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query, Request
 from datetime import datetime
 from typing import Dict, List, Optional
 import logging
-from services.lebanon_news_service import LebanonNewsService
-from models.news import NewsArticle
+import os
+from services.lebanon_news_service import LebanonNewsService, headlines_failure
+from services.article_store import ArticleStore
+from services.article_record import from_timestamp, merge_newest_first, published_ts
+from services.feed_scheduler import FeedScheduler
+from services.feed_store import FeedStore
+from services.metrics import ROUTE_STAGE_SECONDS
+from services.http_cache import RenderedBody, cache_control, cached_response
+from services.serialization import dumps
+from services.snapshot_cache import Snapshot, SnapshotCache
+from services.story_clusters import story_clusterer
+from models.news import NewsArticle, NewsStory
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/lebanon", tags=["lebanon"])
@@ -11,30 +21,170 @@ router = APIRouter(prefix="/lebanon", tags=["lebanon"])
 # خدمة الأخبار اللبنانية
 lebanon_service = LebanonNewsService()
 
-@router.get("/headlines")
-async def get_lebanon_headlines():
-    """جلب أبرز العناوين السياسية من الصحف اللبنانية"""
-    try:
-        headlines_data = await lebanon_service.fetch_all_lebanon_headlines()
-        
-        # تنظيم البيانات بتنسيق مناسب للعرض
-        organized_data = {}
-        total_count = 0
-        
+# آخر عناوين كل صحيفة، تحدّثها الجدولة في الخلفية
+headlines_store = FeedStore()
+
+def _newspaper_names() -> List[str]:
+    return lebanon_service.newspapers.names()
+
+# أقصى مدة ينتظرها الطلب للصحف قبل الرد بما توفر
+LEBANON_FETCH_DEADLINE = float(os.environ.get('LEBANON_FETCH_DEADLINE', 5))
+
+def _build_headlines() -> dict:
+    names = _newspaper_names()
+    with ROUTE_STAGE_SECONDS.time(endpoint="headlines", stage="organize"):
+        headlines = lebanon_service.organize_headlines(headlines_store.articles_by_source(names))
+    return {
+        "headlines": headlines,
+        "sources_status": {name: headlines_scheduler.source_status(name) for name in names}
+    }
+
+async def load_headlines() -> dict:
+    """بناء لقطة العناوين بعد جلب الصحف المستحقة (ضمن المهلة) فقط"""
+    await headlines_scheduler.poll_due(deadline=LEBANON_FETCH_DEADLINE)
+    return _build_headlines()
+
+def on_newspaper_updated(newspaper_name: str):
+    """تحديث اللقطة فور وصول عناوين جديدة من إحدى الصحف"""
+    if headlines_cache.snapshot is not None:
+        headlines_cache.put(_build_headlines())
+
+headlines_scheduler = FeedScheduler(
+    "Lebanon headlines",
+    lebanon_service.newspapers,
+    lebanon_service.fetch_newspaper_headlines,
+    headlines_store,
+    on_update=on_newspaper_updated,
+    interval=float(os.environ.get('LEBANON_POLL_INTERVAL', 300)),
+    failed=headlines_failure
+)
+
+def on_newspapers_changed(added: List[str], removed: List[str], changed: List[str]):
+    """بعد إعادة تحميل المصادر: إعادة معالجة الصحف المعدلة وإخراج المحذوفة من اللقطة"""
+    for name in removed + changed:
+        lebanon_service.seen_entries.forget(name)
+    if headlines_cache.snapshot is not None and (added or removed):
+        headlines_cache.put(_build_headlines())
+
+lebanon_service.newspapers.add_listener(on_newspapers_changed)
+
+# لقطة مشتركة لعناوين الصحف حتى لا تُجلب كل الصحف مع كل طلب
+headlines_cache = SnapshotCache(
+    load_headlines,
+    ttl=float(os.environ.get('LEBANON_CACHE_TTL', 300)),
+    stale_ttl=float(os.environ.get('LEBANON_CACHE_STALE_TTL', 900)),
+    name="Lebanon headlines"
+)
+
+# تخزين الاستجابات لدى المتصفح أو CDN (بالثواني)
+HEADLINES_CACHE_CONTROL = cache_control(
+    max_age=int(os.environ.get('LEBANON_HTTP_MAX_AGE', 120)),
+    stale_while_revalidate=int(os.environ.get('LEBANON_HTTP_STALE_WHILE_REVALIDATE', 600))
+)
+NEWSPAPER_CACHE_CONTROL = cache_control(
+    max_age=int(os.environ.get('NEWSPAPER_HTTP_MAX_AGE', 60)),
+    stale_while_revalidate=int(os.environ.get('NEWSPAPER_HTTP_STALE_WHILE_REVALIDATE', 300))
+)
+NEWSPAPERS_LIST_CACHE_CONTROL = cache_control(max_age=300, stale_while_revalidate=3600)
+
+async def restore_from_database(article_store: ArticleStore, from_snapshot_file: bool = False):
+    """تعبئة المخزن واللقطة من آخر العناوين المحفوظة حتى تُخدم الطلبات الأولى دون انتظار الصحف
+
+    from_snapshot_file: المخزن واللقطة استُعيدا من لقطة القرص (أحدث من القاعدة عادة)، فلا تُستبدلان.
+    """
+    if from_snapshot_file:
+        return
+    saved = await article_store.latest_by_source(_newspaper_names(), limit=15)
+    for newspaper_name, headlines in saved.items():
+        headlines_store.seed(newspaper_name, headlines)
+    if any(saved.values()):
+        saved_at = await article_store.last_saved_at(
+            headline['id'] for headlines in saved.values() for headline in headlines
+        )
+        headlines_cache.put(_build_headlines(), fetched_at=saved_at)
+        logger.info(f"Restored Lebanon headlines snapshot from {sum(map(len, saved.values()))} saved headlines")
+
+def export_state() -> dict:
+    """حالة عناوين الصحف لحفظها في لقطة القرص (انظر snapshot_file)"""
+    return {
+        "sources": headlines_store.export(),
+        "schedule": headlines_scheduler.export_schedule(),
+        "validators": lebanon_service.conditional_get.export(),
+        "seen_entries": lebanon_service.seen_entries.export(),
+    }
+
+def restore_state(state: dict, elapsed: float):
+    """استعادة حالة محفوظة قبل elapsed ثانية وبناء اللقطة منها قبل أول طلب"""
+    names = set(_newspaper_names())
+    for newspaper_name, exported in state["sources"].items():
+        if newspaper_name in names:
+            headlines_store.apply(newspaper_name, exported, elapsed)
+    headlines_scheduler.apply_schedule(
+        {name: remaining for name, remaining in state["schedule"].items() if name in names}, elapsed
+    )
+    lebanon_service.conditional_get.restore(state["validators"])
+    lebanon_service.seen_entries.restore(state["seen_entries"])
+    if any(headlines_store.articles_by_source(names).values()):
+        headlines_cache.put(_build_headlines(), fetched_at=headlines_store.last_success(names))
+
+def to_headline_article(headline_data: dict) -> NewsArticle:
+    """تحويل قاموس العنوان إلى نموذج NewsArticle"""
+    return NewsArticle(
+        id=headline_data['id'],
+        title=headline_data['title'],
+        description=headline_data['description'],
+        source=headline_data['source'],
+        published_at=headline_data['published_at'],
+        category=headline_data['category'],
+        is_breaking=False,  # العناوين العادية ليست عاجلة
+        url=headline_data.get('url'),
+        image_url=headline_data.get('image_url'),
+        created_at=headline_data.get('created_at') or from_timestamp(published_ts(headline_data))
+    )
+
+def _headline_stories(headlines_data: Dict[str, List[dict]]) -> List[NewsStory]:
+    """تجميع عناوين الصحف المختلفة عن نفس الخبر في قصص (الأحدث أولاً)"""
+    headlines = [
+        headline for headline in merge_newest_first(headlines_data.values())
+        if not headline.get('is_placeholder')
+    ]
+    return [
+        NewsStory(
+            id=story['id'],
+            article=to_headline_article(story['article']),
+            articles=[to_headline_article(headline) for headline in story['articles']],
+            sources=story['sources'],
+            count=len(story['articles'])
+        )
+        for story in story_clusterer.cluster(headlines)
+    ]
+
+def render_headlines(snapshot: Snapshot, group: Optional[str] = None) -> bytes:
+    """جسم استجابة /headlines: تُبنى نماذج العناوين وتُسلسل مرة واحدة لكل لقطة وليس مع كل طلب"""
+    headlines_data = snapshot.value["headlines"]
+    
+    if group == "stories":
+        with ROUTE_STAGE_SECONDS.time(endpoint="headlines", stage="cluster"):
+            stories = _headline_stories(headlines_data)
+        with ROUTE_STAGE_SECONDS.time(endpoint="headlines", stage="serialize"):
+            return dumps({
+                "stories": stories,
+                "total_stories": len(stories),
+                "total_headlines": sum(story.count for story in stories),
+                "last_updated": snapshot.fetched_at,
+                "sources_status": snapshot.value["sources_status"],
+                "country": "لبنان"
+            })
+    
+    # تنظيم البيانات بتنسيق مناسب للعرض
+    organized_data = {}
+    total_count = 0
+    
+    with ROUTE_STAGE_SECONDS.time(endpoint="headlines", stage="models"):
         for newspaper_name, headlines in headlines_data.items():
             news_articles = []
             for headline_data in headlines:
-                article = NewsArticle(
-                    title=headline_data['title'],
-                    description=headline_data['description'],
-                    source=headline_data['source'],
-                    published_at=headline_data['published_at'],
-                    category=headline_data['category'],
-                    is_breaking=False,  # العناوين العادية ليست عاجلة
-                    url=headline_data.get('url'),
-                    image_url=headline_data.get('image_url')
-                )
-                news_articles.append(article)
+                news_articles.append(to_headline_article(headline_data))
             
             organized_data[newspaper_name] = {
                 "headlines": news_articles,
@@ -42,96 +192,105 @@ async def get_lebanon_headlines():
                 "website": headlines[0]["website"] if headlines else ""
             }
             total_count += len(news_articles)
-        
-        return {
+    
+    with ROUTE_STAGE_SECONDS.time(endpoint="headlines", stage="serialize"):
+        return dumps({
             "newspapers": organized_data,
             "total_newspapers": len(organized_data),
             "total_headlines": total_count,
-            "last_updated": datetime.now(),
+            "last_updated": snapshot.fetched_at,
+            "sources_status": snapshot.value["sources_status"],
             "country": "لبنان"
-        }
+        })
+
+@router.get("/headlines")
+async def get_lebanon_headlines(request: Request, group: Optional[str] = Query(None, pattern="^stories$")):
+    """جلب أبرز العناوين السياسية من الصحف اللبنانية (مع group=stories تُجمع العناوين المتشابهة من الصحف المختلفة)"""
+    try:
+        snapshot = await headlines_cache.get()
+        body = snapshot.rendered(
+            group or "newspapers", lambda snapshot: RenderedBody(render_headlines(snapshot, group))
+        )
+        return cached_response(request, body, HEADLINES_CACHE_CONTROL, last_modified=snapshot.fetched_at)
     
     except Exception as e:
         logger.error(f"Error fetching Lebanon headlines: {str(e)}")
         raise HTTPException(status_code=500, detail="خطأ في جلب عناوين الصحف اللبنانية")
 
 @router.get("/newspapers")
-async def get_lebanon_newspapers_list():
+async def get_lebanon_newspapers_list(request: Request):
     """قائمة بأسماء الصحف اللبنانية المتاحة"""
     try:
         newspapers_info = []
         for newspaper in lebanon_service.lebanon_newspapers:
             newspapers_info.append({
                 "name": newspaper["name"],
+                "slug": newspaper["slug"],
                 "website": newspaper["website"],
                 "category": newspaper["category"]
             })
         
-        return {
+        body = RenderedBody(dumps({
             "newspapers": newspapers_info,
             "count": len(newspapers_info),
             "country": "لبنان"
-        }
+        }))
+        return cached_response(request, body, NEWSPAPERS_LIST_CACHE_CONTROL)
     
     except Exception as e:
         logger.error(f"Error fetching newspapers list: {str(e)}")
         raise HTTPException(status_code=500, detail="خطأ في جلب قائمة الصحف")
 
 @router.post("/refresh")
-async def refresh_lebanon_headlines(background_tasks: BackgroundTasks):
-    """تحديث عناوين الصحف اللبنانية"""
+async def refresh_lebanon_headlines(newspaper: Optional[str] = None):
+    """تحديث عناوين الصحف اللبنانية (نقل الصحيفة أو كل الصحف إلى مقدمة طابور الجلب)"""
     try:
-        # تحديث في الخلفية لعدم إبطاء الاستجابة
-        background_tasks.add_task(lebanon_service.fetch_all_lebanon_headlines)
+        if not headlines_scheduler.bump(newspaper):
+            raise HTTPException(status_code=404, detail="الصحيفة غير موجودة")
         
         return {
             "success": True,
             "message": "تم بدء تحديث عناوين الصحف اللبنانية",
+            "newspaper": newspaper,
             "timestamp": datetime.now()
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error refreshing Lebanon headlines: {str(e)}")
         raise HTTPException(status_code=500, detail="خطأ في تحديث العناوين")
 
 @router.get("/newspaper/{newspaper_name}")
-async def get_specific_newspaper_headlines(newspaper_name: str):
-    """جلب عناوين صحيفة محددة"""
+async def get_specific_newspaper_headlines(request: Request, newspaper_name: str):
+    """جلب عناوين صحيفة محددة (بالاسم أو المعرف المختصر)"""
     try:
-        # البحث عن الصحيفة في القائمة
-        newspaper_info = None
-        for newspaper in lebanon_service.lebanon_newspapers:
-            if newspaper["name"] == newspaper_name:
-                newspaper_info = newspaper
-                break
-        
+        newspaper_info = lebanon_service.newspapers.get(newspaper_name)
         if not newspaper_info:
             raise HTTPException(status_code=404, detail="الصحيفة غير موجودة")
+        newspaper_name = newspaper_info["name"]
         
-        headlines = await lebanon_service.fetch_newspaper_headlines(newspaper_info)
+        # جلب الصحيفة إن كانت مستحقة ضمن المهلة، ثم الرد بآخر نتيجة معروفة
+        await headlines_scheduler.poll_due([newspaper_name], deadline=LEBANON_FETCH_DEADLINE)
+        headlines = headlines_store.articles_by_source([newspaper_name])[newspaper_name]
         
-        news_articles = []
-        for headline_data in headlines:
-            article = NewsArticle(
-                title=headline_data['title'],
-                description=headline_data['description'],
-                source=headline_data['source'],
-                published_at=headline_data['published_at'],
-                category=headline_data['category'],
-                is_breaking=False,
-                url=headline_data.get('url'),
-                image_url=headline_data.get('image_url')
-            )
-            news_articles.append(article)
+        news_articles = [to_headline_article(headline_data) for headline_data in headlines]
+        # وقت آخر جلب ناجح (وليس وقت الطلب) حتى يبقى الجسم و ETag ثابتين بين الجلبات
+        state = headlines_store.get(newspaper_name)
+        last_updated = state.last_success if state is not None and state.last_success else None
         
-        return {
+        body = RenderedBody(dumps({
             "newspaper": newspaper_name,
             "headlines": news_articles,
             "count": len(news_articles),
             "website": newspaper_info["website"],
-            "last_updated": datetime.now()
-        }
+            "status": headlines_scheduler.source_status(newspaper_name),
+            "last_updated": last_updated or datetime.now()
+        }))
+        return cached_response(request, body, NEWSPAPER_CACHE_CONTROL, last_modified=last_updated)
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching headlines for {newspaper_name}: {str(e)}")
         raise HTTPException(status_code=500, detail="خطأ في جلب عناوين الصحيفة")
\ No newline at end of file
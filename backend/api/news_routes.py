@@ -1,10 +1,22 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 from typing import List, Optional
 import logging
-from services.rss_service import RSSService
-from models.news import NewsArticle, BreakingNewsResponse
-from motor.motor_asyncio import AsyncIOMotorDatabase
+import os
+from services.rss_service import RSSService, feed_failure
+from services.article_store import ArticleStore
+from services.article_record import from_timestamp, published_ts
+from services.feed_scheduler import FeedScheduler
+from services.feed_store import FeedStore
+from services.news_hub import NewsHub
+from services.search_index import SearchIndex
+from services.metrics import ROUTE_STAGE_SECONDS
+from services.http_cache import RenderedBody, cache_control, cached_response
+from services.serialization import dumps
+from services.snapshot_cache import Snapshot, SnapshotCache
+from services.story_clusters import story_clusterer
+from models.news import NewsArticle, NewsStory, BreakingNewsResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/news", tags=["news"])
@@ -12,94 +24,311 @@ router = APIRouter(prefix="/news", tags=["news"])
 # خدمة RSS عامة
 rss_service = RSSService()
 
+def to_news_story(story: dict) -> NewsStory:
+    """تحويل قصة من StoryClusterer إلى نموذج NewsStory"""
+    return NewsStory(
+        id=story['id'],
+        article=to_news_article(story['article']),
+        articles=[to_news_article(article) for article in story['articles']],
+        sources=story['sources'],
+        count=len(story['articles'])
+    )
+
+def to_news_article(article_data: dict) -> NewsArticle:
+    """تحويل قاموس المقال إلى نموذج NewsArticle"""
+    return NewsArticle(
+        id=article_data['id'],
+        title=article_data['title'],
+        description=article_data['description'],
+        source=article_data['source'],
+        published_at=article_data['published_at'],
+        category=article_data['category'],
+        is_breaking=article_data.get('is_breaking', False),
+        url=article_data.get('url'),
+        image_url=article_data.get('image_url'),
+        created_at=article_data.get('created_at') or from_timestamp(published_ts(article_data))
+    )
+
+# آخر نتائج كل مصدر، تحدّثها الجدولة في الخلفية
+breaking_store = FeedStore()
+
+def _source_names() -> List[str]:
+    return rss_service.sources.names()
+
+# أقصى مدة ينتظرها الطلب للمصادر قبل الرد بما توفر
+NEWS_FETCH_DEADLINE = float(os.environ.get('NEWS_FETCH_DEADLINE', 3))
+
+def _build_breaking_news() -> dict:
+    names = _source_names()
+    articles_by_source = breaking_store.articles_by_source(names)
+    with ROUTE_STAGE_SECONDS.time(endpoint="breaking", stage="dedup"):
+        articles = rss_service.build_breaking_news(list(articles_by_source.values()))
+    return {
+        "articles": articles,
+        "sources_status": {name: breaking_scheduler.source_status(name) for name in names}
+    }
+
+async def load_breaking_news() -> dict:
+    """بناء لقطة الأخبار العاجلة بعد جلب المصادر المستحقة (ضمن المهلة) فقط"""
+    await breaking_scheduler.poll_due(deadline=NEWS_FETCH_DEADLINE)
+    return _build_breaking_news()
+
+def on_source_updated(source_name: str):
+    """تحديث اللقطة فور وصول نتائج جديدة من أحد المصادر"""
+    if breaking_cache.snapshot is not None:
+        breaking_cache.put(_build_breaking_news())
+
+breaking_scheduler = FeedScheduler(
+    "breaking news",
+    rss_service.sources,
+    rss_service.fetch_rss_feed,
+    breaking_store,
+    on_update=on_source_updated,
+    interval=float(os.environ.get('NEWS_POLL_INTERVAL', 120)),
+    failed=feed_failure
+)
+
+def on_sources_changed(added: List[str], removed: List[str], changed: List[str]):
+    """بعد إعادة تحميل المصادر: إعادة معالجة المصادر المعدلة وإخراج المحذوفة من اللقطة"""
+    for name in removed + changed:
+        rss_service.seen_entries.forget(name)
+    if breaking_cache.snapshot is not None and (added or removed):
+        breaking_cache.put(_build_breaking_news())
+
+rss_service.sources.add_listener(on_sources_changed)
+
+# فهرس البحث في كل المقالات التي جُلبت، يُحدَّث مع كل جلب ناجح
+search_index = SearchIndex(max_documents=int(os.environ.get('SEARCH_INDEX_MAX_DOCUMENTS', 50000)))
+breaking_store.add_listener(lambda source_name, articles: search_index.add_articles(articles))
+
+# بث الأخبار العاجلة الجديدة للمشتركين فور اكتشافها
+news_hub = NewsHub()
+breaking_store.add_listener(
+    lambda source_name, articles: news_hub.publish(articles, lambda article: to_news_article(article).model_dump_json())
+)
+
+# لقطة مشتركة للأخبار العاجلة حتى لا يُجلب كل مصدر مع كل طلب
+breaking_cache = SnapshotCache(
+    load_breaking_news,
+    ttl=float(os.environ.get('NEWS_CACHE_TTL', 60)),
+    stale_ttl=float(os.environ.get('NEWS_CACHE_STALE_TTL', 300)),
+    name="breaking news"
+)
+
+# تخزين الاستجابات لدى المتصفح أو CDN (بالثواني)
+BREAKING_CACHE_CONTROL = cache_control(
+    max_age=int(os.environ.get('NEWS_HTTP_MAX_AGE', 30)),
+    stale_while_revalidate=int(os.environ.get('NEWS_HTTP_STALE_WHILE_REVALIDATE', 120))
+)
+SEARCH_CACHE_CONTROL = cache_control(
+    max_age=int(os.environ.get('SEARCH_HTTP_MAX_AGE', 30)),
+    stale_while_revalidate=int(os.environ.get('SEARCH_HTTP_STALE_WHILE_REVALIDATE', 60))
+)
+
+async def restore_from_database(article_store: ArticleStore, from_snapshot_file: bool = False):
+    """تعبئة المخزن واللقطة من آخر المقالات المحفوظة حتى تُخدم الطلبات الأولى دون انتظار المصادر
+
+    from_snapshot_file: المخزن واللقطة استُعيدا من لقطة القرص (أحدث من القاعدة عادة)، فيُحمّل سجل البحث فقط.
+    """
+    history = await article_store.recent_articles(_source_names(), limit=search_index.max_documents)
+    search_index.add_articles(reversed(history))  # الأقدم أولاً حتى يُحذف أولاً عند امتلاء الفهرس
+    if from_snapshot_file:
+        return
+    saved = await article_store.latest_by_source(_source_names())
+    for source_name, articles in saved.items():
+        breaking_store.seed(source_name, articles)
+        news_hub.mark_seen(articles)
+    if any(saved.values()):
+        saved_at = await article_store.last_saved_at(
+            article['id'] for articles in saved.values() for article in articles
+        )
+        breaking_cache.put(_build_breaking_news(), fetched_at=saved_at)
+        logger.info(f"Restored breaking news snapshot from {sum(map(len, saved.values()))} saved articles")
+
+def export_state() -> dict:
+    """حالة الأخبار العاجلة لحفظها في لقطة القرص (انظر snapshot_file)"""
+    return {
+        "sources": breaking_store.export(),
+        "schedule": breaking_scheduler.export_schedule(),
+        "validators": rss_service.conditional_get.export(),
+        "seen_entries": rss_service.seen_entries.export(),
+    }
+
+def restore_state(state: dict, elapsed: float):
+    """استعادة حالة محفوظة قبل elapsed ثانية وبناء اللقطة منها قبل أول طلب"""
+    names = set(_source_names())
+    for source_name, exported in state["sources"].items():
+        if source_name in names:
+            # المقالات المستعادة تدخل فهرس البحث (مستمع المخزن) لكنها لا تُبث كأخبار جديدة
+            news_hub.mark_seen(exported["articles"])
+            breaking_store.apply(source_name, exported, elapsed)
+    breaking_scheduler.apply_schedule(
+        {name: remaining for name, remaining in state["schedule"].items() if name in names}, elapsed
+    )
+    rss_service.conditional_get.restore(state["validators"])
+    rss_service.seen_entries.restore(state["seen_entries"])
+    if any(breaking_store.articles_by_source(names).values()):
+        breaking_cache.put(_build_breaking_news(), fetched_at=breaking_store.last_success(names))
+
+def render_breaking_news(snapshot: Snapshot, group: Optional[str] = None) -> bytes:
+    """جسم استجابة /breaking: تُبنى نماذج المقالات وتُسلسل مرة واحدة لكل لقطة وليس مع كل طلب"""
+    breaking_news_data = snapshot.value["articles"]
+    
+    stories = None
+    if group == "stories":
+        with ROUTE_STAGE_SECONDS.time(endpoint="breaking", stage="cluster"):
+            clusters = story_clusterer.cluster(breaking_news_data)
+        with ROUTE_STAGE_SECONDS.time(endpoint="breaking", stage="models"):
+            stories = [to_news_story(story) for story in clusters]
+        news_articles = [story.article for story in stories]
+    else:
+        with ROUTE_STAGE_SECONDS.time(endpoint="breaking", stage="models"):
+            news_articles = []
+            for article_data in breaking_news_data:
+                news_articles.append(to_news_article(article_data))
+    
+    response = BreakingNewsResponse(
+        breaking_news=news_articles,
+        count=len(news_articles),
+        last_updated=snapshot.fetched_at,
+        sources_status=snapshot.value["sources_status"],
+        stories=stories
+    )
+    with ROUTE_STAGE_SECONDS.time(endpoint="breaking", stage="serialize"):
+        return dumps(response)
+
 @router.get("/breaking", response_model=BreakingNewsResponse)
-async def get_breaking_news():
-    """جلب الأخبار العاجلة من مصادر RSS"""
+async def get_breaking_news(request: Request, group: Optional[str] = Query(None, pattern="^stories$")):
+    """جلب الأخبار العاجلة من مصادر RSS (مع group=stories تُجمع الأخبار المتشابهة من المصادر المختلفة)"""
     try:
-        breaking_news_data = await rss_service.fetch_all_breaking_news()
-        
-        news_articles = []
-        for article_data in breaking_news_data:
-            article = NewsArticle(
-                title=article_data['title'],
-                description=article_data['description'],
-                source=article_data['source'],
-                published_at=article_data['published_at'],
-                category=article_data['category'],
-                is_breaking=article_data['is_breaking'],
-                url=article_data.get('url'),
-                image_url=article_data.get('image_url')
-            )
-            news_articles.append(article)
-        
-        return BreakingNewsResponse(
-            breaking_news=news_articles,
-            count=len(news_articles),
-            last_updated=datetime.now()
+        snapshot = await breaking_cache.get()
+        body = snapshot.rendered(
+            group or "articles", lambda snapshot: RenderedBody(render_breaking_news(snapshot, group))
         )
+        return cached_response(request, body, BREAKING_CACHE_CONTROL, last_modified=snapshot.fetched_at)
     
     except Exception as e:
         logger.error(f"Error fetching breaking news: {str(e)}")
         raise HTTPException(status_code=500, detail="خطأ في جلب الأخبار العاجلة")
 
 @router.post("/refresh")
-async def refresh_breaking_news(background_tasks: BackgroundTasks):
-    """تحديث الأخبار العاجلة"""
+async def refresh_breaking_news(source: Optional[str] = None):
+    """تحديث الأخبار العاجلة (نقل المصدر أو كل المصادر إلى مقدمة طابور الجلب)"""
     try:
-        # تحديث في الخلفية لعدم إبطاء الاستجابة
-        background_tasks.add_task(rss_service.fetch_all_breaking_news)
+        if not breaking_scheduler.bump(source):
+            raise HTTPException(status_code=404, detail="المصدر غير موجود")
         
         return {
             "success": True,
             "message": "تم بدء تحديث الأخبار العاجلة",
+            "source": source,
             "timestamp": datetime.now()
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error refreshing news: {str(e)}")
         raise HTTPException(status_code=500, detail="خطأ في تحديث الأخبار")
 
 @router.get("/search")
-async def search_breaking_news(q: Optional[str] = None, category: Optional[str] = None):
+async def search_breaking_news(
+    request: Request,
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    breaking_only: bool = True,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100)
+):
     """البحث في الأخبار العاجلة"""
     try:
-        breaking_news_data = await rss_service.fetch_all_breaking_news()
-        
-        filtered_news = breaking_news_data
-        
-        if q:
-            filtered_news = [
-                article for article in filtered_news
-                if q.lower() in article['title'].lower() or q.lower() in article['description'].lower()
-            ]
+        # التأكد من أن الفهرس حصل على جلب واحد على الأقل
+        await breaking_cache.get()
         
-        if category and category != "الكل":
-            filtered_news = [
-                article for article in filtered_news
-                if article['category'] == category
-            ]
-        
-        news_articles = []
-        for article_data in filtered_news:
-            article = NewsArticle(
-                title=article_data['title'],
-                description=article_data['description'],
-                source=article_data['source'],
-                published_at=article_data['published_at'],
-                category=article_data['category'],
-                is_breaking=article_data['is_breaking'],
-                url=article_data.get('url'),
-                image_url=article_data.get('image_url')
+        with ROUTE_STAGE_SECONDS.time(endpoint="search", stage="search"):
+            total, results = search_index.search(
+                query=q,
+                category=category if category != "الكل" else None,
+                breaking_only=breaking_only,
+                offset=(page - 1) * page_size,
+                limit=page_size
             )
-            news_articles.append(article)
         
-        return {
-            "results": news_articles,
-            "count": len(news_articles),
-            "search_query": q,
-            "category": category
-        }
+        with ROUTE_STAGE_SECONDS.time(endpoint="search", stage="models"):
+            news_articles = []
+            for article_data in results:
+                news_articles.append(to_news_article(article_data))
+        
+        with ROUTE_STAGE_SECONDS.time(endpoint="search", stage="serialize"):
+            body = RenderedBody(dumps({
+                "results": news_articles,
+                "count": len(news_articles),
+                "total": total,
+                "page": page,
+                "page_size": page_size,
+                "search_query": q,
+                "category": category
+            }))
+        return cached_response(request, body, SEARCH_CACHE_CONTROL)
     
     except Exception as e:
         logger.error(f"Error searching news: {str(e)}")
-        raise HTTPException(status_code=500, detail="خطأ في البحث")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="خطأ في البحث")
+
+# مهلة إرسال نبضة للإبقاء على الاتصال مفتوحاً عبر الوسطاء
+STREAM_KEEPALIVE_SECONDS = 15
+
+def _parse_event_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+@router.get("/stream")
+async def stream_breaking_news(
+    request: Request,
+    last_event_id: Optional[str] = Query(None),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """بث الأخبار العاجلة الجديدة عبر Server-Sent Events"""
+    subscription = news_hub.subscribe(_parse_event_id(last_event_id_header or last_event_id))
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while not subscription.overflowed:
+                if await request.is_disconnected():
+                    break
+                batch = await subscription.next_events(timeout=STREAM_KEEPALIVE_SECONDS)
+                if not batch:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield "".join(event.sse for event in batch)
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/stream/ws")
+async def stream_breaking_news_ws(websocket: WebSocket, last_event_id: Optional[str] = None):
+    """بث الأخبار العاجلة الجديدة عبر WebSocket"""
+    await websocket.accept()
+    subscription = news_hub.subscribe(_parse_event_id(last_event_id))
+    try:
+        while not subscription.overflowed:
+            batch = await subscription.next_events(timeout=STREAM_KEEPALIVE_SECONDS)
+            if not batch:
+                await websocket.send_text('{"type": "keep-alive"}')
+                continue
+            for event in batch:
+                await websocket.send_text(f'{{"type": "breaking", "id": {event.id}, "article": {event.data}}}')
+        # مشترك بطيء: يعيد الاتصال مع last_event_id
+        await websocket.close(code=1013)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.close()
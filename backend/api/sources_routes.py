@@ -0,0 +1,63 @@
+from fastapi import APIRouter, HTTPException
+from datetime import datetime
+import logging
+from api.news_routes import rss_service, breaking_scheduler, breaking_store
+from api.lebanon_routes import lebanon_service, headlines_scheduler, headlines_store
+from services.source_registry import source_loader
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/sources", tags=["sources"])
+
+# مجموعات المصادر: (خدمة الجلب، الجدولة، المخزن)
+SOURCE_GROUPS = {
+    "breaking": (rss_service, breaking_scheduler, breaking_store),
+    "lebanon": (lebanon_service, headlines_scheduler, headlines_store),
+}
+
+@router.get("/health")
+async def get_sources_health():
+    """حالة كل مصدر: قاطع الدائرة، زمن الاستجابة، نسبة الأخطاء وآخر نجاح"""
+    try:
+        sources = []
+        for group, (service, scheduler, store) in SOURCE_GROUPS.items():
+            names = [source["name"] for source in scheduler.sources]
+            for name, health in service.breakers.health(names).items():
+                state = store.get(name)
+                sources.append({
+                    "name": name,
+                    "group": group,
+                    "status": scheduler.source_status(name),
+                    **health,
+                    "last_success": health["last_success"] or (state.last_success if state else None),
+                    "articles": len(state.articles) if state else 0,
+                    # المدخلات المعالجة والمتجاوزة (لم تتغير) في آخر جلب
+                    "entries": service.seen_entries.last_cycle(name),
+                })
+
+        open_count = sum(1 for source in sources if source["state"] != "closed")
+        return {
+            "sources": sources,
+            "count": len(sources),
+            "open_circuits": open_count,
+            "timestamp": datetime.now()
+        }
+
+    except Exception as e:
+        logger.error(f"Error building sources health: {str(e)}")
+        raise HTTPException(status_code=500, detail="خطأ في جلب حالة المصادر")
+
+@router.post("/reload")
+async def reload_sources():
+    """إعادة تحميل المصادر من الملف و MongoDB فوراً (دون انتظار دورة المراقبة)"""
+    try:
+        counts = await source_loader.reload()
+        return {
+            "success": source_loader.last_error is None,
+            "sources": counts,
+            "error": source_loader.last_error,
+            "timestamp": datetime.now()
+        }
+
+    except Exception as e:
+        logger.error(f"Error reloading sources: {str(e)}")
+        raise HTTPException(status_code=500, detail="خطأ في إعادة تحميل المصادر")
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+قياس أداء واجهة الأخبار دون اتصال بالإنترنت
+Offline API benchmark against a local fixture upstream
+
+    cd backend && python -m benchmarks.api_bench --requests 500 --concurrency 20 --output bench.json
+
+يوجّه كل المصادر إلى خادم fixtures محلي (small, huge, malformed, slow, 304, 5xx)،
+ويشغّل التطبيق داخل نفس العملية عبر ASGI (مع lifespan) دون MongoDB، ثم يقيس:
+- الجلب: زمن CPU لكل مقال والبايتات التي أرسلها الخادم المحلي لكل دورة تحديث
+- كل نقطة: الإنتاجية وزمن الاستجابة p50/p95/p99
+- أقصى ذاكرة للعملية (ru_maxrss) وذروة تخصيصات Python (مع --tracemalloc)
+
+ناتج --output ملف JSON للمقارنة بين الإصدارات.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.fixtures import FIXTURE_KINDS, FakeUpstream, build_fixtures
+
+# تعطيل MongoDB قبل تحميل التطبيق (load_dotenv لا يستبدل المتغيرات الموجودة)
+os.environ["MONGO_URL"] = ""
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(fraction * len(sorted_values) + 0.999999) - 1))
+    return sorted_values[index]
+
+
+def point_sources(base_url: str, directory: Path) -> dict:
+    """ملف مصادر يوجّه كل المصادر إلى الخادم المحلي ويوزع أنواع الـ fixtures عليها بالتناوب
+
+    يُضبط SOURCES_FILE عليه قبل تحميل التطبيق.
+    """
+    assignment = {}
+    groups = json.loads((BACKEND_DIR / "sources.json").read_text(encoding="utf-8"))
+    index = 0
+    for config in groups.values():
+        for source in config["sources"]:
+            kind = FIXTURE_KINDS[index % len(FIXTURE_KINDS)]
+            source["url"] = f"{base_url}/feeds/{kind}/{index}"
+            if "website" in source:
+                source["website"] = f"{base_url}/sites/{index}"
+            assignment[source["name"]] = kind
+            index += 1
+    path = directory / "sources.json"
+    path.write_text(json.dumps(groups, ensure_ascii=False), encoding="utf-8")
+    os.environ["SOURCES_FILE"] = str(path)
+    return assignment
+
+
+def rss_kb() -> int:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS بالبايت و Linux بالكيلوبايت
+    return usage // 1024 if sys.platform == "darwin" else usage
+
+
+async def ingest(news_routes, lebanon_routes, upstream: FakeUpstream, cycles: int) -> list:
+    """دورات تحديث كاملة لكل المصادر (الدورة الثانية وما بعدها تمر بـ 304)"""
+    results = []
+    for cycle in range(cycles):
+        bytes_before = upstream.bytes_written
+        cpu_before = time.process_time()
+        started = time.perf_counter()
+        for scheduler in (news_routes.breaking_scheduler, lebanon_routes.headlines_scheduler):
+            scheduler.bump()
+        await asyncio.gather(
+            news_routes.breaking_scheduler.poll_due(),
+            lebanon_routes.headlines_scheduler.poll_due(),
+        )
+        cpu = time.process_time() - cpu_before
+        stores = (news_routes.breaking_store, lebanon_routes.headlines_store)
+        articles = sum(
+            len(articles)
+            for store, scheduler in zip(stores, (news_routes.breaking_scheduler, lebanon_routes.headlines_scheduler))
+            for articles in store.articles_by_source([source["name"] for source in scheduler.sources]).values()
+        )
+        results.append({
+            "cycle": cycle + 1,
+            "wall_s": round(time.perf_counter() - started, 3),
+            "cpu_s": round(cpu, 4),
+            "articles": articles,
+            "cpu_ms_per_article": round(cpu * 1000 / articles, 3) if articles else None,
+            "upstream_bytes_written": upstream.bytes_written - bytes_before,
+        })
+    return results
+
+
+async def load(client, path: str, requests: int, concurrency: int) -> dict:
+    """إرسال requests طلباً بتوازي concurrency وقياس زمن كل طلب"""
+    latencies = []
+    statuses = {}
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_before
+
+    latencies.sort()
+    return {
+        "path": path,
+        "requests": requests,
+        "concurrency": concurrency,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(requests / wall, 1),
+        "cpu_ms_per_request": round(cpu * 1000 / requests, 3),
+        "latency_ms": {
+            name: round(percentile(latencies, fraction) * 1000, 2)
+            for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+        },
+        "latency_max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="عدد الطلبات لكل نقطة")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--cycles", type=int, default=2, help="عدد دورات التحديث الكاملة قبل القياس")
+    parser.add_argument("--huge-items", type=int, default=20000)
+    parser.add_argument("--slow-delay", type=float, default=2.0)
+    parser.add_argument("--fixtures", type=Path, help="مجلد fixtures مسجلة (small.xml, huge.xml ...)")
+    parser.add_argument("--search-query", default="الحكومة")
+    parser.add_argument("--tracemalloc", action="store_true", help="قياس ذروة تخصيصات Python (أبطأ)")
+    parser.add_argument("--output", type=Path, help="حفظ النتائج بصيغة JSON")
+    args = parser.parse_args()
+
+    import httpx
+
+    upstream = FakeUpstream(build_fixtures(args.huge_items, args.fixtures), slow_delay=args.slow_delay)
+    await upstream.start()
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    # التحميل بعد ضبط البيئة حتى تقرأ الوحدات الإعدادات الصحيحة
+    sources_dir = tempfile.TemporaryDirectory()
+    assignment = point_sources(upstream.base_url, Path(sources_dir.name))
+    import server
+    from api import lebanon_routes, news_routes
+
+    newspaper = lebanon_routes.lebanon_service.lebanon_newspapers[2]["name"]
+    endpoints = [
+        "/api/news/breaking",
+        "/api/lebanon/headlines",
+        f"/api/news/search?q={quote(args.search_query)}&breaking_only=false",
+        f"/api/lebanon/newspaper/{quote(newspaper)}",
+    ]
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with server.app.router.lifespan_context(server.app):
+        ingest_results = await ingest(news_routes, lebanon_routes, upstream, args.cycles)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            endpoint_results = []
+            for path in endpoints:
+                # طلب أول (بارد) خارج القياس حتى تُبنى اللقطة
+                await client.get(path)
+                endpoint_results.append(await load(client, path, args.requests, args.concurrency))
+
+    peak_python = None
+    if args.tracemalloc:
+        peak_python = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    await upstream.stop()
+    sources_dir.cleanup()
+
+    report = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "cycles": args.cycles,
+            "huge_items": args.huge_items,
+            "slow_delay": args.slow_delay,
+            "fixtures": str(args.fixtures) if args.fixtures else "generated",
+            "parse_executor": os.environ.get("FEED_PARSE_EXECUTOR", "thread"),
+        },
+        "sources": assignment,
+        "upstream_requests": upstream.requests,
+        "ingest": ingest_results,
+        "endpoints": endpoint_results,
+        "memory": {
+            "max_rss_kb": rss_kb(),
+            "python_peak_kb": peak_python // 1024 if peak_python is not None else None,
+        },
+    }
+
+    for cycle in ingest_results:
+        print(
+            f"ingest #{cycle['cycle']}: {cycle['articles']} articles, wall {cycle['wall_s']}s, "
+            f"cpu {cycle['cpu_ms_per_article']} ms/article, {cycle['upstream_bytes_written'] / 1024:.0f} KiB written by upstream"
+        )
+    print(f"{'endpoint':<48} {'rps':>8} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'cpu_ms':>8}")
+    for result in endpoint_results:
+        latency = result["latency_ms"]
+        print(
+            f"{result['path'][:48]:<48} {result['throughput_rps']:>8} {latency['p50']:>8} "
+            f"{latency['p95']:>8} {latency['p99']:>8} {result['cpu_ms_per_request']:>8}"
+        )
+    print(f"max RSS: {report['memory']['max_rss_kb'] / 1024:.1f} MiB")
+
+    if args.output:
+        args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
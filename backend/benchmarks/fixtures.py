@@ -0,0 +1,142 @@
+"""
+مصدر RSS/Atom محلي يعيد تشغيل fixtures ثابتة للقياس
+Local aiohttp stand-in upstream that replays RSS/Atom fixtures
+
+الأنواع: small, huge, malformed, slow, not_modified (304 مع ETag), error (5xx).
+يمكن استبدال أي fixture مولّد بملف مسجل من مصدر حقيقي عبر مجلد fixtures
+(ملف باسم النوع: small.xml, huge.xml ...).
+"""
+
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+
+from aiohttp import ClientConnectionResetError, web
+
+FIXTURE_KINDS = ("small", "huge", "malformed", "slow", "not_modified", "error")
+
+# عناوين تطابق كلمات الأخبار العاجلة (RSSService) والكلمات السياسية (LebanonNewsService)
+TITLES = (
+    "عاجل: مجلس الوزراء اللبناني يقر الموازنة العامة بعد جلسة طويلة",
+    "الآن: زلزال بقوة 6.2 درجات يضرب جنوب تركيا",
+    "رئيس الحكومة يلتقي وزير الخارجية الفرنسي في بيروت",
+    "عاجل: انقطاع الكهرباء في عدة مناطق بسبب أزمة الوقود",
+    "البرلمان يناقش قانون الانتخابات الجديد وسط خلافات بين الكتل",
+    "ارتفاع أسعار النفط عالمياً مع تراجع المخزونات الأمريكية",
+)
+
+
+def build_rss(items: int, seed: str = "") -> bytes:
+    """RSS 2.0 بعدد مدخلات محدد (العناوين تتكرر مع رقم مختلف)"""
+    entries = []
+    for i in range(items):
+        title = f"{TITLES[i % len(TITLES)]} ({seed}{i})"
+        entries.append(
+            f"<item><title>{title}</title>"
+            f"<description>&lt;p&gt;{'تفاصيل إضافية عن الحكومة والاقتصاد والأمن في لبنان والمنطقة. ' * 6}&lt;/p&gt;</description>"
+            f"<link>https://example.com/{seed}news/{i}?utm_source=rss</link><guid>{seed}news-{i}</guid>"
+            f"<pubDate>Mon, 01 Jan 2024 {i // 60 % 24:02d}:{i % 60:02d}:00 +0000</pubDate></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+        f"<title>benchmark {seed}</title>{''.join(entries)}</channel></rss>"
+    ).encode("utf-8")
+
+
+def build_atom(items: int, seed: str = "") -> bytes:
+    """Atom بعدد مدخلات محدد"""
+    entries = []
+    for i in range(items):
+        title = f"{TITLES[i % len(TITLES)]} ({seed}{i})"
+        entries.append(
+            f"<entry><title>{title}</title><id>urn:{seed}news:{i}</id>"
+            f'<link href="https://example.com/{seed}atom/{i}"/>'
+            f"<updated>2024-01-01T{i // 60 % 24:02d}:{i % 60:02d}:00Z</updated>"
+            f"<summary>ملخص الخبر رقم {i} عن الحكومة والبرلمان</summary></entry>"
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+        f"<title>benchmark {seed}</title>{''.join(entries)}</feed>"
+    ).encode("utf-8")
+
+
+def build_fixtures(huge_items: int = 20000, fixtures_dir: Optional[Path] = None) -> Dict[str, bytes]:
+    """محتوى كل نوع (المسجل من fixtures_dir إن وجد، وإلا المولّد)"""
+    fixtures = {
+        "small": build_rss(20, "s"),
+        "huge": build_rss(huge_items, "h"),
+        # مستند مقطوع في منتصف مدخل مع وسوم غير مغلقة
+        "malformed": build_rss(12, "m")[:-900] + "<item><title>عاجل <b>غير مكتمل".encode("utf-8"),
+        "slow": build_atom(20, "w"),
+        "not_modified": build_rss(20, "n"),
+        "error": b"<html><body>503 Service Unavailable</body></html>",
+    }
+    if fixtures_dir is not None:
+        for kind in FIXTURE_KINDS:
+            recorded = fixtures_dir / f"{kind}.xml"
+            if recorded.exists():
+                fixtures[kind] = recorded.read_bytes()
+    return fixtures
+
+
+class FakeUpstream:
+    """خادم aiohttp محلي يخدم fixtures على /feeds/{kind}/{index} ويُحصي الطلبات"""
+
+    def __init__(self, fixtures: Dict[str, bytes], slow_delay: float = 2.0, host: str = "127.0.0.1"):
+        self.fixtures = fixtures
+        self.slow_delay = slow_delay
+        self.host = host
+        self.port: Optional[int] = None
+        self.requests: Dict[str, int] = {}
+        self.bytes_written = 0
+        self._etags = {kind: f'"{hashlib.sha1(body).hexdigest()[:16]}"' for kind, body in fixtures.items()}
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def _feed(self, request: web.Request) -> web.StreamResponse:
+        kind = request.match_info["kind"]
+        self.requests[kind] = self.requests.get(kind, 0) + 1
+        if kind not in self.fixtures:
+            raise web.HTTPNotFound()
+        if kind == "error":
+            return web.Response(status=503, body=self.fixtures[kind], content_type="text/html")
+        if kind == "slow":
+            await asyncio.sleep(self.slow_delay)
+
+        headers = {"Content-Type": "application/rss+xml; charset=utf-8"}
+        if kind == "not_modified":
+            headers["ETag"] = self._etags[kind]
+            if request.headers.get("If-None-Match") == self._etags[kind]:
+                return web.Response(status=304, headers={"ETag": self._etags[kind]})
+
+        # إرسال على دفعات كما يفعل خادم حقيقي، مع احترام إغلاق العميل للاتصال مبكراً
+        body = self.fixtures[kind]
+        response = web.StreamResponse(headers=headers)
+        response.content_length = len(body)
+        try:
+            await response.prepare(request)
+            for offset in range(0, len(body), 64 * 1024):
+                await response.write(body[offset:offset + 64 * 1024])
+                self.bytes_written += min(64 * 1024, len(body) - offset)
+            await response.write_eof()
+        except (ConnectionError, ClientConnectionResetError):
+            pass
+        return response
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/feeds/{kind}/{index}", self._feed)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
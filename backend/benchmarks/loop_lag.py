@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+قياس تأخر حلقة الأحداث أثناء تحليل feeds كبيرة بالتوازي
+Event-loop lag while parsing large feeds concurrently
+
+    cd backend && python -m benchmarks.loop_lag --items 2000 --concurrency 8
+
+يقارن التحليل داخل الحلقة (السلوك السابق) مع منفذ الخيوط ومنفذ العمليات.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.parse_pool import ParsePool
+from services.rss_service import parse_rss_articles
+
+SOURCE = {
+    "name": "benchmark",
+    "url": "http://localhost/feed",
+    "breaking_keywords": ["عاجل", "الآن", "فوري"]
+}
+
+
+def build_feed(items: int) -> str:
+    """توليد RSS كبير للاختبار"""
+    entries = []
+    for i in range(items):
+        entries.append(
+            f"<item><title>عاجل: تطورات جديدة في الملف رقم {i}</title>"
+            f"<description>&lt;p&gt;{'وصف طويل للخبر مع تفاصيل إضافية عن الحكومة والاقتصاد ' * 10}&lt;/p&gt;</description>"
+            f"<link>https://example.com/news/{i}</link><guid>news-{i}</guid>"
+            f"<pubDate>Mon, 01 Jan 2024 10:{i % 60:02d}:00 +0000</pubDate></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+        f"<title>benchmark</title>{''.join(entries)}</channel></rss>"
+    )
+
+
+async def measure_lag(stop: asyncio.Event, samples: list, interval: float = 0.005):
+    """قياس الفرق بين موعد الاستيقاظ المتوقع والفعلي"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def run_mode(mode: str, content: str, concurrency: int, workers: int) -> dict:
+    samples = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(measure_lag(stop, samples))
+    await asyncio.sleep(0.05)
+
+    pool = None if mode == "inline" else ParsePool(kind=mode, workers=workers)
+
+    async def parse_once():
+        if pool is None:
+            # السلوك السابق: التحليل مباشرة داخل الحلقة
+            return parse_rss_articles(content, SOURCE)
+        return await pool.run(parse_rss_articles, content, SOURCE)
+
+    if pool is not None:
+        # تسخين المنفذ حتى لا يُحسب زمن إنشاء العمال
+        await parse_once()
+        samples.clear()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(parse_once() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+    if pool is not None:
+        pool.shutdown()
+
+    lags_ms = sorted(sample * 1000 for sample in samples) or [0.0]
+    return {
+        "mode": mode,
+        "wall_s": round(elapsed, 3),
+        "lag_max_ms": round(lags_ms[-1], 1),
+        "lag_p99_ms": round(lags_ms[int(len(lags_ms) * 0.99) - 1] if len(lags_ms) > 1 else lags_ms[0], 1),
+        "lag_mean_ms": round(statistics.mean(lags_ms), 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modes", default="inline,thread,process")
+    args = parser.parse_args()
+
+    content = build_feed(args.items)
+    print(f"feed size: {len(content.encode()) / 1024:.0f} KiB, {args.items} items, {args.concurrency} concurrent parses")
+    print(f"{'mode':<8} {'wall_s':>8} {'lag_max_ms':>11} {'lag_p99_ms':>11} {'lag_mean_ms':>12}")
+    for mode in args.modes.split(","):
+        result = await run_mode(mode, content, args.concurrency, args.workers)
+        print(f"{result['mode']:<8} {result['wall_s']:>8} {result['lag_max_ms']:>11} {result['lag_p99_ms']:>11} {result['lag_mean_ms']:>12}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+قياس ذاكرة السجل الطويل للمقالات
+Memory of the in-memory article history: plain dicts vs ArticleRecord
+
+    cd backend && python -m benchmarks.memory_bench --articles 100000 --output memory.json
+
+يبني مقالات كما تعود من MongoDB أو من ملف اللقطة (نسخة منفصلة من اسم المصدر والتصنيف
+والموقع لكل مقال، و datetime للتواريخ)، ثم يقيس بـ tracemalloc الذاكرة المحجوزة لكل مقال:
+- dicts: المقالات كقواميس (كما كانت في فهرس البحث وقائمة المقالات)
+- records: نفس المقالات بتمثيل ArticleRecord (__slots__، نصوص مشتركة، تواريخ صحيحة)
+- search_index / timeline: الفهرس وقائمة المقالات بعد إضافة كل المقالات (مع كلفة الفهرسة نفسها)
+وزمن صفحة من قائمة المقالات في أولها وفي عمقها.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fixtures import TITLES
+
+SOURCES = [f"صحيفة {index}" for index in range(20)]
+CATEGORIES = ["سياسة", "اقتصاد", "أمن", "محلي"]
+
+
+def copy_string(value: str) -> str:
+    """نسخة منفصلة من النص كما ينتجها فك ترميز BSON أو pickle"""
+    return "".join(list(value))
+
+
+def build_articles(count: int) -> list:
+    now = datetime.utcnow()
+    articles = []
+    for index in range(count):
+        source = SOURCES[index % len(SOURCES)]
+        articles.append({
+            'id': f"{index:016x}",
+            'title': f"{TITLES[index % len(TITLES)]} ({index})",
+            'description': f"تفاصيل الخبر رقم {index} عن الحكومة والاقتصاد والأمن في لبنان والمنطقة",
+            'source': copy_string(source),
+            'published_at': now - timedelta(seconds=index * 7),
+            'category': copy_string(CATEGORIES[index % len(CATEGORIES)]),
+            'is_breaking': index % 3 == 0,
+            'url': f"https://example.com/{index % len(SOURCES)}/{index}",
+            'image_url': None,
+            'website': copy_string(f"https://example.com/{index % len(SOURCES)}"),
+            'created_at': now,
+        })
+    return articles
+
+
+def traced(build) -> tuple:
+    """(الناتج، البايتات المحجوزة التي بقيت بعد بنائه)"""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    gc.collect()
+    return value, tracemalloc.get_traced_memory()[0] - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100000, help="عدد المقالات")
+    parser.add_argument("--output", type=Path, help="حفظ النتائج بصيغة JSON")
+    args = parser.parse_args()
+
+    from services.article_record import ArticleRecord
+    from services.article_timeline import ArticleFilters, ArticleTimeline
+    from services.search_index import SearchIndex
+
+    count = args.articles
+    tracemalloc.start()
+
+    # كل قياس يبني مقالاته ويحسب ما يبقى محجوزاً بعد التخلص من القواميس الأصلية
+    articles, dicts_bytes = traced(lambda: build_articles(count))
+    del articles
+    records, records_bytes = traced(lambda: [ArticleRecord.from_article(article) for article in build_articles(count)])
+    del records
+
+    def build_index():
+        index = SearchIndex(max_documents=count)
+        index.add_articles(reversed(build_articles(count)))
+        return index
+
+    def build_timeline():
+        timeline = ArticleTimeline(max_articles=count)
+        timeline.add_articles(build_articles(count))
+        return timeline
+
+    index, index_bytes = traced(build_index)
+    del index
+    timeline, timeline_bytes = traced(build_timeline)
+    tracemalloc.stop()
+
+    # صفحة في العمق تكلف مثل الأولى
+    def page_ms(after) -> float:
+        started = time.perf_counter()
+        for _ in range(100):
+            timeline.page(ArticleFilters(), after, 20)
+        return round((time.perf_counter() - started) * 10, 4)
+
+    deep = timeline.page(ArticleFilters(), None, count - 40)[0][-1]
+
+    results = {
+        "articles": count,
+        "dicts_bytes_per_article": round(dicts_bytes / count, 1),
+        "records_bytes_per_article": round(records_bytes / count, 1),
+        "search_index_bytes_per_article": round(index_bytes / count, 1),
+        "timeline_bytes_per_article": round(timeline_bytes / count, 1),
+        "dicts_mib": round(dicts_bytes / 2 ** 20, 1),
+        "records_mib": round(records_bytes / 2 ** 20, 1),
+        "search_index_mib": round(index_bytes / 2 ** 20, 1),
+        "timeline_mib": round(timeline_bytes / 2 ** 20, 1),
+        "timeline_first_page_ms": page_ms(None),
+        "timeline_deep_page_ms": page_ms((deep.published_at, deep.id)),
+    }
+    print(f"{'representation':<16} {'bytes/article':>14} {'MiB':>8}")
+    for name in ("dicts", "records", "search_index", "timeline"):
+        print(f"{name:<16} {results[f'{name}_bytes_per_article']:>14} {results[f'{name}_mib']:>8}")
+    print(f"timeline page: first {results['timeline_first_page_ms']} ms, deep {results['timeline_deep_page_ms']} ms")
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            **results,
+        }, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
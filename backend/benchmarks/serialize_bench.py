@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+قياس كلفة CPU لكل طلب في بناء استجابات اللقطات
+Per-request CPU of snapshot responses: per-request models vs pre-serialized bytes
+
+    cd backend && python -m benchmarks.serialize_bench --requests 2000 --output serialize.json
+
+يقارن لكل نقطة (/api/news/breaking و /api/lebanon/headlines) بين:
+- per_request: بناء نموذج NewsArticle لكل مقال ثم jsonable_encoder و JSONResponse مع كل طلب
+  (كما كانت المسارات تفعل سابقاً)
+- snapshot: الجسم المسلسل مرة واحدة في اللقطة (orjson) ثم Response بنفس البايتات
+
+ويتحقق أن الطريقتين تنتجان نفس JSON (بعد فك الترميز).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["MONGO_URL"] = ""
+
+from benchmarks.fixtures import TITLES
+
+
+def sample_article(index: int, source: str, now: datetime) -> dict:
+    title = f"{TITLES[index % len(TITLES)]} ({source} {index})"
+    return {
+        'id': f"{source}-{index:05d}",
+        'title': title,
+        'description': f"{'تفاصيل إضافية عن الحكومة والاقتصاد والأمن في لبنان والمنطقة. ' * 4}".strip(),
+        'source': source,
+        'published_at': now - timedelta(minutes=index),
+        'category': "سياسة",
+        'is_breaking': True,
+        'url': f"https://example.com/{index}",
+        'image_url': None,
+        'created_at': now,
+    }
+
+
+def measure(func, requests: int) -> dict:
+    """زمن CPU لكل استدعاء بالمللي ثانية"""
+    func()  # تسخين (وبناء الجسم المخزن في حالة snapshot)
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+    for _ in range(requests):
+        func()
+    cpu = time.process_time() - cpu_before
+    return {
+        "cpu_ms_per_request": round(cpu * 1000 / requests, 4),
+        "requests_per_cpu_second": round(requests / cpu, 1) if cpu else None,
+        "wall_s": round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="عدد الطلبات لكل طريقة")
+    parser.add_argument("--output", type=Path, help="حفظ النتائج بصيغة JSON")
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse, Response
+
+    from api import lebanon_routes, news_routes
+    from models.news import BreakingNewsResponse
+    from services.serialization import JSON_MEDIA_TYPE
+    from services.snapshot_cache import Snapshot
+
+    now = datetime.utcnow()
+    breaking = Snapshot({
+        "articles": [sample_article(i, "الجزيرة", now) for i in range(50)],
+        "sources_status": {"الجزيرة": "fresh"},
+    })
+    newspapers = [newspaper["name"] for newspaper in lebanon_routes.lebanon_service.lebanon_newspapers]
+    headlines = Snapshot({
+        "headlines": {
+            name: [dict(sample_article(i, name, now), website="https://example.com") for i in range(15)]
+            for name in newspapers
+        },
+        "sources_status": {name: "fresh" for name in newspapers},
+    })
+
+    def breaking_per_request():
+        articles = [news_routes.to_news_article(article) for article in breaking.value["articles"]]
+        response = BreakingNewsResponse(
+            breaking_news=articles, count=len(articles), last_updated=breaking.fetched_at,
+            sources_status=breaking.value["sources_status"]
+        )
+        return JSONResponse(jsonable_encoder(response)).body
+
+    def breaking_snapshot():
+        return Response(
+            breaking.rendered("articles", news_routes.render_breaking_news), media_type=JSON_MEDIA_TYPE
+        ).body
+
+    def headlines_per_request():
+        organized = {
+            name: {
+                "headlines": [lebanon_routes.to_headline_article(headline) for headline in items],
+                "count": len(items),
+                "website": items[0]["website"] if items else "",
+            }
+            for name, items in headlines.value["headlines"].items()
+        }
+        return JSONResponse(jsonable_encoder({
+            "newspapers": organized,
+            "total_newspapers": len(organized),
+            "total_headlines": sum(item["count"] for item in organized.values()),
+            "last_updated": headlines.fetched_at,
+            "sources_status": headlines.value["sources_status"],
+            "country": "لبنان",
+        })).body
+
+    def headlines_snapshot():
+        return Response(
+            headlines.rendered("newspapers", lebanon_routes.render_headlines), media_type=JSON_MEDIA_TYPE
+        ).body
+
+    results = []
+    for endpoint, per_request, snapshot in (
+        ("/api/news/breaking", breaking_per_request, breaking_snapshot),
+        ("/api/lebanon/headlines", headlines_per_request, headlines_snapshot),
+    ):
+        identical = json.loads(per_request()) == json.loads(snapshot())
+        before = measure(per_request, args.requests)
+        after = measure(snapshot, args.requests)
+        results.append({
+            "endpoint": endpoint,
+            "body_bytes": len(snapshot()),
+            "same_json": identical,
+            "per_request": before,
+            "snapshot": after,
+            "speedup": round(before["cpu_ms_per_request"] / after["cpu_ms_per_request"], 1)
+            if after["cpu_ms_per_request"] else None,
+        })
+
+    print(f"{'endpoint':<26} {'bytes':>8} {'before_ms':>10} {'after_ms':>10} {'speedup':>8} {'same':>5}")
+    for result in results:
+        print(
+            f"{result['endpoint']:<26} {result['body_bytes']:>8} {result['per_request']['cpu_ms_per_request']:>10} "
+            f"{result['snapshot']['cpu_ms_per_request']:>10} {result['speedup']:>8} {str(result['same_json']):>5}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "requests": args.requests,
+            "endpoints": results,
+        }, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
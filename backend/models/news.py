@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 import uuid
 
 class NewsArticle(BaseModel):
@@ -20,7 +20,26 @@ class NewsResponse(BaseModel):
     total: int
     last_updated: datetime
 
+class NewsStory(BaseModel):
+    """مجموعة مقالات من مصادر مختلفة عن نفس الخبر"""
+    id: str
+    article: NewsArticle
+    articles: List[NewsArticle]
+    sources: List[str]
+    count: int
+
 class BreakingNewsResponse(BaseModel):
     breaking_news: List[NewsArticle]
     count: int
-    last_updated: datetime
\ No newline at end of file
+    last_updated: datetime
+    # حالة كل مصدر: fresh / stale / missing
+    sources_status: Dict[str, str] = {}
+    # عند group=stories: الأخبار مجمعة في قصص، و breaking_news تحوي المقال الممثل لكل قصة
+    stories: Optional[List[NewsStory]] = None
+
+class NewsPage(BaseModel):
+    """صفحة من قائمة المقالات؛ next_cursor يُمرر كما هو لطلب الصفحة التالية"""
+    articles: List[NewsArticle]
+    count: int
+    next_cursor: Optional[str] = None
+    has_more: bool = False
@@ -1,18 +1,32 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from contextlib import asynccontextmanager
 import logging
 from pathlib import Path
+from typing import List
 from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
 import os
-
-# Import routes
-from api.news_routes import router as news_router
-from api.lebanon_routes import router as lebanon_router
+import time
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Import routes (after loading .env so route modules see the configuration)
+from api import news_routes, lebanon_routes
+from api.news_routes import router as news_router, breaking_scheduler
+from api.lebanon_routes import router as lebanon_router, headlines_scheduler
+from api.sources_routes import router as sources_router
+from api.articles_routes import router as articles_router
+from services.article_store import ArticleStore
+from services.http_client import http_client
+from services.metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS, loop_lag_monitor, metrics
+from services.parse_pool import parse_pool
+from services.snapshot_file import SnapshotFile
+from services.source_registry import source_loader
+from services.worker_coordinator import WorkerCoordinator
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,13 +34,93 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# With SHARED_STATE_DIR set (uvicorn --workers N) only the elected worker fetches upstream
+worker_coordinator = WorkerCoordinator.from_env([breaking_scheduler, headlines_scheduler])
+# Followers reuse the leader's event ids so Last-Event-ID resumes on any worker
+worker_coordinator.share(
+    breaking_scheduler, "news_hub", news_routes.news_hub.export_ids, news_routes.news_hub.adopt_ids
+)
+# ...and show the leader's circuit breakers in /api/sources/health and the open_circuits gauge
+for scheduler, service in ((breaking_scheduler, news_routes.rss_service), (headlines_scheduler, lebanon_routes.lebanon_service)):
+    worker_coordinator.share(scheduler, "breakers", service.breakers.export, service.breakers.apply)
+
+def persist_if_leader(article_store: ArticleStore):
+    """Store listener persisting fetch results; followers only mirror what the leader already saved"""
+    def persist(source_name, articles):
+        if worker_coordinator.is_leader:
+            article_store.persist_in_background(source_name, articles)
+    return persist
+
+# Last known articles, validators and seen-entry index on disk (SNAPSHOT_FILE), loaded on boot
+snapshot_file = SnapshotFile.from_env()
+snapshot_file.register(
+    "breaking", news_routes.export_state, news_routes.restore_state,
+    version=lambda: news_routes.breaking_store.version
+)
+snapshot_file.register(
+    "lebanon", lebanon_routes.export_state, lebanon_routes.restore_state,
+    version=lambda: lebanon_routes.headlines_store.version
+)
+
+async def connect_article_store(app: FastAPI, restored: List[str]):
+    """Connect to MongoDB, restore the last snapshots and persist every fetch cycle
+
+    restored: snapshot file sections already loaded; MongoDB does not overwrite them with older data.
+    """
+    app.state.mongo_client = None
+    app.state.article_store = None
+
+    mongo_url = os.environ.get('MONGO_URL')
+    if not mongo_url:
+        logger.warning("MONGO_URL is not set, articles will not be persisted")
+        return
+
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    try:
+        db = client[os.environ.get('DB_NAME', 'news')]
+        article_store = ArticleStore(db)
+        await article_store.ensure_indexes()
+        await lebanon_routes.lebanon_service.discovery.attach(db["discovered_feeds"])
+        await source_loader.attach(db["sources"])
+        await news_routes.restore_from_database(article_store, from_snapshot_file="breaking" in restored)
+        await lebanon_routes.restore_from_database(article_store, from_snapshot_file="lebanon" in restored)
+    except Exception as e:
+        logger.error(f"MongoDB unavailable, articles will not be persisted: {str(e)}")
+        client.close()
+        return
+
+    news_routes.breaking_store.add_listener(persist_if_leader(article_store))
+    lebanon_routes.headlines_store.add_listener(persist_if_leader(article_store))
+    app.state.mongo_client = client
+    app.state.article_store = article_store
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Breaking News API...")
+    restored = snapshot_file.load()
+    await connect_article_store(app, restored)
+    source_loader.start()
+    await worker_coordinator.start()
+    snapshot_file.start(should_save=lambda: worker_coordinator.is_leader)
+    loop_lag_monitor.start()
     yield
     # Shutdown
     logger.info("Shutting down Breaking News API...")
+    await loop_lag_monitor.stop()
+    await source_loader.stop()
+    await snapshot_file.stop()
+    if worker_coordinator.is_leader:
+        await snapshot_file.save()
+    await worker_coordinator.stop()
+    await breaking_scheduler.stop()
+    await headlines_scheduler.stop()
+    parse_pool.shutdown()
+    await http_client.close()
+    if app.state.article_store is not None:
+        await app.state.article_store.close()
+        await lebanon_routes.lebanon_service.discovery.close()
+        app.state.mongo_client.close()
 
 # Create the main app
 app = FastAPI(
@@ -47,10 +141,61 @@ async def root():
 # Include news routes
 api_router.include_router(news_router)
 api_router.include_router(lebanon_router)
+api_router.include_router(sources_router)
+api_router.include_router(articles_router)
 
 # Include the router in the main app
 app.include_router(api_router)
 
+# Gauges read on every scrape
+metrics.gauge(
+    "http_client_in_flight", "Upstream requests currently in flight",
+    function=lambda: {(): http_client.in_flight}
+)
+metrics.gauge(
+    "feed_fetches_in_flight", "Source fetches currently running per feed", ("feed",),
+    function=lambda: {(scheduler.name,): scheduler.in_flight for scheduler in (breaking_scheduler, headlines_scheduler)}
+)
+metrics.counter(
+    "conditional_get_total", "Conditional GET counters per feed", ("feed", "kind"),
+    function=lambda: {
+        (feed, kind): value
+        for feed, service in (("breaking", news_routes.rss_service), ("lebanon", lebanon_routes.lebanon_service))
+        for kind, value in service.conditional_get.stats.items()
+    }
+)
+metrics.gauge(
+    "open_circuits", "Sources whose circuit breaker is open", ("feed",),
+    function=lambda: {
+        (feed,): sum(1 for health in service.breakers.health().values() if health["state"] == "open")
+        for feed, service in (("breaking", news_routes.rss_service), ("lebanon", lebanon_routes.lebanon_service))
+    }
+)
+metrics.gauge(
+    "fetch_leader", "1 if this worker fetches upstream, 0 if it serves the leader's snapshots",
+    function=lambda: {(): int(worker_coordinator.is_leader)}
+)
+metrics.gauge(
+    "stream_subscribers", "Connected SSE/WebSocket clients",
+    function=lambda: {(): news_routes.news_hub.subscriber_count}
+)
+
+@app.middleware("http")
+async def observe_request_duration(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not the raw URL, to keep label cardinality bounded
+    route = request.scope.get("route")
+    endpoint = route.path if route is not None else "unmatched"
+    HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - started, method=request.method, endpoint=endpoint, status=response.status_code
+    )
+    return response
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,156 @@
+import heapq
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def to_timestamp(moment: Optional[datetime]) -> Optional[int]:
+    """ثواني UTC منذ 1970 (التواريخ بدون منطقة زمنية تُعتبر UTC كما تُخزن)"""
+    if moment is None:
+        return None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - EPOCH) // _SECOND
+
+
+def from_timestamp(timestamp: Optional[int]) -> Optional[datetime]:
+    if timestamp is None:
+        return None
+    return EPOCH + timedelta(seconds=timestamp)
+
+
+def to_local_time(moment: Optional[datetime]) -> Optional[datetime]:
+    """تاريخ UTC بدون منطقة زمنية (كما يُخزن) بالتوقيت المحلي بدون منطقة (كأوقات الجلب)"""
+    if moment is None:
+        return None
+    return moment.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+
+def published_ts(article: Dict[str, Any]) -> int:
+    """وقت نشر المقال بثواني UTC (يُحسب عند الجلب؛ المقالات المستعادة بدونه تُحسب من published_at)"""
+    timestamp = article.get('published_ts')
+    return timestamp if timestamp is not None else to_timestamp(article['published_at'])
+
+
+def sort_newest_first(articles: List[Dict[str, Any]]):
+    """ترتيب مقالات مصدر واحد (الأحدث أولاً) في مكانها، مرة واحدة عند تخزينها"""
+    articles.sort(key=published_ts, reverse=True)
+
+
+def merge_newest_first(sorted_lists: Iterable[List[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+    """دمج قوائم مرتبة (الأحدث أولاً) في تسلسل واحد مرتب بكومة بحجم عدد المصادر
+
+    الدمج كسول: من يحتاج أول n مقال فقط لا يدفع إلا كلفة n × log(عدد المصادر).
+    عند تساوي الوقت تبقى المقالات بترتيب القوائم المعطاة.
+    """
+    return heapq.merge(*sorted_lists, key=published_ts, reverse=True)
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+class ArticleRecord:
+    """تمثيل مضغوط لمقال في السجلات الطويلة (فهرس البحث وقائمة المقالات)
+
+    __slots__ بدل قاموس لكل مقال، والمصدر والتصنيف والموقع نصوص مشتركة (sys.intern)
+    بدل نسخة لكل مقال (المقالات المستعادة من MongoDB أو من ملف تحمل نسخاً منفصلة)،
+    والتواريخ أعداد صحيحة بالثواني. يُقرأ كما يُقرأ قاموس المقال (record['title']،
+    record.get('url')) فتعمل عليه دوال التحويل إلى النماذج كما هي.
+    """
+
+    __slots__ = (
+        "id", "title", "description", "source", "category", "url", "image_url", "website",
+        "is_breaking", "published_ts", "created_ts",
+    )
+
+    FIELDS = frozenset((
+        "id", "title", "description", "source", "category", "url", "image_url", "website",
+        "is_breaking", "published_at", "created_at",
+    ))
+
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        description: str,
+        source: str,
+        category: str,
+        published_ts: int,
+        is_breaking: bool = False,
+        url: Optional[str] = None,
+        image_url: Optional[str] = None,
+        website: Optional[str] = None,
+        created_ts: Optional[int] = None,
+    ):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.source = _intern(source)
+        self.category = _intern(category)
+        self.published_ts = published_ts
+        self.is_breaking = is_breaking
+        self.url = url
+        self.image_url = image_url
+        self.website = _intern(website)
+        self.created_ts = created_ts
+
+    @classmethod
+    def from_article(cls, article: Dict[str, Any]) -> "ArticleRecord":
+        return cls(
+            id=article['id'],
+            title=article['title'],
+            description=article['description'],
+            source=article['source'],
+            category=article['category'],
+            published_ts=published_ts(article),
+            is_breaking=bool(article.get('is_breaking', False)),
+            url=article.get('url'),
+            image_url=article.get('image_url'),
+            website=article.get('website'),
+            created_ts=to_timestamp(article.get('created_at')),
+        )
+
+    @property
+    def published_at(self) -> datetime:
+        return from_timestamp(self.published_ts)
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        return from_timestamp(self.created_ts)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS and getattr(self, key) is not None
+
+    def to_article(self) -> Dict[str, Any]:
+        """قاموس المقال كما تنتجه الخدمات"""
+        article = {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'source': self.source,
+            'published_at': self.published_at,
+            'published_ts': self.published_ts,
+            'category': self.category,
+            'is_breaking': self.is_breaking,
+            'url': self.url,
+            'image_url': self.image_url,
+            'created_at': self.created_at,
+        }
+        if self.website is not None:
+            article['website'] = self.website
+        return article
+
+    def __repr__(self) -> str:
+        return f"ArticleRecord(id={self.id!r}, source={self.source!r}, published_at={self.published_at!r})"
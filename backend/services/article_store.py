@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from services.article_record import to_local_time, to_timestamp
+from services.article_timeline import ArticleFilters
+
+logger = logging.getLogger(__name__)
+
+# الحقول المحفوظة لكل مقال (المعرف يُحفظ في _id)
+ARTICLE_FIELDS = (
+    'title', 'description', 'source', 'published_at', 'category',
+    'is_breaking', 'url', 'image_url', 'website'
+)
+
+
+class ArticleStore:
+    """حفظ المقالات في MongoDB بمعرفات ثابتة عبر upsert جماعي"""
+
+    def __init__(self, db, collection_name: str = "news_articles"):
+        self.collection = db[collection_name]
+        self._pending = set()
+
+    async def ensure_indexes(self):
+        """إنشاء الفهارس المستخدمة في الاستعلامات"""
+        await self.collection.create_index([("published_at", DESCENDING)])
+        await self.collection.create_index([("source", ASCENDING), ("published_at", DESCENDING)])
+        await self.collection.create_index([("category", ASCENDING), ("published_at", DESCENDING)])
+        # ترتيب القائمة المقسمة إلى صفحات: (published_at, _id) مع المرشحات الشائعة
+        await self.collection.create_index([("published_at", DESCENDING), ("_id", DESCENDING)])
+        await self.collection.create_index(
+            [("source", ASCENDING), ("published_at", DESCENDING), ("_id", DESCENDING)]
+        )
+        await self.collection.create_index(
+            [("is_breaking", ASCENDING), ("published_at", DESCENDING), ("_id", DESCENDING)]
+        )
+
+    async def upsert_articles(self, articles: Iterable[Dict[str, Any]]) -> int:
+        """إدراج المقالات الجديدة وتحديث الموجودة في عملية جماعية واحدة غير مرتبة
+
+        يُحفظ created_at عند أول إدراج فقط.
+        """
+        now = datetime.utcnow()
+        operations = []
+        for article in articles:
+            if article.get('is_placeholder'):
+                continue
+            fields = {field: article.get(field) for field in ARTICLE_FIELDS if field in article}
+            fields['is_breaking'] = article.get('is_breaking', False)
+            fields['updated_at'] = now
+            operations.append(UpdateOne(
+                {"_id": article['id']},
+                {"$set": fields, "$setOnInsert": {"created_at": article.get('created_at') or now}},
+                upsert=True
+            ))
+
+        if not operations:
+            return 0
+
+        result = await self.collection.bulk_write(operations, ordered=False)
+        return result.upserted_count
+
+    def persist_in_background(self, source_name: str, articles: List[Dict[str, Any]]):
+        """حفظ نتائج مصدر دون انتظار (يُسجَّل كمستمع على FeedStore)"""
+        task = asyncio.create_task(self._persist(source_name, articles))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _persist(self, source_name: str, articles: List[Dict[str, Any]]):
+        try:
+            inserted = await self.upsert_articles(articles)
+            logger.info(f"Persisted {len(articles)} articles from {source_name} ({inserted} new)")
+        except Exception as e:
+            logger.error(f"Error persisting articles from {source_name}: {str(e)}")
+
+    async def latest_by_source(self, source_names: Iterable[str], limit: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+        """أحدث المقالات المحفوظة لكل مصدر"""
+        results = {}
+        for name in source_names:
+            cursor = self.collection.find({"source": name}).sort("published_at", DESCENDING).limit(limit)
+            results[name] = [self.to_article(document) async for document in cursor]
+        return results
+
+    async def last_saved_at(self, article_ids: Iterable[str]) -> Optional[datetime]:
+        """آخر وقت حُفظ فيه أحد هذه المقالات (بالتوقيت المحلي كأوقات الجلب في FeedStore)"""
+        document = await self.collection.find_one(
+            {"_id": {"$in": list(article_ids)}}, {"updated_at": 1}, sort=[("updated_at", DESCENDING)]
+        )
+        return to_local_time(document.get("updated_at")) if document is not None else None
+
+    async def recent_articles(self, source_names: Iterable[str], limit: int = 1000) -> List[Dict[str, Any]]:
+        """أحدث المقالات المحفوظة من مجموعة مصادر (الأحدث أولاً)"""
+        cursor = self.collection.find({"source": {"$in": list(source_names)}}).sort("published_at", DESCENDING).limit(limit)
+        return [self.to_article(document) async for document in cursor]
+
+    async def page_articles(
+        self, filters: ArticleFilters, after: Optional[Tuple[datetime, str]] = None, limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """صفحة من المقالات (الأحدث أولاً) بعد المؤشر after على (published_at, _id)
+
+        الشرط على المؤشر يستخدم الفهرس مباشرة، فكلفة الصفحة العميقة مثل الأولى.
+        تُرجع (المقالات، هل توجد صفحة تالية).
+        """
+        query: Dict[str, Any] = {}
+        if filters.sources:
+            query["source"] = {"$in": list(filters.sources)}
+        if filters.category:
+            query["category"] = filters.category
+        if filters.is_breaking is not None:
+            query["is_breaking"] = filters.is_breaking
+        published_at: Dict[str, Any] = {}
+        if filters.since is not None:
+            published_at["$gte"] = filters.since
+        if filters.until is not None:
+            published_at["$lt"] = filters.until
+        if published_at:
+            query["published_at"] = published_at
+        if after is not None:
+            after_published_at, after_id = after
+            query = {"$and": [query, {"$or": [
+                {"published_at": {"$lt": after_published_at}},
+                {"published_at": after_published_at, "_id": {"$lt": after_id}},
+            ]}]}
+
+        cursor = self.collection.find(query).sort(
+            [("published_at", DESCENDING), ("_id", DESCENDING)]
+        ).limit(limit + 1)
+        articles = [self.to_article(document) async for document in cursor]
+        return articles[:limit], len(articles) > limit
+
+    @staticmethod
+    def to_article(document: Dict[str, Any]) -> Dict[str, Any]:
+        """تحويل مستند MongoDB إلى قاموس المقال المستخدم في الخدمات"""
+        article = {field: document.get(field) for field in ARTICLE_FIELDS if field in document}
+        article['id'] = document['_id']
+        article['published_ts'] = to_timestamp(article.get('published_at'))
+        article['created_at'] = document.get('created_at')
+        return article
+
+    async def close(self):
+        """انتظار عمليات الحفظ الجارية"""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
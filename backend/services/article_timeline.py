@@ -0,0 +1,195 @@
+import base64
+import bisect
+import heapq
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from services.article_record import ArticleRecord, to_timestamp
+
+
+class ArticleFilters(NamedTuple):
+    """مرشحات قائمة المقالات (None = بدون ترشيح)
+
+    المدى الزمني (since / until) يُطبق على مفتاح الترتيب وليس في accepts.
+    """
+    sources: Optional[Tuple[str, ...]] = None
+    category: Optional[str] = None
+    is_breaking: Optional[bool] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    def accepts(self, record: ArticleRecord) -> bool:
+        if self.sources and record.source not in self.sources:
+            return False
+        if self.category and record.category != self.category:
+            return False
+        if self.is_breaking is not None and record.is_breaking != self.is_breaking:
+            return False
+        return True
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(article: Dict[str, Any]) -> str:
+    """مؤشر الصفحة التالية: (published_at, id) لآخر مقال في الصفحة، بصيغة غير شفافة للعميل"""
+    raw = json.dumps([article['published_at'].isoformat(), article['id']]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        published_at, article_id = json.loads(raw)
+        return datetime.fromisoformat(published_at), str(article_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"invalid cursor: {cursor}") from e
+
+
+# دفعة أصغر من هذا تُدرج مفتاحاً مفتاحاً بالبحث الثنائي (نقل ذاكرة فقط)؛ الأكبر تُلحق ثم تُرتب
+# القائمة مرة واحدة بدل إدراج تربيعي
+BATCH_SORT_MIN = 64
+
+
+def _insert_keys(keys: List[Tuple[int, str]], added: List[Tuple[int, str]]):
+    """إدراج مفاتيح جديدة في قائمة مرتبة"""
+    added.sort()
+    if not keys or added[0] > keys[-1]:
+        # الحالة الغالبة: مقالات أحدث من كل ما سبق
+        keys.extend(added)
+    elif len(added) < BATCH_SORT_MIN:
+        for key in added:
+            bisect.insort(keys, key)
+    else:
+        keys.extend(added)
+        keys.sort()
+
+
+def _remove_keys(keys: List[Tuple[int, str]], removed: List[Tuple[int, str]]):
+    """حذف مفاتيح موجودة من قائمة مرتبة"""
+    if len(removed) < BATCH_SORT_MIN:
+        for key in removed:
+            index = bisect.bisect_left(keys, key)
+            if index < len(keys) and keys[index] == key:
+                del keys[index]
+    else:
+        removed_set = set(removed)
+        keys[:] = [key for key in keys if key not in removed_set]
+
+
+class ArticleTimeline:
+    """كل المقالات المجلوبة مرتبة زمنياً في الذاكرة (بديل MongoDB عند عدم توفره)
+
+    المفاتيح (published_ts, id) في قوائم مرتبة: قائمة لكل المقالات وقائمة لكل مصدر وتصنيف
+    وقيمة is_breaking. تبدأ كل صفحة بالبحث الثنائي عن المؤشر في أقصر قائمة تحوي كل المقالات
+    المطابقة، بدل تخطي الصفحات السابقة أو المقالات غير المطابقة. مفاتيح كل دفعة تُدرج معاً
+    (انظر _insert_keys). يُحتفظ بأحدث max_articles مقال بتمثيل ArticleRecord المضغوط.
+    """
+
+    def __init__(self, max_articles: int = 50000):
+        self.max_articles = max_articles
+        self._keys: List[Tuple[int, str]] = []
+        self._by_source: Dict[str, List[Tuple[int, str]]] = {}
+        self._by_category: Dict[str, List[Tuple[int, str]]] = {}
+        self._by_breaking: Dict[bool, List[Tuple[int, str]]] = {}
+        self._articles: Dict[str, ArticleRecord] = {}
+
+    def __len__(self) -> int:
+        return len(self._articles)
+
+    def _lists(self, record: ArticleRecord) -> List[List[Tuple[int, str]]]:
+        """قوائم المفاتيح التي يظهر فيها المقال"""
+        return [
+            self._keys,
+            self._by_source.setdefault(record.source, []),
+            self._by_category.setdefault(record.category, []),
+            self._by_breaking.setdefault(record.is_breaking, []),
+        ]
+
+    def _keys_by_list(self, records: Iterable[ArticleRecord]) -> Iterable[Tuple[List, List[Tuple[int, str]]]]:
+        """مفاتيح المقالات مجمعة حسب القائمة التي تنتمي إليها"""
+        grouped: Dict[int, Tuple[List, List[Tuple[int, str]]]] = {}
+        for record in records:
+            for keys in self._lists(record):
+                grouped.setdefault(id(keys), (keys, []))[1].append((record.published_ts, record.id))
+        return grouped.values()
+
+    def add_articles(self, articles: Iterable[Dict[str, Any]]):
+        # المقالات التي تغير موقعها في القوائم (وقت النشر أو المصدر أو التصنيف) تُحذف مفاتيحها
+        # القديمة وتُضاف الجديدة بعد الدفعة كلها
+        stale: List[ArticleRecord] = []
+        fresh: Dict[str, ArticleRecord] = {}
+        for article in articles:
+            if article.get('is_placeholder'):
+                continue
+            record = ArticleRecord.from_article(article)
+            existing = self._articles.get(record.id)
+            self._articles[record.id] = record
+            if record.id in fresh or existing is None:
+                fresh[record.id] = record
+            elif (existing.published_ts, existing.source, existing.category, existing.is_breaking) != (
+                record.published_ts, record.source, record.category, record.is_breaking
+            ):
+                stale.append(existing)
+                fresh[record.id] = record
+
+        for keys, removed in self._keys_by_list(stale):
+            _remove_keys(keys, removed)
+        for keys, added in self._keys_by_list(fresh.values()):
+            _insert_keys(keys, added)
+
+        if len(self._keys) > self.max_articles:
+            dropped = self._keys[:len(self._keys) - self.max_articles]
+            del self._keys[:len(dropped)]
+            # الأقدم في كل القوائم هو نفسه الأقدم في القائمة الكاملة
+            for index in (self._by_source, self._by_category, self._by_breaking):
+                for keys in index.values():
+                    del keys[:bisect.bisect_right(keys, dropped[-1])]
+            for _, article_id in dropped:
+                self._articles.pop(article_id, None)
+
+    def _candidate_lists(self, filters: ArticleFilters) -> List[List[Tuple[int, str]]]:
+        """أقصر قوائم مفاتيح تحوي كل المقالات المطابقة (عدة قوائم عند ترشيح عدة مصادر)"""
+        options = [[self._keys]]
+        if filters.sources:
+            options.append([self._by_source.get(source, []) for source in set(filters.sources)])
+        if filters.category:
+            options.append([self._by_category.get(filters.category, [])])
+        if filters.is_breaking is not None:
+            options.append([self._by_breaking.get(filters.is_breaking, [])])
+        return min(options, key=lambda lists: sum(map(len, lists)))
+
+    def page(
+        self, filters: ArticleFilters, after: Optional[Tuple[datetime, str]] = None, limit: int = 20
+    ) -> Tuple[List[ArticleRecord], bool]:
+        """صفحة من المقالات (الأحدث أولاً) بعد المؤشر after؛ تُرجع (المقالات، هل توجد صفحة تالية)"""
+        bounds = []
+        if after is not None:
+            bounds.append((to_timestamp(after[0]), after[1]))
+        if filters.until is not None:
+            bounds.append((to_timestamp(filters.until), ''))
+        bound = min(bounds) if bounds else None
+        since = to_timestamp(filters.since)
+
+        def newest_first(keys: List[Tuple[int, str]]) -> Iterator[Tuple[int, str]]:
+            index = len(keys) if bound is None else bisect.bisect_left(keys, bound)
+            return (keys[position] for position in range(index - 1, -1, -1))
+
+        lists = self._candidate_lists(filters)
+        if len(lists) == 1:
+            keys = newest_first(lists[0])
+        else:
+            keys = heapq.merge(*map(newest_first, lists), reverse=True)
+
+        results = []
+        for published_ts, article_id in keys:
+            if since is not None and published_ts < since:
+                break
+            article = self._articles[article_id]
+            if filters.accepts(article):
+                results.append(article)
+                if len(results) > limit:
+                    break
+        return results[:limit], len(results) > limit
@@ -0,0 +1,242 @@
+import logging
+import math
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# حالات قاطع الدائرة
+STATE_CLOSED = "closed"        # الطلبات تمر عادياً
+STATE_OPEN = "open"            # المصدر معطل: لا طلبات حتى انتهاء مهلة الفتح
+STATE_HALF_OPEN = "half_open"  # طلب تجريبي واحد يقرر الإغلاق أو إعادة الفتح
+
+
+class CircuitOpenError(Exception):
+    """رفض الطلب لأن قاطع دائرة المصدر مفتوح"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"circuit open for {name}, retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """النسبة المئوية بطريقة أقرب رتبة من قائمة مرتبة"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class CircuitBreaker:
+    """قاطع دائرة لمصدر واحد مع إحصاءات زمن الاستجابة ونسبة الأخطاء
+
+    يُفتح بعد failure_threshold إخفاقات متتالية لمدة تتضاعف مع كل فتح جديد
+    (open_seconds ثم 2x ثم 4x... حتى max_open_seconds)، ثم يسمح بطلب تجريبي واحد.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        open_seconds: float = 60,
+        max_open_seconds: float = 3600,
+        window: int = 100,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.open_until: Optional[float] = None
+        self.trial_in_flight = False
+
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.last_success: Optional[datetime] = None
+        self.last_failure: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.rejected = 0
+
+    def retry_after(self) -> float:
+        if self.open_until is None:
+            return 0.0
+        return max(0.0, self.open_until - time.monotonic())
+
+    def allow(self) -> bool:
+        """هل يُسمح بطلب الآن؟ (قد ينقل القاطع من مفتوح إلى نصف مفتوح)"""
+        if self.state == STATE_OPEN and self.retry_after() <= 0:
+            self.state = STATE_HALF_OPEN
+            logger.info(f"Circuit for {self.name} half-open, sending a trial request")
+        if self.state == STATE_HALF_OPEN:
+            if self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+            return True
+        return self.state == STATE_CLOSED
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.outcomes.append(True)
+        self.last_success = datetime.now()
+        self.trial_in_flight = False
+        if self.state != STATE_CLOSED:
+            logger.info(f"Circuit for {self.name} closed after successful trial")
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.open_until = None
+
+    def record_failure(self, latency: float, error: str):
+        self.latencies.append(latency)
+        self.outcomes.append(False)
+        self.last_failure = datetime.now()
+        self.last_error = error
+        self.trial_in_flight = False
+        self.consecutive_failures += 1
+        if self.state == STATE_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        duration = min(self.open_seconds * (2 ** self.times_opened), self.max_open_seconds)
+        self.times_opened += 1
+        self.state = STATE_OPEN
+        self.open_until = time.monotonic() + duration
+        logger.warning(
+            f"Circuit for {self.name} opened for {duration:.0f}s "
+            f"after {self.consecutive_failures} failures ({self.last_error})"
+        )
+
+    def export(self) -> Dict[str, Any]:
+        """حالة القاطع لنشرها لبقية العمال (مهلة الفتح بوقت الساعة لأن monotonic خاص بكل عملية)"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "open_until": time.time() + self.retry_after() if self.open_until is not None else None,
+            "latencies": list(self.latencies),
+            "outcomes": list(self.outcomes),
+            "last_success": self.last_success,
+            "last_failure": self.last_failure,
+            "last_error": self.last_error,
+            "rejected": self.rejected,
+        }
+
+    def apply(self, exported: Dict[str, Any]):
+        """اعتماد حالة نشرها القائد (على غير القائد، لعرضها فقط)"""
+        self.state = exported["state"]
+        self.consecutive_failures = exported["consecutive_failures"]
+        self.times_opened = exported["times_opened"]
+        self.open_until = None
+        if exported["open_until"] is not None:
+            self.open_until = time.monotonic() + exported["open_until"] - time.time()
+        self.latencies.clear()
+        self.latencies.extend(exported["latencies"])
+        self.outcomes.clear()
+        self.outcomes.extend(exported["outcomes"])
+        self.last_success = exported["last_success"]
+        self.last_failure = exported["last_failure"]
+        self.last_error = exported["last_error"]
+        self.rejected = exported["rejected"]
+
+    def health(self) -> Dict[str, Any]:
+        """ملخص حالة المصدر لنقطة /api/sources/health"""
+        latencies = sorted(self.latencies)
+        return {
+            "state": self.state,
+            "latency_ms": {
+                name: round(value * 1000, 1) if value is not None else None
+                for name, value in (
+                    ("p50", percentile(latencies, 0.5)),
+                    ("p95", percentile(latencies, 0.95)),
+                    ("p99", percentile(latencies, 0.99)),
+                )
+            },
+            "error_rate": round(self.outcomes.count(False) / len(self.outcomes), 3) if self.outcomes else None,
+            "requests": len(self.outcomes),
+            "consecutive_failures": self.consecutive_failures,
+            "rejected": self.rejected,
+            "retry_after": round(self.retry_after(), 1) if self.state == STATE_OPEN else None,
+            "last_success": self.last_success,
+            "last_failure": self.last_failure,
+            "last_error": self.last_error,
+        }
+
+
+class CircuitBreakers:
+    """قواطع الدائرة لمجموعة مصادر، تُنشأ عند أول استخدام لكل مصدر"""
+
+    def __init__(self, failure_threshold: int = 3, open_seconds: float = 60, max_open_seconds: float = 3600):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreakers":
+        return cls(
+            failure_threshold=int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 3)),
+            open_seconds=float(os.environ.get('CIRCUIT_OPEN_SECONDS', 60)),
+            max_open_seconds=float(os.environ.get('CIRCUIT_MAX_OPEN_SECONDS', 3600)),
+        )
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(
+                name, self.failure_threshold, self.open_seconds, self.max_open_seconds
+            )
+        return breaker
+
+    async def call(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        *args,
+        failed: Optional[Callable[[Any], Optional[str]]] = None,
+    ) -> Any:
+        """تنفيذ func عبر قاطع دائرة المصدر
+
+        failed: تفحص النتيجة وتُرجع سبب الفشل (أو None إذا نجحت)، للدوال التي
+        لا ترفع استثناءً عند فشل المصدر. ترفع CircuitOpenError إذا كان القاطع مفتوحاً.
+        """
+        breaker = self.get(name)
+        if not breaker.allow():
+            breaker.rejected += 1
+            raise CircuitOpenError(name, breaker.retry_after())
+
+        started = time.monotonic()
+        try:
+            result = await func(*args)
+        except BaseException as e:
+            # الإلغاء ليس فشلاً للمصدر، لكنه يحرر الطلب التجريبي
+            if isinstance(e, Exception):
+                breaker.record_failure(time.monotonic() - started, str(e) or type(e).__name__)
+            else:
+                breaker.trial_in_flight = False
+            raise
+
+        error = failed(result) if failed is not None else None
+        if error is None:
+            breaker.record_success(time.monotonic() - started)
+        else:
+            breaker.record_failure(time.monotonic() - started, error)
+        return result
+
+    def export(self) -> Dict[str, Dict[str, Any]]:
+        """حالة كل القواطع لنشرها لبقية العمال (انظر worker_coordinator)"""
+        return {name: breaker.export() for name, breaker in self._breakers.items()}
+
+    def apply(self, exported: Dict[str, Dict[str, Any]]):
+        for name, state in exported.items():
+            self.get(name).apply(state)
+
+    def health(self, names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        names = list(self._breakers) if names is None else names
+        return {name: self.get(name).health() for name in names}
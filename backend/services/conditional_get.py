@@ -0,0 +1,78 @@
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FeedValidators:
+    """محددات التحقق (ETag / Last-Modified) لآخر نسخة كاملة من feed مع نتيجتها المحللة"""
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], body_size: int, parsed: Any):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body_size = body_size
+        self.parsed = parsed
+
+
+class ConditionalGetCache:
+    """تخزين محددات التحقق لكل رابط لإرسال طلبات GET مشروطة وإعادة استخدام النتيجة عند 304"""
+
+    def __init__(self):
+        self._validators: Dict[str, FeedValidators] = {}
+        self.stats = {
+            "conditional_requests": 0,
+            "not_modified": 0,
+            "bytes_saved": 0,
+            "parses_saved": 0,
+        }
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """ترويسات If-None-Match / If-Modified-Since للطلب التالي على هذا الرابط"""
+        validators = self._validators.get(url)
+        if validators is None:
+            return {}
+
+        headers = {}
+        if validators.etag:
+            headers["If-None-Match"] = validators.etag
+        if validators.last_modified:
+            headers["If-Modified-Since"] = validators.last_modified
+        if headers:
+            self.stats["conditional_requests"] += 1
+        return headers
+
+    def not_modified(self, url: str) -> Optional[Any]:
+        """النتيجة المحللة السابقة عند استلام 304، أو None إذا لم تكن محفوظة"""
+        validators = self._validators.get(url)
+        if validators is None:
+            return None
+
+        self.stats["not_modified"] += 1
+        self.stats["bytes_saved"] += validators.body_size
+        self.stats["parses_saved"] += 1
+        return validators.parsed
+
+    def remember(self, url: str, response_headers, body_size: int, parsed: Any):
+        """حفظ محددات التحقق من استجابة 200 مع نتيجتها المحللة"""
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not etag and not last_modified:
+            # لا فائدة من الحفظ إذا كان الخادم لا يدعم الطلبات المشروطة
+            self._validators.pop(url, None)
+            return
+        self._validators[url] = FeedValidators(etag, last_modified, body_size, parsed)
+
+    def forget(self, url: str):
+        self._validators.pop(url, None)
+
+    def export(self) -> Dict[str, tuple]:
+        """محددات التحقق لكل رابط (لحفظها مع لقطة القرص)"""
+        return {
+            url: (validators.etag, validators.last_modified, validators.body_size, validators.parsed)
+            for url, validators in self._validators.items()
+        }
+
+    def restore(self, exported: Dict[str, tuple]):
+        """استعادة محددات محفوظة؛ أول طلب بعد الإقلاع يكون مشروطاً"""
+        for url, (etag, last_modified, body_size, parsed) in exported.items():
+            self._validators.setdefault(url, FeedValidators(etag, last_modified, body_size, parsed))
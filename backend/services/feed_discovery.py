@@ -0,0 +1,290 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from html.parser import HTMLParser
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import aiohttp
+
+from services.feed_stream import read_feed
+from services.http_client import HttpClient, http_client
+
+logger = logging.getLogger(__name__)
+
+# مسارات الـ feed الشائعة التي تُجرب عند فشل الرابط الأساسي
+ALTERNATIVE_FEED_PATHS = ("/feed", "/rss", "/feed.xml", "/rss.xml", "/feeds/all.xml")
+
+# أنواع روابط <link rel="alternate"> التي تشير إلى feed
+FEED_LINK_TYPES = ("application/rss+xml", "application/atom+xml", "application/xml", "text/xml")
+
+# يكفي بداية الصفحة الرئيسية لقراءة وسم <head>
+HOMEPAGE_MAX_BYTES = 256 * 1024
+
+
+class _AlternateLinkParser(HTMLParser):
+    """استخراج روابط الـ feed من وسوم <link rel="alternate"> حتى نهاية <head>"""
+
+    def __init__(self):
+        super().__init__()
+        self.links: List[str] = []
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "body":
+            self.done = True
+            return
+        if tag != "link":
+            return
+        attributes = {key: (value or "") for key, value in attrs}
+        rel = attributes.get("rel", "").lower().split()
+        link_type = attributes.get("type", "").lower().split(";")[0].strip()
+        if "alternate" in rel and link_type in FEED_LINK_TYPES and attributes.get("href"):
+            self.links.append(attributes["href"].strip())
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.done = True
+
+
+def find_feed_links(html: str, base_url: str) -> List[str]:
+    """روابط الـ feed المعلنة في الصفحة (مطلقة وبدون تكرار)"""
+    parser = _AlternateLinkParser()
+    try:
+        parser.feed(html)
+    except Exception as e:
+        logger.debug(f"Could not parse homepage {base_url}: {str(e)}")
+    return list(dict.fromkeys(urljoin(base_url, link) for link in parser.links))
+
+
+def _failure_reason(error: BaseException) -> str:
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.message
+    return str(error) or type(error).__name__
+
+
+class DiscoveredFeed:
+    """رابط feed بديل نجح لصحيفة ما"""
+
+    __slots__ = ("url", "validated_at")
+
+    def __init__(self, url: str, validated_at: datetime):
+        self.url = url
+        self.validated_at = validated_at
+
+
+class FeedDiscovery:
+    """اكتشاف روابط feed بديلة للمصادر التي فشل رابطها الأساسي
+
+    - تُجرب المسارات الشائعة وروابط <link rel="alternate"> من الصفحة الرئيسية بالتوازي،
+      ويُعتمد أول رابط يحتوي feed صالحاً
+    - يُحفظ الرابط الفائز لكل مصدر (وفي MongoDB عند توفرها) ويُعاد التحقق من الرابط
+      الأساسي بعد revalidate_after ثانية
+    - المصدر الذي لم يُعثر له على أي feed لا يُعاد فحصه قبل انتهاء مهلة cooldown
+    """
+
+    def __init__(
+        self,
+        http: Optional[HttpClient] = None,
+        probe_timeout: float = 10,
+        revalidate_after: float = 6 * 3600,
+        cooldown: float = 1800,
+    ):
+        self.http = http or http_client
+        self.probe_timeout = aiohttp.ClientTimeout(total=probe_timeout)
+        self.revalidate_after = timedelta(seconds=revalidate_after)
+        self.cooldown = cooldown
+        self._discovered: Dict[str, DiscoveredFeed] = {}
+        self._dead_until: Dict[str, float] = {}
+        self._collection = None
+        self._pending = set()
+
+    @classmethod
+    def from_env(cls, http: Optional[HttpClient] = None) -> "FeedDiscovery":
+        return cls(
+            http=http,
+            probe_timeout=float(os.environ.get('FEED_DISCOVERY_PROBE_TIMEOUT', 10)),
+            revalidate_after=float(os.environ.get('FEED_DISCOVERY_REVALIDATE_AFTER', 6 * 3600)),
+            cooldown=float(os.environ.get('FEED_DISCOVERY_COOLDOWN', 1800)),
+        )
+
+    def feed_url(self, source: Dict[str, Any]) -> str:
+        """الرابط الذي يُجلب منه المصدر الآن: البديل المكتشف، أو الأساسي عند حلول إعادة التحقق"""
+        discovered = self._discovered.get(source["name"])
+        if discovered is None:
+            return source["url"]
+        if datetime.utcnow() - discovered.validated_at >= self.revalidate_after:
+            return source["url"]
+        return discovered.url
+
+    def in_cooldown(self, name: str) -> bool:
+        dead_until = self._dead_until.get(name)
+        return dead_until is not None and time.monotonic() < dead_until
+
+    def confirm(self, source: Dict[str, Any], url: str):
+        """تسجيل نجاح الجلب من رابط؛ نجاح الرابط الأساسي يلغي البديل المحفوظ"""
+        name = source["name"]
+        self._dead_until.pop(name, None)
+        if url == source["url"] and name in self._discovered:
+            logger.info(f"Primary feed of {name} is back, dropping discovered {self._discovered[name].url}")
+            self.forget(name)
+
+    def forget(self, name: str):
+        """إلغاء الرابط البديل المحفوظ لمصدر (مثلاً بعد توقفه عن العمل)"""
+        if self._discovered.pop(name, None) is not None and self._collection is not None:
+            self._in_background(self._collection.delete_one({"_id": name}))
+
+    def _remember(self, name: str, url: str):
+        discovered = self._discovered[name] = DiscoveredFeed(url, datetime.utcnow())
+        self._dead_until.pop(name, None)
+        if self._collection is not None:
+            self._in_background(self._collection.replace_one(
+                {"_id": name},
+                {"url": url, "validated_at": discovered.validated_at},
+                upsert=True
+            ))
+
+    def candidate_urls(self, source: Dict[str, Any]) -> List[str]:
+        """الروابط المرشحة بترتيب الأفضلية (البديل المحفوظ، ثم الأساسي، ثم المسارات الشائعة)"""
+        website = source["website"].rstrip("/")
+        candidates = []
+        discovered = self._discovered.get(source["name"])
+        if discovered is not None:
+            candidates.append(discovered.url)
+        candidates.append(source["url"])
+        candidates.extend(f"{website}{path}" for path in ALTERNATIVE_FEED_PATHS)
+        return list(dict.fromkeys(candidates))
+
+    async def _get(self, url: str, read: Callable[[Any], Awaitable[Any]]) -> Any:
+        async with self.http.get(url, timeout=self.probe_timeout) as response:
+            if response.status != 200:
+                raise aiohttp.ClientResponseError(
+                    response.request_info, response.history,
+                    status=response.status, message=f"HTTP {response.status}"
+                )
+            return await read(response)
+
+    async def _download_feed(self, url: str, max_entries: Optional[int]) -> bytes:
+        body = await self._get(url, lambda response: read_feed(response, max_entries))
+        return body.content
+
+    async def _download_page(self, url: str) -> str:
+        async def read_head(response) -> str:
+            body = bytearray()
+            while len(body) < HOMEPAGE_MAX_BYTES:
+                chunk = await response.content.read(HOMEPAGE_MAX_BYTES - len(body))
+                if not chunk:
+                    break
+                body.extend(chunk)
+            return body.decode(response.charset or "utf-8", errors="replace")
+
+        return await self._get(url, read_head)
+
+    async def homepage_feed_links(self, website: str) -> List[str]:
+        """روابط الـ feed المعلنة في الصفحة الرئيسية للموقع"""
+        html = await self._download_page(website)
+        return find_feed_links(html, website)
+
+    async def discover(
+        self,
+        source: Dict[str, Any],
+        validate: Callable[[bytes], Awaitable[Optional[Any]]],
+        exclude: Tuple[str, ...] = (),
+        max_entries: Optional[int] = None,
+    ) -> Optional[Tuple[str, Any]]:
+        """البحث عن رابط feed صالح للمصدر وإرجاع (الرابط، نتيجة validate)
+
+        validate: تحلل محتوى الرابط وتُرجع None إذا لم يكن feed صالحاً.
+        exclude: روابط فشلت للتو ولا داعي لتجربتها مجدداً.
+        max_entries: عدد المدخلات المقروءة من كل رابط مرشح.
+        تُرجع None إذا لم يُعثر على أي رابط أو كان المصدر في فترة التهدئة.
+        """
+        name = source["name"]
+        if self.in_cooldown(name):
+            logger.info(f"Skipping feed discovery for {name}: no working feed found recently")
+            return None
+
+        failures: Dict[str, str] = {}
+        probes: Dict[asyncio.Task, str] = {}
+
+        async def probe(url: str) -> Optional[Any]:
+            try:
+                result = await validate(await self._download_feed(url, max_entries))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures[url] = _failure_reason(e)
+                return None
+            if result is None:
+                failures[url] = "not a feed"
+            return result
+
+        def start(url: str) -> Optional[asyncio.Task]:
+            if url in exclude or url in probes.values():
+                return None
+            task = asyncio.create_task(probe(url))
+            probes[task] = url
+            return task
+
+        # الصفحة الرئيسية أولاً حتى لا تنتظر خلف بقية المحاولات على نفس المضيف
+        homepage = asyncio.create_task(self.homepage_feed_links(source["website"]))
+        for url in self.candidate_urls(source):
+            start(url)
+        pending = set(probes) | {homepage}
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task is homepage:
+                        if task.exception() is not None:
+                            failures[source["website"]] = _failure_reason(task.exception())
+                            continue
+                        for url in task.result():
+                            new_probe = start(url)
+                            if new_probe is not None:
+                                pending.add(new_probe)
+                        continue
+
+                    result = task.result()
+                    if result is not None:
+                        url = probes[task]
+                        logger.info(f"Discovered feed for {name}: {url}")
+                        self._remember(name, url)
+                        return url, result
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self._dead_until[name] = time.monotonic() + self.cooldown
+        reasons = "; ".join(f"{url}: {reason}" for url, reason in failures.items())
+        logger.warning(f"No working feed found for {name}, retrying in {self.cooldown:.0f}s ({reasons})")
+        return None
+
+    async def attach(self, collection):
+        """تحميل الروابط المكتشفة سابقاً من MongoDB وحفظ ما يُكتشف لاحقاً فيها"""
+        async for document in collection.find({}):
+            self._discovered[document["_id"]] = DiscoveredFeed(document["url"], document["validated_at"])
+        self._collection = collection
+        if self._discovered:
+            logger.info(f"Restored {len(self._discovered)} discovered feed URLs")
+
+    def _in_background(self, operation: Awaitable):
+        async def run():
+            try:
+                await operation
+            except Exception as e:
+                logger.error(f"Error saving discovered feed: {str(e)}")
+
+        task = asyncio.create_task(run())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def close(self):
+        """انتظار عمليات الحفظ الجارية"""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
@@ -0,0 +1,59 @@
+import calendar
+import hashlib
+import re
+import time
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# أدوات مشتركة لتحليل مدخلات feedparser، تعمل داخل منفذ التحليل (خيوط أو عمليات)
+
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# معاملات التتبع التي لا تغير المقال
+TRACKING_PARAMS = {'fbclid', 'gclid', 'ocid', 'ref', 'cmpid'}
+
+
+def strip_html(text: str) -> str:
+    """إزالة وسوم HTML من النص"""
+    return HTML_TAG_RE.sub('', text or '')
+
+
+def entry_published_ts(entry: Any) -> int:
+    """وقت نشر المدخل بثواني UTC، أو الوقت الحالي إذا لم يكن متوفراً
+
+    feedparser يحوّل التواريخ المحللة إلى UTC، فتُقرأ بـ timegm وليس كوقت محلي.
+    """
+    for field in ('published_parsed', 'updated_parsed'):
+        if entry.get(field):
+            return calendar.timegm(entry[field])
+    return int(time.time())
+
+
+def entry_image_url(entry: Any) -> Optional[str]:
+    """رابط صورة المدخل إذا وجدت"""
+    if entry.get('media_thumbnail'):
+        return entry['media_thumbnail'][0].get('url')
+    for enclosure in entry.get('enclosures') or []:
+        if enclosure.get('type', '').startswith('image/'):
+            return enclosure.get('href')
+    return None
+
+
+def canonical_url(url: str) -> str:
+    """توحيد رابط المقال: حذف معاملات التتبع والجزء بعد # والشرطة الأخيرة"""
+    url = (url or '').strip()
+    if not url:
+        return ''
+    parts = urlsplit(url)
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def make_article_id(source: str, url: str, title: str = '') -> str:
+    """معرف ثابت للمقال مشتق من المصدر والرابط الموحد (أو العنوان إذا لم يوجد رابط)"""
+    key = canonical_url(url) or title.strip()
+    return hashlib.sha1(f"{source}\n{key}".encode('utf-8')).hexdigest()
@@ -0,0 +1,293 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.feed_store import FeedStore, has_real_articles
+from services.metrics import FETCH_SECONDS
+from services.source_registry import SourceRegistry
+
+logger = logging.getLogger(__name__)
+
+# أولويات طابور الجلب: المصادر المطلوب تحديثها يدوياً تتقدم على المستحقة دورياً
+PRIORITY_BUMPED = 0
+PRIORITY_DUE = 1
+
+# حالة نتائج المصدر كما تظهر في الاستجابة
+SOURCE_FRESH = "fresh"      # آخر جلب نجح
+SOURCE_STALE = "stale"      # آخر نتيجة معروفة (الجلب فشل أو تأخر أو نتيجة مستعادة)
+SOURCE_MISSING = "missing"  # لا توجد أي نتيجة لهذا المصدر
+
+
+class FeedScheduler:
+    """جدولة دورية لجلب كل مصدر على حدة وكتابة النتائج في FeedStore
+
+    لكل مصدر فترة تحديث خاصة (poll_interval إن وجدت) مع تذبذب عشوائي،
+    وتأخير أُسّي عند الفشل. الجلب يمر عبر طابور أولويات يخدمه عدد محدود من العمال
+    (وبين المصادر المستحقة معاً يتقدم الأعلى priority).
+    المصادر المضافة إلى السجل أثناء التشغيل تُجلب فوراً، والمحذوفة تخرج من الجدولة.
+    في وضع passive (عامل غير قائد) لا يُجلب شيء، والمخزن والمواعيد تأتي من القائد،
+    وطلبات التحديث (bump) تُحال إلى القائد عبر forward_bump.
+    failed تفحص نتيجة الجلب وتُرجع سبب الفشل أو None (نفس الدالة المعطاة لقاطع الدائرة)؛
+    النتيجة الفاشلة لا تحل محل آخر مقالات حقيقية.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sources: SourceRegistry,
+        fetch: Callable[[Dict[str, Any]], Awaitable[List[Dict[str, Any]]]],
+        store: FeedStore,
+        on_update: Optional[Callable[[str], None]] = None,
+        interval: float = 300,
+        jitter: float = 0.1,
+        max_backoff: float = 3600,
+        concurrency: int = 4,
+        failed: Optional[Callable[[List[Dict[str, Any]]], Optional[str]]] = None,
+    ):
+        self.name = name
+        self.sources = sources
+        self.fetch = fetch
+        self.store = store
+        self.on_update = on_update
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.concurrency = concurrency
+        self.failed = failed or (lambda articles: None if articles else "no articles returned")
+        self.passive = False
+        # يعيّنها WorkerCoordinator: إحالة طلب التحديث إلى القائد (None = كل المصادر)
+        self.forward_bump: Optional[Callable[[Optional[str]], None]] = None
+
+        self._due: Dict[str, float] = {}
+        self._heap: List = []
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._queued = set()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._order = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        sources.add_listener(self._sources_changed)
+
+    def _sources_changed(self, added: List[str], removed: List[str], changed: List[str]):
+        for name in removed:
+            self._due.pop(name, None)
+            self._queued.discard(name)
+        if self._wakeup is not None:
+            for name in added:
+                self._schedule(name, 0)
+
+    def _queue_item(self, priority: int, name: str) -> tuple:
+        source = self.sources.get(name) or {}
+        return (priority, -source.get("priority", 0), next(self._order), name)
+
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def _schedule(self, name: str, delay: float):
+        due = self._now() + delay
+        self._due[name] = due
+        if self._wakeup is not None:
+            heapq.heappush(self._heap, (due, next(self._order), name))
+            self._wakeup.set()
+
+    def _next_delay(self, source: Dict[str, Any], failures: int) -> float:
+        interval = source.get("poll_interval", self.interval)
+        if failures:
+            interval = min(interval * (2 ** failures), self.max_backoff)
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def in_flight(self) -> int:
+        """عدد المصادر التي يجري جلبها الآن"""
+        return len(self._inflight)
+
+    def start(self):
+        """تشغيل الجدولة (يُستدعى من lifespan)"""
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._wakeup = asyncio.Event()
+        now = self._now()
+        self._heap = []
+        for name in self.sources.names():
+            self._due.setdefault(name, now)
+            self._heap.append((self._due[name], next(self._order), name))
+        heapq.heapify(self._heap)
+        self._tasks.append(asyncio.create_task(self._dispatch()))
+        for _ in range(self.concurrency):
+            self._tasks.append(asyncio.create_task(self._worker()))
+        logger.info(f"Started {self.name} scheduler for {len(self.sources)} sources")
+
+    async def stop(self):
+        """إيقاف الجدولة وانتظار انتهاء مهامها"""
+        tasks = self._tasks + list(self._inflight.values())
+        self._tasks = []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._inflight.clear()
+        self._queued.clear()
+        self._heap = []
+        self._queue = None
+        self._wakeup = None
+        logger.info(f"Stopped {self.name} scheduler")
+
+    def bump(self, source_name: Optional[str] = None) -> bool:
+        """نقل مصدر (أو كل المصادر) إلى مقدمة طابور الجلب"""
+        if source_name is not None and source_name not in self.sources:
+            return False
+        if self.passive:
+            if self.forward_bump is None:
+                raise RuntimeError(f"{self.name} scheduler is passive and has no fetch leader to forward to")
+            self.forward_bump(source_name)
+            return True
+        names = [source_name] if source_name is not None else self.sources.names()
+        for name in names:
+            self._due[name] = self._now()
+            if self._queue is not None:
+                self._queued.add(name)
+                self._queue.put_nowait(self._queue_item(PRIORITY_BUMPED, name))
+        return True
+
+    def due_sources(self, names: Optional[List[str]] = None) -> List[str]:
+        """المصادر التي لم تُجلب بعد أو حان موعد تحديثها"""
+        now = self._now()
+        if names is None:
+            names = self.sources.names()
+        return [name for name in names if self._due.get(name, now) <= now]
+
+    async def poll_due(self, names: Optional[List[str]] = None, deadline: Optional[float] = None) -> List[str]:
+        """جلب المصادر المستحقة فوراً (مع مشاركة أي جلب جارٍ لنفس المصدر)
+
+        deadline: أقصى مدة انتظار بالثواني؛ المصادر التي لم تنتهِ خلالها تُكمل في الخلفية
+        وتحدّث المخزن عند انتهائها. تُرجع أسماء هذه المصادر.
+        """
+        if self.passive:
+            return []
+        names = self.due_sources(names)
+        if not names:
+            return []
+        tasks = {asyncio.ensure_future(self.poll(name)): name for name in names}
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        if pending:
+            logger.info(f"{self.name}: {len(pending)} sources still fetching after {deadline}s deadline")
+        return [tasks[task] for task in pending]
+
+    def source_status(self, name: str) -> str:
+        """حالة نتائج المصدر الحالية في المخزن"""
+        state = self.store.get(name)
+        if state is None:
+            return SOURCE_MISSING
+        if not has_real_articles(state.articles) and (state.last_success is None or state.last_error):
+            # لا نتيجة ناجحة، أو عنوان بديل بعد فشل الجلب (النتيجة الفارغة الناجحة ليست فقداناً)
+            return SOURCE_MISSING
+        if state.last_error or state.last_success is None or self.due_sources([name]):
+            return SOURCE_STALE
+        return SOURCE_FRESH
+
+    async def poll(self, name: str):
+        """جلب مصدر واحد، أو انتظار جلبه إذا كان جارياً"""
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.create_task(self._poll(name))
+            self._inflight[name] = task
+            task.add_done_callback(lambda _: self._inflight.pop(name, None))
+        await asyncio.shield(task)
+
+    async def _poll(self, name: str):
+        # أي مدخل لهذا المصدر ما زال في الطابور أصبح زائداً
+        self._queued.discard(name)
+        source = self.sources.get(name)
+        if source is None:
+            # أزيل المصدر من القائمة
+            self._due.pop(name, None)
+            return
+
+        retry_after = None
+        started = time.perf_counter()
+        try:
+            articles = await self.fetch(source)
+        except Exception as e:
+            articles = None
+            error = str(e)
+            # مثلاً CircuitOpenError: لا فائدة من المحاولة قبل هذه المدة
+            retry_after = getattr(e, "retry_after", None)
+        else:
+            error = self.failed(articles)
+
+        FETCH_SECONDS.observe(
+            time.perf_counter() - started, feed=self.name, source=name, outcome="ok" if error is None else "error"
+        )
+
+        if error is None:
+            self.store.update(name, articles)
+            self._schedule(name, self._next_delay(source, 0))
+            self.notify_update(name)
+        else:
+            if self.store.record_failure(name, error, fallback=articles):
+                self.notify_update(name)
+            failures = self.store.get(name).consecutive_failures
+            delay = self._next_delay(source, failures)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            self._schedule(name, delay)
+            logger.warning(f"Polling {name} failed ({error}), retrying in {delay:.0f}s")
+
+    def notify_update(self, name: str):
+        """استدعاء on_update بعد وصول نتائج جديدة للمصدر (من الجلب أو من القائد)"""
+        if self.on_update is not None:
+            try:
+                self.on_update(name)
+            except Exception as e:
+                logger.error(f"{self.name} update hook failed for {name}: {str(e)}")
+
+    def export_schedule(self) -> Dict[str, float]:
+        """الثواني المتبقية حتى الموعد التالي لكل مصدر"""
+        now = self._now()
+        return {name: due - now for name, due in self._due.items()}
+
+    def apply_schedule(self, schedule: Dict[str, float], elapsed: float = 0):
+        """اعتماد مواعيد نشرها القائد قبل elapsed ثانية (لحساب حالة المصادر في الاستجابة)"""
+        now = self._now()
+        for name, remaining in schedule.items():
+            self._due[name] = now + remaining - elapsed
+
+    async def _dispatch(self):
+        while True:
+            self._wakeup.clear()
+            now = self._now()
+            while self._heap and self._heap[0][0] <= now:
+                due, _, name = heapq.heappop(self._heap)
+                # تجاهل المواعيد التي استبدلت بموعد أحدث
+                if self._due.get(name) != due or name in self._queued:
+                    continue
+                self._queued.add(name)
+                self._queue.put_nowait(self._queue_item(PRIORITY_DUE, name))
+
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self):
+        while True:
+            *_, name = await self._queue.get()
+            if name not in self._queued:
+                # سبق جلبه عبر مدخل آخر في الطابور
+                continue
+            self._queued.discard(name)
+            try:
+                await self.poll(name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{self.name} scheduler failed polling {name}: {str(e)}")
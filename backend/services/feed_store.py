@@ -0,0 +1,169 @@
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from services.article_record import from_timestamp, published_ts, sort_newest_first
+
+logger = logging.getLogger(__name__)
+
+
+def has_real_articles(articles: List[Dict[str, Any]]) -> bool:
+    """هل بين المقالات مقال حقيقي (وليس عنواناً بديلاً مؤقتاً)"""
+    return any(not article.get('is_placeholder') for article in articles)
+
+
+def stamp_created_at(articles: List[Dict[str, Any]]):
+    """المقالات بدون وقت أول ظهور (محفوظة قبل إضافته أو بديلة) تأخذ وقت نشرها، مرة واحدة عند التخزين"""
+    for article in articles:
+        if not article.get('created_at'):
+            article['created_at'] = from_timestamp(published_ts(article))
+
+
+class SourceState:
+    """آخر حالة معروفة لمصدر واحد"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.articles: List[Dict[str, Any]] = []
+        self.last_success: Optional[datetime] = None
+        self.last_attempt: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.consecutive_failures = 0
+        self._success_monotonic: Optional[float] = None
+
+    @property
+    def age(self) -> Optional[float]:
+        """عمر آخر نتيجة ناجحة بالثواني"""
+        if self._success_monotonic is None:
+            return None
+        return time.monotonic() - self._success_monotonic
+
+
+class FeedStore:
+    """مخزن مشترك لآخر نتائج كل مصدر، تكتب فيه الجدولة ويقرأ منه المستخدمون
+
+    مقالات كل مصدر تُرتب (الأحدث أولاً) عند تخزينها، فتُدمج المصادر لاحقاً دون إعادة ترتيب.
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, SourceState] = {}
+        self._listeners: List[Callable[[str, List[Dict[str, Any]]], None]] = []
+        self.version = 0
+
+    def add_listener(self, listener: Callable[[str, List[Dict[str, Any]]], None]):
+        """تسجيل دالة تُستدعى بعد كل تحديث ناجح لمصدر (اسم المصدر، مقالاته)"""
+        self._listeners.append(listener)
+
+    def _state(self, name: str) -> SourceState:
+        state = self._sources.get(name)
+        if state is None:
+            state = self._sources[name] = SourceState(name)
+        return state
+
+    def update(self, name: str, articles: List[Dict[str, Any]]):
+        """تسجيل نتيجة جلب ناجحة"""
+        state = self._state(name)
+        sort_newest_first(articles)
+
+        # الإبقاء على وقت أول ظهور للمقالات التي سبق رؤيتها
+        first_seen = {article['id']: article.get('created_at') for article in state.articles}
+        now = datetime.utcnow()
+        for article in articles:
+            article['created_at'] = first_seen.get(article['id']) or article.get('created_at') or now
+
+        state.articles = articles
+        state.last_success = state.last_attempt = datetime.now()
+        state.last_error = None
+        state.consecutive_failures = 0
+        state._success_monotonic = time.monotonic()
+        self.version += 1
+        self._notify(name, articles)
+
+    def _notify(self, name: str, articles: List[Dict[str, Any]]):
+        for listener in self._listeners:
+            try:
+                listener(name, articles)
+            except Exception as e:
+                logger.error(f"Feed store listener failed for {name}: {str(e)}")
+
+    def seed(self, name: str, articles: List[Dict[str, Any]]):
+        """تعبئة مصدر بنتائج محفوظة (مثلاً من قاعدة البيانات) دون اعتبارها جلباً جديداً"""
+        state = self._state(name)
+        if not state.articles:
+            sort_newest_first(articles)
+            stamp_created_at(articles)
+            state.articles = articles
+            self.version += 1
+
+    def record_failure(self, name: str, error: str, fallback: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """تسجيل فشل الجلب مع الإبقاء على آخر نتيجة ناجحة
+
+        fallback (مثلاً عنوان بديل مؤقت) يُعرض فقط إذا لم تكن للمصدر أي نتيجة حقيقية.
+        تُرجع True إذا تغيرت مقالات المصدر.
+        """
+        state = self._state(name)
+        state.last_attempt = datetime.now()
+        state.last_error = error
+        state.consecutive_failures += 1
+        self.version += 1
+        if fallback and not has_real_articles(state.articles):
+            # نفس البديل المعروض يبقى كما هو حتى لا تتغير الاستجابة (ETag) مع كل فشل
+            if [article['id'] for article in fallback] == [article['id'] for article in state.articles]:
+                return False
+            stamp_created_at(fallback)
+            state.articles = fallback
+            return True
+        return False
+
+    def export(self) -> Dict[str, Dict[str, Any]]:
+        """حالة كل المصادر لنشرها إلى العمال الآخرين (انظر worker_coordinator)"""
+        return {
+            name: {
+                "articles": state.articles,
+                "last_success": state.last_success,
+                "last_attempt": state.last_attempt,
+                "last_error": state.last_error,
+                "consecutive_failures": state.consecutive_failures,
+                "age": state.age,
+            }
+            for name, state in self._sources.items()
+        }
+
+    def apply(self, name: str, exported: Dict[str, Any], elapsed: float = 0) -> bool:
+        """اعتماد حالة مصدر نشرها عامل آخر قبل elapsed ثانية
+
+        تُستدعى المستمعات فقط إذا كانت المقالات من جلب ناجح جديد. تُرجع True في هذه الحالة.
+        """
+        state = self._state(name)
+        updated = exported["last_success"] is not None and exported["last_success"] != state.last_success
+        if updated or (exported["articles"] and not state.articles):
+            state.articles = exported["articles"]
+        state.last_success = exported["last_success"]
+        state.last_attempt = exported["last_attempt"]
+        state.last_error = exported["last_error"]
+        state.consecutive_failures = exported["consecutive_failures"]
+        if exported["age"] is not None:
+            state._success_monotonic = time.monotonic() - exported["age"] - elapsed
+        self.version += 1
+        if updated:
+            self._notify(name, state.articles)
+        return updated
+
+    def get(self, name: str) -> Optional[SourceState]:
+        return self._sources.get(name)
+
+    def last_success(self, names: Iterable[str]) -> Optional[datetime]:
+        """أحدث جلب ناجح بين المصادر المعطاة (وقت البيانات المستعادة مثلاً)"""
+        times = [
+            self._sources[name].last_success for name in names
+            if name in self._sources and self._sources[name].last_success is not None
+        ]
+        return max(times, default=None)
+
+    def articles_by_source(self, names: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """آخر المقالات لكل مصدر بترتيب الأسماء المعطاة"""
+        return {
+            name: self._sources[name].articles if name in self._sources else []
+            for name in names
+        }
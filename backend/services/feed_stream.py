@@ -0,0 +1,107 @@
+import logging
+import os
+import re
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# أقصى حجم يُقرأ من أي feed (ما زاد عنه يُهمل ويُغلق الاتصال)
+FEED_MAX_BYTES = int(os.environ.get('FEED_MAX_BYTES', 5 * 1024 * 1024))
+
+FEED_CHUNK_SIZE = 64 * 1024
+
+# وسم نهاية مدخل RSS (<item>) أو Atom (<entry>) مع بادئة namespace اختيارية،
+# أو بداية قسم CDATA أو تعليق (يُتخطى محتواهما: قد يحتوي نص الوصف على "</item>")
+ENTRY_END_RE = re.compile(rb"<!\[CDATA\[|<!--|</(?:[\w.-]+:)?(item|entry)\s*>")
+
+_SECTION_ENDS = {b"<![CDATA[": b"]]>", b"<!--": b"-->"}
+
+# أطول وسم نهاية ممكن عملياً، لالتقاط الوسوم المقسومة بين قطعتين
+_TAG_OVERLAP = 64
+
+
+def _closing_tags(head: bytes, entry_tag: bytes) -> bytes:
+    """وسوم الإغلاق التي تجعل بداية الـ feed المقتطعة مستنداً سليماً"""
+    if entry_tag == b"entry":
+        return b"</feed>"
+    if b"<rdf:RDF" in head:
+        return b"</rdf:RDF>"
+    return b"</channel></rss>"
+
+
+class FeedTooLarge(ValueError):
+    """تجاوز الـ feed الحد الأقصى للحجم قبل اكتمال أي مدخل"""
+
+
+class FeedBody:
+    """محتوى feed مقروء جزئياً أو كلياً"""
+
+    __slots__ = ("content", "bytes_read", "entries", "truncated")
+
+    def __init__(self, content: bytes, bytes_read: int, entries: int, truncated: bool):
+        self.content = content
+        self.bytes_read = bytes_read
+        self.entries = entries
+        self.truncated = truncated
+
+
+async def read_feed(response, max_entries: Optional[int] = None, max_bytes: int = FEED_MAX_BYTES) -> FeedBody:
+    """قراءة جسم الاستجابة على دفعات والتوقف بعد max_entries مدخلاً أو max_bytes بايت
+
+    يُبحث عن نهايات المدخلات في البايتات مباشرة أثناء القراءة، ثم يُقتطع المحتوى بعد آخر
+    مدخل مطلوب ويُغلق بالوسوم المناسبة ليحلله feedparser كمستند كامل. يُترك فك الترميز
+    لـ feedparser (حسب إعلان XML) بدل response.text().
+    ترفع FeedTooLarge إذا بلغ الحجم max_bytes قبل اكتمال أي مدخل، بدل تحليل جزء من مستند.
+    """
+    body = bytearray()
+    scan_from = 0
+    entries = 0
+    last_entry_end: Optional[int] = None
+    entry_tag = b""
+    truncated = False
+    # نهاية قسم CDATA أو تعليق لم يكتمل بعد في البايتات المقروءة
+    section_end: Optional[bytes] = None
+
+    async for chunk in response.content.iter_chunked(FEED_CHUNK_SIZE):
+        body.extend(chunk)
+
+        while True:
+            if section_end is not None:
+                end = body.find(section_end, scan_from)
+                if end < 0:
+                    # يُكمل البحث في القطعة التالية (مع احتمال انقسام النهاية بين قطعتين)
+                    scan_from = max(scan_from, len(body) - len(section_end) + 1)
+                    break
+                scan_from = end + len(section_end)
+                section_end = None
+            match = ENTRY_END_RE.search(body, scan_from)
+            if match is None:
+                scan_from = max(scan_from, len(body) - _TAG_OVERLAP)
+                break
+            if match.group(1) is None:
+                section_end = _SECTION_ENDS[match.group(0)]
+                scan_from = match.end()
+                continue
+            entries += 1
+            scan_from = last_entry_end = match.end()
+            entry_tag = match.group(1)
+            if max_entries is not None and entries >= max_entries:
+                truncated = True
+                break
+        if truncated:
+            break
+
+        if len(body) >= max_bytes:
+            if last_entry_end is None:
+                raise FeedTooLarge(f"Feed {response.url} exceeds {max_bytes} bytes before its first entry")
+            truncated = True
+            logger.warning(f"Feed {response.url} exceeds {max_bytes} bytes, keeping the first {entries} entries")
+            break
+
+    bytes_read = len(body)
+    if truncated and last_entry_end is not None:
+        # الإبقاء على المدخلات المكتملة فقط
+        del body[last_entry_end:]
+        body.extend(_closing_tags(bytes(body[:1024]), entry_tag))
+
+    return FeedBody(bytes(body), bytes_read, entries, truncated)
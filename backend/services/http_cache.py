@@ -0,0 +1,144 @@
+import gzip
+import hashlib
+import logging
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from services.serialization import JSON_MEDIA_TYPE
+
+try:
+    import brotli
+except ImportError:  # اختياري: بدونه يُستخدم gzip فقط
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# الأجسام الأصغر من هذا الحجم تُرسل دون ضغط (الكلفة أكبر من الفائدة)
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 6
+
+
+def cache_control(max_age: int, stale_while_revalidate: int = 0) -> str:
+    """قيمة ترويسة Cache-Control لاستجابة عامة"""
+    value = f"public, max-age={max_age}"
+    if stale_while_revalidate:
+        value += f", stale-while-revalidate={stale_while_revalidate}"
+    return value
+
+
+def http_date(moment: datetime) -> str:
+    """تاريخ بصيغة HTTP (التواريخ بدون منطقة زمنية تُعتبر بالتوقيت المحلي)"""
+    return format_datetime(moment.astimezone(timezone.utc), usegmt=True)
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """أفضل ترميز ضغط يقبله العميل: br ثم gzip، أو None"""
+    accepted = _accepted_encodings(accept_encoding or "")
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class RenderedBody:
+    """جسم JSON جاهز مع ETag قوي مشتق من محتواه، ونسخ مضغوطة تُبنى عند أول طلب لها
+
+    ETag كل نسخة مضغوطة يختلف (لاحقة الترميز) لأن بايتاتها مختلفة، لكن If-None-Match
+    يطابق أي نسخة من نفس المحتوى.
+    """
+
+    __slots__ = ("content", "tag", "_encoded")
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.tag = hashlib.blake2b(content, digest_size=12).hexdigest()
+        self._encoded: Dict[str, bytes] = {}
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        return f'"{self.tag}-{encoding}"' if encoding else f'"{self.tag}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """هل يحمل العميل نسخة من نفس المحتوى (مقارنة ضعيفة كما يتطلب If-None-Match)"""
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate == "*":
+                return True
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate.strip('"').split("-", 1)[0] == self.tag:
+                return True
+        return False
+
+    def encoded(self, encoding: str) -> bytes:
+        body = self._encoded.get(encoding)
+        if body is None:
+            if encoding == "br":
+                body = brotli.compress(self.content, quality=BROTLI_QUALITY)
+            else:
+                body = gzip.compress(self.content, compresslevel=GZIP_LEVEL, mtime=0)
+            self._encoded[encoding] = body
+        return body
+
+
+def cached_response(
+    request: Request,
+    body: RenderedBody,
+    cache_control_value: str,
+    last_modified: Optional[datetime] = None,
+    media_type: str = JSON_MEDIA_TYPE,
+) -> Response:
+    """استجابة مع ETag و Cache-Control و Last-Modified، و 304 إذا كانت نسخة العميل حديثة"""
+    headers = {"Cache-Control": cache_control_value, "Vary": "Accept-Encoding"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = body.matches(if_none_match)
+    else:
+        not_modified = _not_modified_since(request.headers.get("if-modified-since"), last_modified)
+
+    encoding = choose_encoding(request.headers.get("accept-encoding", "")) if len(body.content) >= COMPRESS_MIN_BYTES else None
+    headers["ETag"] = body.etag(encoding)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+
+    if encoding is None:
+        return Response(body.content, media_type=media_type, headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(body.encoded(encoding), media_type=media_type, headers=headers)
+
+
+def _not_modified_since(if_modified_since: Optional[str], last_modified: Optional[datetime]) -> bool:
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # Last-Modified يُرسل بدقة الثانية
+    return int(last_modified.astimezone(timezone.utc).timestamp()) <= int(since.timestamp())
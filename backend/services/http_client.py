@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClient:
+    """جلسة aiohttp مشتركة بين كل الخدمات تُدار من lifespan
+
+    - حدود للاتصالات الكلية ولكل مضيف مع إبقاء الاتصالات حية وتخزين DNS مؤقتاً
+    - مهل منفصلة للاتصال والقراءة
+    - حد أقصى لعدد عمليات الجلب المتزامنة
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 4,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30,
+        connect_timeout: float = 5,
+        read_timeout: float = 15,
+        total_timeout: float = 30,
+        max_concurrent_fetches: int = 16,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(
+            total=total_timeout,
+            sock_connect=connect_timeout,
+            sock_read=read_timeout
+        )
+        self.max_concurrent_fetches = max_concurrent_fetches
+        self._fetch_slots = asyncio.Semaphore(max_concurrent_fetches)
+        self.in_flight = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @classmethod
+    def from_env(cls) -> "HttpClient":
+        return cls(
+            limit=int(os.environ.get('HTTP_MAX_CONNECTIONS', 100)),
+            limit_per_host=int(os.environ.get('HTTP_MAX_CONNECTIONS_PER_HOST', 4)),
+            dns_cache_ttl=int(os.environ.get('HTTP_DNS_CACHE_TTL', 300)),
+            keepalive_timeout=float(os.environ.get('HTTP_KEEPALIVE_TIMEOUT', 30)),
+            connect_timeout=float(os.environ.get('HTTP_CONNECT_TIMEOUT', 5)),
+            read_timeout=float(os.environ.get('HTTP_READ_TIMEOUT', 15)),
+            total_timeout=float(os.environ.get('HTTP_TOTAL_TIMEOUT', 30)),
+            max_concurrent_fetches=int(os.environ.get('HTTP_MAX_CONCURRENT_FETCHES', 16)),
+        )
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """الجلسة المشتركة (تُنشأ عند أول استخدام)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    @asynccontextmanager
+    async def get(self, url: str, **kwargs):
+        """طلب GET ضمن حد عمليات الجلب المتزامنة"""
+        async with self._fetch_slots:
+            self.in_flight += 1
+            try:
+                async with self.get_session().get(url, **kwargs) as response:
+                    yield response
+            finally:
+                self.in_flight -= 1
+
+    async def close(self):
+        """إغلاق الجلسة والاتصالات المفتوحة (يُستدعى عند إغلاق التطبيق)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# عميل HTTP مشترك بين الخدمات
+http_client = HttpClient.from_env()
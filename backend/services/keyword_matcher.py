@@ -0,0 +1,137 @@
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# التشكيل والتطويل
+ARABIC_DIACRITICS_RE = re.compile(r'[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]')
+
+# توحيد أشكال الألف والياء والتاء المربوطة
+# (سلسلة str.replace أسرع بكثير من str.translate مع قاموس)
+ARABIC_LETTER_REPLACEMENTS = (
+    ('\u0623', '\u0627'),  # أ -> ا
+    ('\u0625', '\u0627'),  # إ -> ا
+    ('\u0622', '\u0627'),  # آ -> ا
+    ('\u0671', '\u0627'),  # ٱ -> ا
+    ('\u0649', '\u064A'),  # ى -> ي
+    ('\u0629', '\u0647'),  # ة -> ه
+)
+
+
+def normalize_arabic(text: str) -> str:
+    """تطبيع النص العربي للمطابقة: حذف التشكيل وتوحيد الحروف المتشابهة وتحويل اللاتينية لأحرف صغيرة"""
+    text = ARABIC_DIACRITICS_RE.sub('', text)
+    for variant, canonical in ARABIC_LETTER_REPLACEMENTS:
+        text = text.replace(variant, canonical)
+    return text.lower()
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """بناء تعبير نمطي على شكل شجرة بادئات حتى يتفرع المحرك حرفاً بحرف بدل تجربة كل كلمة"""
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        is_end = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        body = '(?:' + '|'.join(branches) + ')'
+        # الفرع الاختياري جشع فتُقدَّم الكلمة الأطول
+        return body + '?' if is_end else body
+
+    return build(trie)
+
+
+class MatchResult:
+    """نتيجة المطابقة: كل المجموعات والكلمات المفتاحية التي وجدت في النص"""
+
+    __slots__ = ("groups", "keywords")
+
+    def __init__(self, groups: FrozenSet[str], keywords: FrozenSet[str]):
+        self.groups = groups
+        self.keywords = keywords
+
+    def first_group(self, order: Iterable[str]) -> Optional[str]:
+        """أول مجموعة مطابقة بحسب الترتيب المعطى"""
+        for group in order:
+            if group in self.groups:
+                return group
+        return None
+
+
+class KeywordMatcher:
+    """مطابقة مجموعات كلمات مفتاحية في مرور واحد على النص
+
+    تُجمع كل الكلمات (بعد التطبيع) في تعبير نمطي واحد على شكل شجرة بادئات داخل lookahead
+    بحيث يُفحص كل موضع في النص مرة واحدة، مع تقديم الكلمات الأطول. ولأن أي كلمة أقصر تقع داخل الكلمة المطابقة
+    تكون موجودة في النص أيضاً، تُضم مجموعاتها مسبقاً إلى مجموعات الكلمة الأطول.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self.group_names: Tuple[str, ...] = tuple(groups)
+
+        keyword_groups: Dict[str, set] = {}
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                normalized = normalize_arabic(keyword)
+                if normalized:
+                    keyword_groups.setdefault(normalized, set()).add(group)
+
+        keywords = sorted(keyword_groups, key=len, reverse=True)
+        self._closure: Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+        for keyword in keywords:
+            contained = [other for other in keywords if other in keyword]
+            matched_groups = set()
+            for other in contained:
+                matched_groups |= keyword_groups[other]
+            self._closure[keyword] = (frozenset(matched_groups), frozenset(contained))
+
+        if keywords:
+            trie = _trie_pattern(keywords)
+            # lookahead لاستخراج كل التطابقات حتى المتداخلة، والنمط العادي للبحث عن أول تطابق فقط
+            self._pattern = re.compile(f'(?=({trie}))')
+            self._search_pattern = re.compile(trie)
+        else:
+            self._pattern = self._search_pattern = None
+
+    def matches_any(self, text: str, normalized: bool = False) -> bool:
+        """هل يحتوي النص على أي كلمة مفتاحية (يتوقف عند أول تطابق)"""
+        if self._search_pattern is None or not text:
+            return False
+        if not normalized:
+            text = normalize_arabic(text)
+        return self._search_pattern.search(text) is not None
+
+    def match(self, text: str, normalized: bool = False) -> MatchResult:
+        """إرجاع كل المجموعات والكلمات المطابقة في النص
+
+        normalized: True إذا كان النص مطبعاً مسبقاً بـ normalize_arabic
+        """
+        if self._pattern is None or not text:
+            return MatchResult(frozenset(), frozenset())
+        if not normalized:
+            text = normalize_arabic(text)
+
+        matched_groups = set()
+        matched_keywords = set()
+        for found in set(self._pattern.findall(text)):
+            closure_groups, closure_keywords = self._closure[found]
+            matched_groups |= closure_groups
+            matched_keywords |= closure_keywords
+        return MatchResult(frozenset(matched_groups), frozenset(matched_keywords))
+
+
+@lru_cache(maxsize=256)
+def _cached_matcher(groups: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> KeywordMatcher:
+    return KeywordMatcher(dict(groups))
+
+
+def get_matcher(groups: Dict[str, List[str]]) -> KeywordMatcher:
+    """مطابق مُجمَّع مسبقاً لمجموعات الكلمات (يُبنى مرة واحدة لكل مجموعة مختلفة)"""
+    return _cached_matcher(tuple((group, tuple(keywords)) for group, keywords in groups.items()))
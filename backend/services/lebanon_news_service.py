@@ -1,268 +1,314 @@
 import feedparser
 import asyncio
-import aiohttp
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Optional, Union
 import logging
-import re
-from urllib.parse import urljoin
+from urllib.parse import urlsplit
+from services.circuit_breaker import CircuitBreakers
+from services.conditional_get import ConditionalGetCache
+from services.feed_discovery import FeedDiscovery
+from services.http_client import HttpClient, http_client
+from services.feed_stream import read_feed
+from services.article_record import from_timestamp, sort_newest_first
+from services.feed_parsing import strip_html, entry_published_ts, entry_image_url, make_article_id
+from services.keyword_matcher import KeywordMatcher, get_matcher, normalize_arabic
+from services.metrics import PARSE_STAGE_SECONDS, StageTimer
+from services.parse_pool import parse_pool
+from services.seen_entries import ParsedEntry, SeenEntries, entry_digest, entry_key
+from services.source_registry import SourceRegistry, source_loader
 
 logger = logging.getLogger(__name__)
 
-class LebanonNewsService:
-    def __init__(self):
-        # مصادر RSS للصحف اللبنانية مع مصادر بديلة
-        self.lebanon_newspapers = [
-            {
-                "name": "النهار",
-                "url": "https://www.annahar.com/rss.xml",
-                "category": "سياسة",
-                "website": "https://www.annahar.com"
-            },
-            {
-                "name": "الأخبار",
-                "url": "https://www.al-akhbar.com/rss",
-                "category": "سياسة", 
-                "website": "https://www.al-akhbar.com"
-            },
-            {
-                "name": "الجمهورية",
-                "url": "https://feeds.feedburner.com/AlGomhuriaNews",
-                "category": "سياسة",
-                "website": "https://www.al-gomhuria.com"
-            },
-            {
-                "name": "المستقبل",
-                "url": "https://almustaqbal.com/feed",
-                "category": "سياسة",
-                "website": "https://almustaqbal.com"
-            },
-            {
-                "name": "اللواء", 
-                "url": "https://www.alliwaa.com.lb/feed/",
-                "category": "سياسة",
-                "website": "https://www.alliwaa.com.lb"
-            },
-            {
-                "name": "الديار",
-                "url": "https://www.addiyar.com/feed",
-                "category": "سياسة",
-                "website": "https://www.addiyar.com"
-            },
-            {
-                "name": "الجريدة",
-                "url": "https://www.aljarida.com/feeds/all.xml",
-                "category": "سياسة",
-                "website": "https://www.aljarida.com"
-            },
-            {
-                "name": "MTV Lebanon",
-                "url": "https://www.mtv.com.lb/feed",
-                "category": "سياسة",
-                "website": "https://www.mtv.com.lb"
-            },
-            # مصادر إضافية موثوقة
-            {
-                "name": "الشرق الأوسط - لبنان",
-                "url": "https://aawsat.com/rss/lebanon",
-                "category": "سياسة",
-                "website": "https://aawsat.com"
-            },
-            {
-                "name": "الحياة - أخبار لبنان",
-                "url": "https://www.alhayat.com/rss/lebanon.xml",
-                "category": "سياسة", 
-                "website": "https://www.alhayat.com"
-            }
-        ]
-        self.session = None
-
-    async def get_session(self):
-        if not self.session:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
-        return self.session
+# الكلمات المفتاحية للأخبار السياسية اللبنانية
+POLITICAL_KEYWORDS = [
+    # مسؤولون لبنانيون
+    "حكومة", "وزير", "رئيس", "برلمان", "مجلس", "انتخابات", "حزب", "سياسة", "دبلوماسية",
+    "ميقاتي", "عون", "بري", "جعجع", "جنبلاط", "الحريري", "فرنجية", "باسيل", "أبو فاعور",
+    "حزب الله", "القوات", "التيار", "الكتائب", "المردة", "التقدمي", "المستقبل", "الكرامة",
+    
+    # مؤسسات حكومية
+    "مجلس الوزراء", "مجلس النواب", "قصر بعبدا", "بيت الوسط", "عين التينة", "الكتلة",
+    "دولة", "حكم", "قرار", "قانون", "اتفاق", "معاهدة", "أزمة سياسية", "حل سياسي",
+    
+    # مواضيع سياسية لبنانية
+    "لبنان", "بيروت", "طائف", "دستور", "سيادة", "استقلال", "حياد", "مقاومة",
+    "تشكيل حكومة", "استقالة", "ثقة", "اقتراع", "تصويت", "جلسة", "محاسبة", "تحقيق",
+    
+    # أمن وسياسة
+    "أمن", "استقرار", "أزمة", "توتر", "احتجاج", "مظاهرة", "إضراب", "مفاوضات",
+    
+    # العلاقات الخارجية
+    "سوريا", "إسرائيل", "فرنسا", "أمريكا", "إيران", "السعودية", "الخليج", "أوروبا"
+]
 
-    def is_political_news(self, title: str, description: str) -> bool:
-        """تحديد ما إذا كان الخبر سياسياً بناءً على الكلمات المفتاحية"""
-        political_keywords = [
-            # مسؤولون لبنانيون
-            "حكومة", "وزير", "رئيس", "برلمان", "مجلس", "انتخابات", "حزب", "سياسة", "دبلوماسية",
-            "ميقاتي", "عون", "بري", "جعجع", "جنبلاط", "الحريري", "فرنجية", "باسيل", "أبو فاعور",
-            "حزب الله", "القوات", "التيار", "الكتائب", "المردة", "التقدمي", "المستقبل", "الكرامة",
-            
-            # مؤسسات حكومية
-            "مجلس الوزراء", "مجلس النواب", "قصر بعبدا", "بيت الوسط", "عين التينة", "الكتلة",
-            "دولة", "حكم", "قرار", "قانون", "اتفاق", "معاهدة", "أزمة سياسية", "حل سياسي",
-            
-            # مواضيع سياسية لبنانية
-            "لبنان", "بيروت", "طائف", "دستور", "سيادة", "استقلال", "حياد", "مقاومة",
-            "تشكيل حكومة", "استقالة", "ثقة", "اقتراع", "تصويت", "جلسة", "محاسبة", "تحقيق",
-            
-            # أمن وسياسة
-            "أمن", "استقرار", "أزمة", "توتر", "احتجاج", "مظاهرة", "إضراب", "مفاوضات",
-            
-            # العلاقات الخارجية
-            "سوريا", "إسرائيل", "فرنسا", "أمريكا", "إيران", "السعودية", "الخليج", "أوروبا"
-        ]
+# يُجمَّع مرة واحدة عند تحميل الوحدة (وفي كل عملية من عمليات منفذ التحليل)
+POLITICAL_MATCHER = KeywordMatcher({"سياسة": POLITICAL_KEYWORDS})
+
+def newspaper_matcher(newspaper: Dict[str, Any]) -> KeywordMatcher:
+    """مطابق الكلمات السياسية للصحيفة (keywords الخاصة بها إن وجدت بدل الكلمات العامة)"""
+    if newspaper.get("keywords"):
+        return get_matcher({"سياسة": newspaper["keywords"]})
+    return POLITICAL_MATCHER
+
+def is_political_news(title: str, description: str, matcher: KeywordMatcher = POLITICAL_MATCHER) -> bool:
+    """تحديد ما إذا كان الخبر سياسياً بناءً على الكلمات المفتاحية"""
+    # التطبيع مرة واحدة لكل خبر
+    text = normalize_arabic(f"{title} {description}")
+    
+    # إذا كان النص يحتوي على أي من الكلمات السياسية، فهو خبر سياسي
+    if matcher.matches_any(text, normalized=True):
+        return True
         
-        text = f"{title} {description}".lower()
+    # إذا كان العنوان أو الوصف قصير جداً ولا يحتوي على كلمات واضحة، فنعتبره خبر عام
+    if len(text.strip()) < 20:
+        return True
         
-        # إذا كان النص يحتوي على أي من الكلمات السياسية، فهو خبر سياسي
-        for keyword in political_keywords:
-            if keyword in text:
-                return True
-                
-        # إذا كان العنوان أو الوصف قصير جداً ولا يحتوي على كلمات واضحة، فنعتبره خبر عام
-        if len(text.strip()) < 20:
-            return True
+    return False
+
+# عدد المدخلات المفحوصة من كل feed (وما بعدها لا يُقرأ أصلاً)
+HEADLINES_MAX_ENTRIES = 15
+
+def parse_newspaper_entries(
+    content: Union[str, bytes],
+    newspaper: Dict[str, Any],
+    limit: int = HEADLINES_MAX_ENTRIES,
+    seen: Optional[Dict[str, str]] = None,
+    stages: Optional[StageTimer] = None
+) -> Optional[List[ParsedEntry]]:
+    """تحليل محتوى RSS ومعالجة المدخلات الجديدة أو المعدلة فقط (يعمل داخل منفذ التحليل)
+
+    seen: بصمات المدخلات المعالجة في الجلب السابق؛ ما لم تتغير بصمته لا يُعالج.
+    stages: تُجمع فيه أزمنة مراحل التحليل ليسجلها المستدعي (parse_pool.run_timed).
+    المدخلات غير السياسية تُرجع بدون مقال حتى لا يُعاد فحصها.
+    تُرجع None إذا لم يحتوِ الـ feed على أي مدخلات.
+    """
+    stages = stages if stages is not None else StageTimer()
+    with stages("parse"):
+        feed = feedparser.parse(content)
+    if not feed.entries:
+        return None
+    matcher = newspaper_matcher(newspaper)
+    seen = seen or {}
+    
+    entries = []
+    for entry in feed.entries[:limit]:
+        try:
+            key, digest = entry_key(entry), entry_digest(entry)
+            if seen.get(key) == digest:
+                entries.append(ParsedEntry(key, digest, False, None))
+                continue
+
+            # تاريخ النشر بتوقيت UTC
+            published_ts = entry_published_ts(entry)
+
+            # تنظيف العنوان والوصف
+            with stages("strip_html"):
+                title = strip_html(entry.get('title', ''))
+                description = strip_html(entry.get('summary', entry.get('description', '')))
             
-        return False
+            # فلترة الأخبار السياسية فقط
+            with stages("classify"):
+                political = is_political_news(title, description, matcher)
+            headline = None
+            if political:
+                url = entry.get('link', '')
+                headline = {
+                    'id': make_article_id(newspaper["name"], url, title),
+                    'title': title.strip(),
+                    'description': description.strip()[:300] if description else "",  # قطع الوصف عند 300 حرف
+                    'source': newspaper["name"],
+                    'published_at': from_timestamp(published_ts),
+                    'published_ts': published_ts,
+                    'category': newspaper["category"],
+                    'url': url,
+                    'image_url': entry_image_url(entry),
+                    'website': newspaper["website"]
+                }
+            entries.append(ParsedEntry(key, digest, True, headline))
+        except Exception as e:
+            logger.error(f"Error processing entry from {newspaper['name']}: {str(e)}")
+            continue
+    
+    return entries
+
+def parse_newspaper_headlines(
+    content: Union[str, bytes],
+    newspaper: Dict[str, Any],
+    limit: int = HEADLINES_MAX_ENTRIES,
+    stages: Optional[StageTimer] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """تحليل محتوى RSS واستخراج كل العناوين السياسية (يعمل داخل منفذ التحليل)
+
+    تُرجع None إذا لم يحتوِ الـ feed على أي مدخلات.
+    """
+    entries = parse_newspaper_entries(content, newspaper, limit, stages=stages)
+    if entries is None:
+        return None
+    return [entry.article for entry in entries if entry.article is not None]
+
+def prepare_newspaper(newspaper: Dict[str, Any]) -> Dict[str, Any]:
+    """إكمال حقول الصحيفة القادمة من سجل المصادر: التصنيف والموقع (أصل رابط الـ feed)"""
+    newspaper.setdefault("category", "سياسة")
+    if not newspaper.get("website"):
+        parts = urlsplit(newspaper["url"])
+        newspaper["website"] = f"{parts.scheme}://{parts.netloc}"
+    return newspaper
+
+def headlines_failure(headlines: List[Dict[str, Any]]) -> Optional[str]:
+    """سبب اعتبار نتيجة الجلب فاشلة (لقاطع الدائرة): العنوان البديل المؤقت فقط
+
+    فشل الاتصال أو HTTP أو التحليل ينتهي بالعنوان البديل. أما القائمة الفارغة فهي feed سليم
+    بلا عناوين سياسية حالياً، وليست فشلاً.
+    """
+    if any(headline.get('is_placeholder') for headline in headlines):
+        return "no working feed"
+    return None
+
+class LebanonNewsService:
+    def __init__(self, http: Optional[HttpClient] = None, newspapers: Optional[SourceRegistry] = None):
+        # مصادر RSS للصحف اللبنانية (من ملف المصادر أو MongoDB، قابلة لإعادة التحميل)
+        self.newspapers = newspapers or source_loader.registry("lebanon", prepare=prepare_newspaper)
+        self.http = http or http_client
+        self.conditional_get = ConditionalGetCache()
+        self.discovery = FeedDiscovery.from_env(self.http)
+        self.breakers = CircuitBreakers.from_env()
+        self.seen_entries = SeenEntries("Lebanon headlines")
+
+    @property
+    def lebanon_newspapers(self) -> List[Dict[str, Any]]:
+        return self.newspapers.sources
+
+    def is_political_news(self, title: str, description: str) -> bool:
+        """تحديد ما إذا كان الخبر سياسياً بناءً على الكلمات المفتاحية"""
+        return is_political_news(title, description)
 
     async def fetch_newspaper_headlines(self, newspaper: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """جلب العناوين من صحيفة واحدة"""
+        """جلب العناوين من صحيفة واحدة عبر قاطع الدائرة الخاص بها (ترفع CircuitOpenError إذا كانت معطلة)"""
+        return await self.breakers.call(
+            newspaper["name"], self._fetch_newspaper_headlines, newspaper, failed=headlines_failure
+        )
+
+    async def _fetch_newspaper_headlines(self, newspaper: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """جلب العناوين من صحيفة واحدة (من رابطها الأساسي أو البديل المكتشف)"""
+        feed_url = self.discovery.feed_url(newspaper)
         try:
-            session = await self.get_session()
-            async with session.get(newspaper["url"]) as response:
-                if response.status != 200:
-                    logger.warning(f"Failed to fetch RSS from {newspaper['name']}: {response.status}")
-                    # محاولة RSS بديل أو scraping مباشر
-                    return await self.fallback_scraping(newspaper)
-                
-                content = await response.text()
-                feed = feedparser.parse(content)
-                
-                headlines = []
-                for entry in feed.entries[:15]:  # أخذ آخر 15 عنوان
-                    try:
-                        # تنسيق التاريخ
-                        if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                            published_at = datetime(*entry.published_parsed[:6])
-                        elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                            published_at = datetime(*entry.updated_parsed[:6])
-                        else:
-                            published_at = datetime.now()
-
-                        # تنظيف العنوان والوصف
-                        title = re.sub(r'<[^>]+>', '', entry.get('title', ''))
-                        description = re.sub(r'<[^>]+>', '', entry.get('summary', entry.get('description', '')))
-                        
-                        # فلترة الأخبار السياسية فقط
-                        if self.is_political_news(title, description):
-                            # جلب الصورة إذا وجدت
-                            image_url = None
-                            if hasattr(entry, 'media_thumbnail') and entry.media_thumbnail:
-                                image_url = entry.media_thumbnail[0].get('url')
-                            elif hasattr(entry, 'enclosures') and entry.enclosures:
-                                for enclosure in entry.enclosures:
-                                    if enclosure.type.startswith('image/'):
-                                        image_url = enclosure.href
-                                        break
-
-                            headlines.append({
-                                'title': title.strip(),
-                                'description': description.strip()[:300] if description else "",  # قطع الوصف عند 300 حرف
-                                'source': newspaper["name"],
-                                'published_at': published_at,
-                                'category': newspaper["category"],
-                                'url': entry.get('link', ''),
-                                'image_url': image_url,
-                                'website': newspaper["website"]
-                            })
-                    except Exception as e:
-                        logger.error(f"Error processing entry from {newspaper['name']}: {str(e)}")
-                        continue
-
-                logger.info(f"Fetched {len(headlines)} political headlines from {newspaper['name']}")
+            headlines = await self.fetch_feed(newspaper, feed_url)
+            if headlines is not None:
+                self.discovery.confirm(newspaper, feed_url)
                 return headlines
-
         except Exception as e:
             logger.error(f"Error fetching RSS from {newspaper['name']}: {str(e)}")
-            return await self.fallback_scraping(newspaper)
 
-    async def fallback_scraping(self, newspaper: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """طريقة بديلة لجلب الأخبار في حال فشل RSS"""
+        # محاولة RSS بديل
+        return await self.fallback_scraping(newspaper, failed_url=feed_url)
+
+    async def fetch_feed(self, newspaper: Dict[str, Any], feed_url: str) -> Optional[List[Dict[str, Any]]]:
+        """جلب وتحليل feed من رابط محدد؛ تُرجع None إذا لم يُرجع الرابط feed صالحاً"""
+        headers = self.conditional_get.request_headers(feed_url)
+        async with self.http.get(feed_url, headers=headers) as response:
+            if response.status == 304:
+                headlines = self.conditional_get.not_modified(feed_url)
+                if headlines is not None:
+                    logger.info(f"RSS from {newspaper['name']} not modified, reusing {len(headlines)} headlines")
+                    return headlines
+
+            if response.status != 200:
+                logger.warning(f"Failed to fetch RSS from {newspaper['name']}: {response.status}")
+                return None
+
+            # قراءة المدخلات المطلوبة فقط ثم إغلاق الاتصال
+            limit = newspaper.get("limit", HEADLINES_MAX_ENTRIES)
+            body = await read_feed(response, limit)
+            response_headers = response.headers
+
+        # التحليل خارج حلقة الأحداث حتى لا يعطل feed كبير بقية الطلبات،
+        # مع معالجة المدخلات الجديدة أو المعدلة فقط
+        entries, stages = await parse_pool.run_timed(
+            parse_newspaper_entries, body.content, newspaper, limit,
+            self.seen_entries.digests(newspaper["name"])
+        )
+        stages.observe(PARSE_STAGE_SECONDS, source=newspaper["name"])
+        if entries is None:
+            logger.warning(f"No feed entries found at {feed_url} for {newspaper['name']}")
+            return None
+        headlines = self.seen_entries.merge(newspaper["name"], entries)
+
+        self.conditional_get.remember(feed_url, response_headers, body.bytes_read, headlines)
+        logger.info(f"Fetched {len(headlines)} political headlines from {newspaper['name']}")
+        return headlines
+
+    async def fallback_scraping(self, newspaper: Dict[str, Any], failed_url: Optional[str] = None) -> List[Dict[str, Any]]:
+        """طريقة بديلة لجلب الأخبار في حال فشل RSS: اكتشاف رابط feed آخر للصحيفة"""
         try:
-            # محاولة URLs بديلة شائعة للـ RSS
-            alternative_urls = [
-                f"{newspaper['website']}/feed",
-                f"{newspaper['website']}/rss",
-                f"{newspaper['website']}/feed.xml",
-                f"{newspaper['website']}/rss.xml",
-                f"{newspaper['website']}/feeds/all.xml"
-            ]
-            
-            session = await self.get_session()
-            for alt_url in alternative_urls:
-                try:
-                    async with session.get(alt_url) as response:
-                        if response.status == 200:
-                            content = await response.text()
-                            feed = feedparser.parse(content)
-                            if feed.entries:
-                                logger.info(f"Alternative RSS found for {newspaper['name']}: {alt_url}")
-                                # استخدام نفس المنطق كالطريقة الأساسية
-                                headlines = []
-                                for entry in feed.entries[:10]:
-                                    title = re.sub(r'<[^>]+>', '', entry.get('title', ''))
-                                    description = re.sub(r'<[^>]+>', '', entry.get('summary', ''))
-                                    
-                                    if self.is_political_news(title, description):
-                                        headlines.append({
-                                            'title': title.strip(),
-                                            'description': description.strip()[:300],
-                                            'source': newspaper["name"],
-                                            'published_at': datetime.now(),
-                                            'category': newspaper["category"],
-                                            'url': entry.get('link', ''),
-                                            'image_url': None,
-                                            'website': newspaper["website"]
-                                        })
-                                return headlines
-                except:
-                    continue
-            
-            # إذا فشل كل شيء، إرجاع عناوين وهمية للاختبار
+            if failed_url is not None and failed_url != newspaper["url"]:
+                # الرابط البديل المحفوظ توقف عن العمل
+                self.discovery.forget(newspaper["name"])
+
+            async def validate(content: bytes) -> Optional[List[Dict[str, Any]]]:
+                headlines, stages = await parse_pool.run_timed(parse_newspaper_headlines, content, newspaper, limit)
+                stages.observe(PARSE_STAGE_SECONDS, source=newspaper["name"])
+                return headlines
+
+            limit = newspaper.get("limit", HEADLINES_MAX_ENTRIES)
+            exclude = (failed_url,) if failed_url else ()
+            found = await self.discovery.discover(
+                newspaper, validate, exclude=exclude, max_entries=limit
+            )
+            if found is not None:
+                return found[1]
+
+            # إذا فشل كل شيء، إرجاع عنوان بديل مؤقت
             logger.warning(f"All methods failed for {newspaper['name']}, returning placeholder")
-            return [{
-                'title': f"لا يمكن جلب الأخبار من {newspaper['name']} حالياً",
-                'description': "يرجى المحاولة لاحقاً أو زيارة الموقع مباشرة",
-                'source': newspaper["name"],
-                'published_at': datetime.now(),
-                'category': newspaper["category"],
-                'url': newspaper["website"],
-                'image_url': None,
-                'website': newspaper["website"]
-            }]
+            return self.placeholder_headlines(newspaper)
             
         except Exception as e:
             logger.error(f"Fallback scraping failed for {newspaper['name']}: {str(e)}")
-            return []
+            return self.placeholder_headlines(newspaper)
+
+    def placeholder_headlines(self, newspaper: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """عنوان بديل مؤقت يدل على فشل الجلب (لا يُحفظ ولا يحل محل عناوين حقيقية)"""
+        placeholder_title = f"لا يمكن جلب الأخبار من {newspaper['name']} حالياً"
+        published_ts = int(time.time())
+        return [{
+            'id': make_article_id(newspaper["name"], newspaper["website"], placeholder_title),
+            'title': placeholder_title,
+            'description': "يرجى المحاولة لاحقاً أو زيارة الموقع مباشرة",
+            'source': newspaper["name"],
+            'published_at': from_timestamp(published_ts),
+            'published_ts': published_ts,
+            'category': newspaper["category"],
+            'url': newspaper["website"],
+            'image_url': None,
+            'website': newspaper["website"],
+            'is_placeholder': True  # لا يُحفظ في قاعدة البيانات
+        }]
 
     async def fetch_all_lebanon_headlines(self) -> Dict[str, List[Dict[str, Any]]]:
         """جلب جميع العناوين السياسية من الصحف اللبنانية"""
+        newspapers = list(self.lebanon_newspapers)
         tasks = []
-        for newspaper in self.lebanon_newspapers:
+        for newspaper in newspapers:
             tasks.append(self.fetch_newspaper_headlines(newspaper))
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        organized_headlines = {}
+        headlines_by_newspaper = {}
         for i, result in enumerate(results):
-            newspaper_name = self.lebanon_newspapers[i]["name"]
+            newspaper_name = newspapers[i]["name"]
             if isinstance(result, Exception):
                 logger.error(f"Failed to fetch from {newspaper_name}: {result}")
-                organized_headlines[newspaper_name] = []
+                headlines_by_newspaper[newspaper_name] = []
             else:
-                # ترتيب حسب التاريخ (الأحدث أولاً)
-                sorted_headlines = sorted(result, key=lambda x: x['published_at'], reverse=True)
-                organized_headlines[newspaper_name] = sorted_headlines[:10]  # أقصى 10 عناوين لكل صحيفة
+                sort_newest_first(result)
+                headlines_by_newspaper[newspaper_name] = result
+        
+        return self.organize_headlines(headlines_by_newspaper)
+
+    def organize_headlines(self, headlines_by_newspaper: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+        """الإبقاء على أحدث عناوين كل صحيفة (قوائم الصحف مرتبة مسبقاً، الأحدث أولاً)"""
+        organized_headlines = {}
+        for newspaper_name, headlines in headlines_by_newspaper.items():
+            organized_headlines[newspaper_name] = headlines[:10]  # أقصى 10 عناوين لكل صحيفة
         
         logger.info(f"Fetched headlines from {len(organized_headlines)} Lebanese newspapers")
         return organized_headlines
-
-    async def close(self):
-        """إغلاق الجلسة"""
-        if self.session:
-            await self.session.close()
-            self.session = None
\ No newline at end of file
@@ -0,0 +1,267 @@
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# حدود الفئات بالثواني: من أجزاء المللي ثانية (التصنيف، السلسلة) إلى عشرات الثواني (الجلب)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """أساس المقاييس: اسم ووصف وأسماء تسميات ثابتة"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # التحديث قد يأتي من خيوط منفذ التحليل
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(line + "\n" for line in self.samples())
+
+
+class Counter(Metric):
+    """قيمة متزايدة فقط؛ مع function تُقرأ من عدادات موجودة عند العرض (مثل Gauge)"""
+
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        function: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self.function = function
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        return _samples(self)
+
+
+class Gauge(Metric):
+    """قيمة لحظية؛ مع function تُقرأ القيم عند العرض فقط (بدون أي كلفة أثناء العمل)"""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        function: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self.function = function
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self) -> List[str]:
+        return _samples(self)
+
+
+def _samples(metric) -> List[str]:
+    # قيم Counter و Gauge: من function إن وُجدت وإلا من القيم المسجلة
+    if metric.function is not None:
+        try:
+            values = list(metric.function().items())
+        except Exception as e:
+            logger.error(f"Collecting {metric.kind} {metric.name} failed: {str(e)}")
+            values = []
+    else:
+        with metric._lock:
+            values = list(metric._values.items())
+    return [f"{metric.name}{_format_labels(metric.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # لكل مجموعة تسميات: [عدد كل فئة...، المجموع، العدد]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """قياس مدة كتلة من الكود"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(state)) for key, state in self._values.items()]
+        lines = []
+        for key, state in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(float(bound))}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+class StageTimer:
+    """جمع أزمنة مراحل متكررة (مثلاً لكل مدخل في feed) وتسجيل مجموعها مرة واحدة"""
+
+    __slots__ = ("totals",)
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+
+    @contextmanager
+    def __call__(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[stage] = self.totals.get(stage, 0.0) + time.perf_counter() - started
+
+    def observe(self, histogram: Histogram, **labels):
+        for stage, seconds in self.totals.items():
+            histogram.observe(seconds, stage=stage, **labels)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = (), function=None) -> Counter:
+        return self.register(Counter(name, documentation, labelnames, function))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (), function=None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """كل المقاييس بصيغة Prometheus النصية"""
+        return "".join(metric.render() for metric in self._metrics.values())
+
+
+class LoopLagMonitor:
+    """قياس تأخر حلقة الأحداث: الفرق بين موعد الاستيقاظ المتوقع والفعلي"""
+
+    def __init__(self, histogram: Histogram, gauge: Gauge, interval: float = 0.5):
+        self.histogram = histogram
+        self.gauge = gauge
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.histogram.observe(lag)
+            self.gauge.set(lag)
+
+
+# السجل المشترك والمقاييس المستخدمة في الخدمات والمسارات
+metrics = MetricsRegistry()
+
+FETCH_SECONDS = metrics.histogram(
+    "news_fetch_seconds", "Duration of one source fetch including parsing", ("feed", "source", "outcome")
+)
+PARSE_STAGE_SECONDS = metrics.histogram(
+    "news_parse_stage_seconds",
+    "Time spent per feed in each parsing stage (parse, strip_html, classify)",
+    ("source", "stage"),
+)
+ROUTE_STAGE_SECONDS = metrics.histogram(
+    "news_route_stage_seconds", "Time spent per request in each route stage (dedup, organize, search, cluster, models, serialize)",
+    ("endpoint", "stage"),
+)
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_seconds", "API request duration", ("method", "endpoint", "status")
+)
+FEED_ENTRIES = metrics.counter(
+    "news_feed_entries_total", "Feed entries per fetch by result (processed, skipped as unchanged)", ("feed", "result")
+)
+CACHE_REQUESTS = metrics.counter(
+    "news_cache_requests_total", "Snapshot cache lookups by result (hit, stale, miss)", ("cache", "result")
+)
+LOOP_LAG_SECONDS = metrics.histogram(
+    "event_loop_lag_seconds", "Event loop scheduling lag",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+LOOP_LAG_LAST = metrics.gauge("event_loop_lag_last_seconds", "Most recent event loop lag sample")
+
+loop_lag_monitor = LoopLagMonitor(LOOP_LAG_SECONDS, LOOP_LAG_LAST)
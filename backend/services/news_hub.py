@@ -0,0 +1,155 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set
+
+from services.article_record import published_ts
+
+logger = logging.getLogger(__name__)
+
+
+class NewsEvent:
+    """حدث خبر جديد مُسلسل مرة واحدة لكل المشتركين"""
+
+    __slots__ = ("id", "article_id", "data", "sse")
+
+    def __init__(self, event_id: int, article_id: str, data: str):
+        self.id = event_id
+        self.article_id = article_id
+        self.data = data
+        self.sse = f"id: {event_id}\nevent: breaking\ndata: {data}\n\n"
+
+
+class Subscription:
+    """اشتراك واحد في الأحداث مع طابور محدود الحجم"""
+
+    def __init__(self, hub: "NewsHub", backlog: List[NewsEvent], max_pending: int):
+        self._hub = hub
+        self._pending: Deque[NewsEvent] = deque(backlog)
+        self._max_pending = max_pending
+        self._ready = asyncio.Event()
+        self.overflowed = False
+        self.closed = False
+        if backlog:
+            self._ready.set()
+
+    def _push(self, event: NewsEvent) -> bool:
+        if len(self._pending) >= self._max_pending:
+            # مشترك بطيء: يُفصل ليعيد الاتصال مع Last-Event-ID ويستكمل من السجل
+            self.overflowed = True
+            self._ready.set()
+            return False
+        self._pending.append(event)
+        self._ready.set()
+        return True
+
+    async def next_events(self, timeout: Optional[float] = None) -> List[NewsEvent]:
+        """انتظار الأحداث الجديدة وإرجاعها دفعة واحدة (قائمة فارغة عند انتهاء المهلة)"""
+        if not self._pending and not self.overflowed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._ready.clear()
+        events = list(self._pending)
+        self._pending.clear()
+        return events
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._hub._unsubscribe(self)
+
+
+class NewsHub:
+    """موزع الأخبار العاجلة الجديدة على كل المشتركين (SSE / WebSocket)
+
+    كل خبر يُسلسل مرة واحدة ويُضاف إلى سجل محدود يسمح بالاستكمال عبر Last-Event-ID،
+    فلا تكلف آلاف الاشتراكات أكثر من دورة جلب واحدة.
+    مع تعدد العمال ينشر القائد معرفات أحداثه (export_ids) ويعتمدها بقية العمال (adopt_ids)
+    قبل وصول نفس المقالات إليهم، فيصلح Last-Event-ID أياً كان العامل الذي يعيد المتصفح الاتصال به.
+    """
+
+    def __init__(self, history_size: int = 500, max_pending: int = 200, seen_size: int = 10000):
+        # معرفات الأحداث تبدأ من الوقت الحالي بالمللي ثانية لتبقى متزايدة بعد إعادة التشغيل
+        self._last_id = int(time.time() * 1000)
+        self._history: Deque[NewsEvent] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscription] = set()
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        # معرفات أحداث القائد للمقالات التي لم تصل بعد إلى هذا العامل
+        self._assigned: Dict[str, int] = {}
+        self.seen_size = seen_size
+        self.max_pending = max_pending
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def mark_seen(self, articles: Iterable[Dict[str, Any]]):
+        """اعتبار المقالات معروفة دون نشرها (مثلاً عند الاستعادة من قاعدة البيانات)"""
+        for article in articles:
+            self._remember(article['id'])
+
+    def _remember(self, article_id: str):
+        self._seen[article_id] = None
+        if len(self._seen) > self.seen_size:
+            self._seen.popitem(last=False)
+
+    def export_ids(self) -> Dict[str, Any]:
+        """آخر معرف ومعرفات الأحداث في السجل لنشرها لبقية العمال"""
+        return {
+            "last_id": self._last_id,
+            "events": {event.article_id: event.id for event in self._history},
+        }
+
+    def adopt_ids(self, state: Dict[str, Any]):
+        """اعتماد معرفات القائد للمقالات التي ستُنشر بعدها (على غير القائد)"""
+        self._assigned = {
+            article_id: event_id for article_id, event_id in state["events"].items()
+            if article_id not in self._seen
+        }
+        # إذا صار هذا العامل قائداً تكمل معرفاته بعد آخر معرف للقائد السابق
+        self._last_id = max(self._last_id, state["last_id"])
+
+    def publish(self, articles: Iterable[Dict[str, Any]], serialize: Callable[[Dict[str, Any]], str] = None) -> int:
+        """نشر الأخبار العاجلة التي لم تُنشر من قبل، وإرجاع عددها"""
+        serialize = serialize or (lambda article: json.dumps(article, ensure_ascii=False, default=str))
+        new_articles = [
+            article for article in articles
+            if article.get('is_breaking') and article['id'] not in self._seen
+        ]
+        new_articles.sort(key=published_ts)
+
+        events = []
+        for article in new_articles:
+            self._remember(article['id'])
+            event_id = self._assigned.pop(article['id'], None)
+            if event_id is None:
+                self._last_id += 1
+                event_id = self._last_id
+            events.append(NewsEvent(event_id, article['id'], serialize(article)))
+        events.sort(key=lambda event: event.id)
+
+        for event in events:
+            self._history.append(event)
+            for subscription in list(self._subscribers):
+                if not subscription._push(event):
+                    self._unsubscribe(subscription)
+
+        if new_articles:
+            logger.info(f"Published {len(new_articles)} new breaking articles to {len(self._subscribers)} subscribers")
+        return len(new_articles)
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """اشتراك جديد؛ مع last_event_id تُرسل أولاً الأحداث الفائتة من السجل"""
+        backlog = []
+        if last_event_id is not None:
+            backlog = [event for event in self._history if event.id > last_event_id]
+        subscription = Subscription(self, backlog[-self.max_pending:], self.max_pending)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
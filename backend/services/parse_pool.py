@@ -0,0 +1,79 @@
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from services.metrics import StageTimer
+
+logger = logging.getLogger(__name__)
+
+
+def _call_with_stages(func: Callable[..., Any], args: Tuple[Any, ...]) -> Tuple[Any, dict]:
+    # يعمل داخل المنفذ: أزمنة المراحل تعود مع النتيجة لأن مقاييس عملية فرعية لا تصل للعملية الأم
+    stages = StageTimer()
+    return func(*args, stages=stages), stages.totals
+
+
+class ParsePool:
+    """تنفيذ تحليل الـ feeds (عمل CPU متزامن) خارج حلقة الأحداث
+
+    kind: "thread" أو "process" (العمليات تتجنب قفل GIL لكن تتطلب دوالاً ومعاملات قابلة للتسلسل).
+    max_pending: الحد الأقصى للمهام المرسلة أو المنتظرة في المنفذ؛ ما زاد ينتظر في الحلقة
+    دون أن يملأ طابور المنفذ.
+    """
+
+    def __init__(self, kind: str = "thread", workers: Optional[int] = None, max_pending: Optional[int] = None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown parse pool kind: {kind}")
+        self.kind = kind
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending or self.workers * 2
+        self._executor: Optional[Executor] = None
+        self._slots = asyncio.Semaphore(self.max_pending)
+
+    @classmethod
+    def from_env(cls) -> "ParsePool":
+        workers = os.environ.get('FEED_PARSE_WORKERS')
+        max_pending = os.environ.get('FEED_PARSE_MAX_PENDING')
+        return cls(
+            kind=os.environ.get('FEED_PARSE_EXECUTOR', 'thread'),
+            workers=int(workers) if workers else None,
+            max_pending=int(max_pending) if max_pending else None,
+        )
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="feed-parse")
+            logger.info(f"Started {self.kind} parse pool with {self.workers} workers")
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """تشغيل func(*args) في المنفذ وانتظار النتيجة"""
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args))
+
+    async def run_timed(self, func: Callable[..., Any], *args: Any) -> Tuple[Any, StageTimer]:
+        """تشغيل func(*args, stages=StageTimer) في المنفذ وإرجاع النتيجة مع أزمنة مراحلها
+
+        تُسجل الأزمنة في العملية الأم (stages.observe) فتظهر في المقاييس مع منفذ العمليات أيضاً.
+        """
+        result, totals = await self.run(_call_with_stages, func, args)
+        stages = StageTimer()
+        stages.totals = totals
+        return result, stages
+
+    def shutdown(self):
+        """إيقاف المنفذ (يُستدعى عند إغلاق التطبيق)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# منفذ مشترك بين الخدمات
+parse_pool = ParsePool.from_env()
@@ -1,130 +1,184 @@
 import feedparser
 import asyncio
-import aiohttp
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Union
 import logging
 import re
-from urllib.parse import urljoin
+from services.circuit_breaker import CircuitBreakers
+from services.conditional_get import ConditionalGetCache
+from services.http_client import HttpClient, http_client
+from services.feed_stream import read_feed
+from services.article_record import from_timestamp, merge_newest_first, sort_newest_first
+from services.feed_parsing import strip_html, entry_published_ts, entry_image_url, make_article_id
+from services.keyword_matcher import KeywordMatcher, get_matcher
+from services.metrics import PARSE_STAGE_SECONDS, StageTimer
+from services.parse_pool import parse_pool
+from services.seen_entries import ParsedEntry, SeenEntries, entry_digest, entry_key
+from services.source_registry import SourceRegistry, source_loader
 
 logger = logging.getLogger(__name__)
 
+# الكلمات المفتاحية لكل تصنيف (الترتيب يحدد أولوية التصنيف)
+CATEGORY_KEYWORDS = {
+    "سياسة": ["سياسة", "حكومة", "رئيس", "وزير", "برلمان", "انتخابات", "دبلوماسية"],
+    "اقتصاد": ["اقتصاد", "تجارة", "استثمار", "أسعار", "تضخم", "بورصة", "شركة"],
+    "رياضة": ["رياضة", "كرة", "مباراة", "بطولة", "فريق", "لاعب"],
+    "تكنولوجيا": ["تكنولوجيا", "إنترنت", "ذكي", "رقمي", "تقني", "برمجة"],
+    "صحة": ["صحة", "طب", "علاج", "مرض", "وباء", "طبيب", "مستشفى"],
+    "علوم": ["علم", "اكتشاف", "بحث", "دراسة", "تجربة", "عالم"]
+}
+DEFAULT_CATEGORY = "عام"
+
+# اسم مجموعة كلمات الأخبار العاجلة داخل المطابق
+BREAKING_GROUP = "breaking"
+
+# عدد المدخلات المأخوذة من كل feed (وما بعدها لا يُقرأ أصلاً)
+RSS_MAX_ENTRIES = 20
+
+# كلمات الأخبار العاجلة للمصادر التي لا تحدد breaking_keywords
+DEFAULT_BREAKING_KEYWORDS = ["عاجل", "الآن", "فوري"]
+
+def prepare_rss_source(source: Dict[str, Any]) -> Dict[str, Any]:
+    """إكمال حقول مصدر RSS القادم من سجل المصادر"""
+    source.setdefault("breaking_keywords", DEFAULT_BREAKING_KEYWORDS)
+    return source
+
+def get_article_matcher(breaking_keywords: List[str]) -> KeywordMatcher:
+    """مطابق واحد لكلمات التصنيفات وكلمات الأخبار العاجلة الخاصة بالمصدر"""
+    return get_matcher({**CATEGORY_KEYWORDS, BREAKING_GROUP: breaking_keywords})
+
+def classify_article(title: str, description: str, matcher: KeywordMatcher) -> Tuple[bool, str]:
+    """تحديد ما إذا كان الخبر عاجلاً وتصنيفه في مرور واحد على النص"""
+    result = matcher.match(f"{title} {description}")
+    category = result.first_group(CATEGORY_KEYWORDS) or DEFAULT_CATEGORY
+    return BREAKING_GROUP in result.groups, category
+
+def is_breaking_news(title: str, description: str, keywords: List[str]) -> bool:
+    """تحديد ما إذا كان الخبر عاجلاً بناءً على الكلمات المفتاحية"""
+    return BREAKING_GROUP in get_matcher({BREAKING_GROUP: keywords}).match(f"{title} {description}").groups
+
+def categorize_news(title: str, description: str) -> str:
+    """تصنيف الأخبار بناءً على المحتوى"""
+    result = get_matcher(CATEGORY_KEYWORDS).match(f"{title} {description}")
+    return result.first_group(CATEGORY_KEYWORDS) or DEFAULT_CATEGORY
+
+def parse_rss_entries(
+    content: Union[str, bytes],
+    source: Dict[str, Any],
+    seen: Optional[Dict[str, str]] = None,
+    stages: Optional[StageTimer] = None
+) -> List[ParsedEntry]:
+    """تحليل محتوى RSS وتحويل المدخلات الجديدة أو المعدلة فقط إلى مقالات (يعمل داخل منفذ التحليل)
+
+    seen: بصمات المدخلات المعالجة في الجلب السابق (المفتاح ← البصمة)؛ ما لم تتغير بصمته لا يُعالج.
+    stages: تُجمع فيه أزمنة مراحل التحليل ليسجلها المستدعي (parse_pool.run_timed).
+    """
+    stages = stages if stages is not None else StageTimer()
+    with stages("parse"):
+        feed = feedparser.parse(content)
+    matcher = get_article_matcher(source["breaking_keywords"])
+    seen = seen or {}
+    
+    entries = []
+    for entry in feed.entries[:source.get("limit", RSS_MAX_ENTRIES)]:  # أخذ آخر 20 خبر فقط (أو limit المصدر)
+        try:
+            key, digest = entry_key(entry), entry_digest(entry)
+            if seen.get(key) == digest:
+                entries.append(ParsedEntry(key, digest, False, None))
+                continue
+
+            # تاريخ النشر بتوقيت UTC
+            published_ts = entry_published_ts(entry)
+
+            # تنظيف العنوان والوصف
+            with stages("strip_html"):
+                title = strip_html(entry.get('title', ''))
+                description = strip_html(entry.get('summary', entry.get('description', '')))
+            
+            # تحديد ما إذا كان الخبر عاجلاً والتصنيف التلقائي
+            with stages("classify"):
+                is_breaking, category = classify_article(title, description, matcher)
+            
+            url = entry.get('link', '')
+            entries.append(ParsedEntry(key, digest, True, {
+                'id': make_article_id(source["name"], url, title),
+                'title': title.strip(),
+                'description': description.strip()[:500],  # قطع الوصف عند 500 حرف
+                'source': source["name"],
+                'published_at': from_timestamp(published_ts),
+                'published_ts': published_ts,
+                'category': category,
+                'is_breaking': is_breaking,
+                'url': url,
+                'image_url': entry_image_url(entry)
+            }))
+        except Exception as e:
+            logger.error(f"Error processing entry from {source['name']}: {str(e)}")
+            continue
+    
+    return entries
+
+def parse_rss_articles(content: Union[str, bytes], source: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """تحليل محتوى RSS وتحويل كل مدخلاته إلى مقالات (يعمل داخل منفذ التحليل)"""
+    return [entry.article for entry in parse_rss_entries(content, source) if entry.article is not None]
+
+def feed_failure(articles: List[Dict[str, Any]]) -> Optional[str]:
+    """سبب اعتبار نتيجة الجلب فاشلة (لقاطع الدائرة)"""
+    return None if articles else "no articles returned"
+
 class RSSService:
-    def __init__(self):
-        # مصادر RSS للأخبار العاجلة العربية
-        self.rss_sources = [
-            {
-                "name": "الجزيرة",
-                "url": "https://www.aljazeera.net/rss/all",
-                "breaking_keywords": ["عاجل", "الآن", "فوري", "طارئ", "عذراً"]
-            },
-            {
-                "name": "العربية",
-                "url": "https://www.alarabiya.net/arab-and-world.rss",
-                "breaking_keywords": ["عاجل", "الآن", "سريع", "فوري"]
-            },
-            {
-                "name": "BBC عربي",
-                "url": "https://feeds.bbci.co.uk/arabic/rss.xml",
-                "breaking_keywords": ["عاجل", "الآن", "سريع"]
-            },
-            {
-                "name": "سكاي نيوز عربية",
-                "url": "https://www.skynewsarabia.com/rss",
-                "breaking_keywords": ["عاجل", "فوري", "الآن"]
-            }
-        ]
-        self.session = None
-
-    async def get_session(self):
-        if not self.session:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout)
-        return self.session
+    def __init__(self, http: Optional[HttpClient] = None, sources: Optional[SourceRegistry] = None):
+        # مصادر RSS للأخبار العاجلة العربية (من ملف المصادر أو MongoDB، قابلة لإعادة التحميل)
+        self.sources = sources or source_loader.registry("breaking", prepare=prepare_rss_source)
+        self.http = http or http_client
+        self.conditional_get = ConditionalGetCache()
+        self.breakers = CircuitBreakers.from_env()
+        self.seen_entries = SeenEntries("breaking news")
+
+    @property
+    def rss_sources(self) -> List[Dict[str, Any]]:
+        return self.sources.sources
 
     def is_breaking_news(self, title: str, description: str, keywords: List[str]) -> bool:
         """تحديد ما إذا كان الخبر عاجلاً بناءً على الكلمات المفتاحية"""
-        text = f"{title} {description}".lower()
-        return any(keyword in text for keyword in keywords)
+        return is_breaking_news(title, description, keywords)
 
     def categorize_news(self, title: str, description: str) -> str:
         """تصنيف الأخبار بناءً على المحتوى"""
-        text = f"{title} {description}".lower()
-        
-        categories = {
-            "سياسة": ["سياسة", "حكومة", "رئيس", "وزير", "برلمان", "انتخابات", "دبلوماسية"],
-            "اقتصاد": ["اقتصاد", "تجارة", "استثمار", "أسعار", "تضخم", "بورصة", "شركة"],
-            "رياضة": ["رياضة", "كرة", "مباراة", "بطولة", "فريق", "لاعب"],
-            "تكنولوجيا": ["تكنولوجيا", "إنترنت", "ذكي", "رقمي", "تقني", "برمجة"],
-            "صحة": ["صحة", "طب", "علاج", "مرض", "وباء", "طبيب", "مستشفى"],
-            "علوم": ["علم", "اكتشاف", "بحث", "دراسة", "تجربة", "عالم"]
-        }
-        
-        for category, keywords in categories.items():
-            if any(keyword in text for keyword in keywords):
-                return category
-        
-        return "عام"
+        return categorize_news(title, description)
 
     async def fetch_rss_feed(self, source: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """جلب RSS feed من مصدر واحد"""
+        """جلب RSS feed من مصدر واحد عبر قاطع الدائرة الخاص به (ترفع CircuitOpenError إذا كان معطلاً)"""
+        return await self.breakers.call(source["name"], self._fetch_rss_feed, source, failed=feed_failure)
+
+    async def _fetch_rss_feed(self, source: Dict[str, Any]) -> List[Dict[str, Any]]:
         try:
-            session = await self.get_session()
-            async with session.get(source["url"]) as response:
+            headers = self.conditional_get.request_headers(source["url"])
+            async with self.http.get(source["url"], headers=headers) as response:
+                if response.status == 304:
+                    articles = self.conditional_get.not_modified(source["url"])
+                    if articles is not None:
+                        logger.info(f"RSS from {source['name']} not modified, reusing {len(articles)} articles")
+                        return articles
+                
                 if response.status != 200:
                     logger.warning(f"Failed to fetch RSS from {source['name']}: {response.status}")
                     return []
                 
-                content = await response.text()
-                feed = feedparser.parse(content)
-                
-                articles = []
-                for entry in feed.entries[:20]:  # أخذ آخر 20 خبر فقط
-                    try:
-                        # تنسيق التاريخ
-                        if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                            published_at = datetime(*entry.published_parsed[:6])
-                        elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                            published_at = datetime(*entry.updated_parsed[:6])
-                        else:
-                            published_at = datetime.now()
-
-                        # تنظيف العنوان والوصف
-                        title = re.sub(r'<[^>]+>', '', entry.get('title', ''))
-                        description = re.sub(r'<[^>]+>', '', entry.get('summary', entry.get('description', '')))
-                        
-                        # تحديد ما إذا كان الخبر عاجلاً
-                        is_breaking = self.is_breaking_news(title, description, source["breaking_keywords"])
-                        
-                        # التصنيف التلقائي
-                        category = self.categorize_news(title, description)
-                        
-                        # جلب الصورة إذا وجدت
-                        image_url = None
-                        if hasattr(entry, 'media_thumbnail') and entry.media_thumbnail:
-                            image_url = entry.media_thumbnail[0].get('url')
-                        elif hasattr(entry, 'enclosures') and entry.enclosures:
-                            for enclosure in entry.enclosures:
-                                if enclosure.type.startswith('image/'):
-                                    image_url = enclosure.href
-                                    break
-
-                        articles.append({
-                            'title': title.strip(),
-                            'description': description.strip()[:500],  # قطع الوصف عند 500 حرف
-                            'source': source["name"],
-                            'published_at': published_at,
-                            'category': category,
-                            'is_breaking': is_breaking,
-                            'url': entry.get('link', ''),
-                            'image_url': image_url
-                        })
-                    except Exception as e:
-                        logger.error(f"Error processing entry from {source['name']}: {str(e)}")
-                        continue
-
-                logger.info(f"Fetched {len(articles)} articles from {source['name']}")
-                return articles
+                # قراءة المدخلات المطلوبة فقط ثم إغلاق الاتصال
+                body = await read_feed(response, source.get("limit", RSS_MAX_ENTRIES))
+                response_headers = response.headers
+
+            # التحليل خارج حلقة الأحداث حتى لا يعطل feed كبير بقية الطلبات،
+            # مع معالجة المدخلات الجديدة أو المعدلة فقط
+            entries, stages = await parse_pool.run_timed(
+                parse_rss_entries, body.content, source, self.seen_entries.digests(source["name"])
+            )
+            stages.observe(PARSE_STAGE_SECONDS, source=source["name"])
+            articles = self.seen_entries.merge(source["name"], entries)
+
+            self.conditional_get.remember(source["url"], response_headers, body.bytes_read, articles)
+            logger.info(f"Fetched {len(articles)} articles from {source['name']}")
+            return articles
 
         except Exception as e:
             logger.error(f"Error fetching RSS from {source['name']}: {str(e)}")
@@ -138,33 +192,32 @@ class RSSService:
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        all_articles = []
+        articles_by_source = []
         for result in results:
             if isinstance(result, Exception):
                 logger.error(f"RSS fetch failed: {result}")
                 continue
-            all_articles.extend(result)
-        
-        # فلترة الأخبار العاجلة فقط
-        breaking_news = [article for article in all_articles if article['is_breaking']]
+            sort_newest_first(result)
+            articles_by_source.append(result)
         
-        # ترتيب حسب التاريخ (الأحدث أولاً)
-        breaking_news.sort(key=lambda x: x['published_at'], reverse=True)
-        
-        # إزالة الأخبار المكررة بناءً على العنوان
+        return self.build_breaking_news(articles_by_source)
+
+    def build_breaking_news(self, articles_by_source: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """دمج مقالات المصادر (كل قائمة مرتبة، الأحدث أولاً) في قائمة واحدة من الأخبار العاجلة"""
+        # دمج القوائم المرتبة بدل جمعها وإعادة ترتيبها، والتوقف عند أول 50 خبر عاجل مختلف
         seen_titles = set()
         unique_breaking_news = []
-        for article in breaking_news:
+        for article in merge_newest_first(articles_by_source):
+            # فلترة الأخبار العاجلة فقط
+            if not article['is_breaking']:
+                continue
+            # إزالة الأخبار المكررة بناءً على العنوان
             title_clean = re.sub(r'[^\w\s]', '', article['title'].lower())
             if title_clean not in seen_titles:
                 seen_titles.add(title_clean)
                 unique_breaking_news.append(article)
+                if len(unique_breaking_news) == 50:  # أقصى 50 خبر عاجل
+                    break
         
         logger.info(f"Fetched {len(unique_breaking_news)} unique breaking news articles")
-        return unique_breaking_news[:50]  # أقصى 50 خبر عاجل
-
-    async def close(self):
-        """إغلاق الجلسة"""
-        if self.session:
-            await self.session.close()
-            self.session = None
\ No newline at end of file
+        return unique_breaking_news
@@ -0,0 +1,191 @@
+import heapq
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from services.article_record import ArticleRecord
+from services.keyword_matcher import normalize_arabic
+
+TOKEN_RE = re.compile(r'\w+')
+
+# السوابق الملتصقة بالكلمة (أداة التعريف مع حروف العطف والجر)
+ARABIC_PREFIXES = ("وال", "بال", "كال", "فال", "لل", "ال")
+
+# وزن الكلمات الواردة في العنوان مقارنة بالوصف
+TITLE_WEIGHT = 2
+
+
+def token_variants(token: str) -> Set[str]:
+    """أشكال الكلمة المفهرسة: الكلمة نفسها وصيغتها بعد حذف السوابق"""
+    variants = {token}
+    for prefix in ARABIC_PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+            variants.add(token[len(prefix):])
+            if prefix == "لل":
+                # "للبنان" قد تكون ل + لبنان
+                variants.add(token[1:])
+            break
+    return variants
+
+
+def tokenize(text: str) -> List[str]:
+    """تقسيم النص المطبّع إلى كلمات (مع إهمال الكلمات ذات الحرف الواحد)"""
+    return [token for token in TOKEN_RE.findall(normalize_arabic(text or '')) if len(token) > 1]
+
+
+class SearchIndex:
+    """فهرس معكوس في الذاكرة للعناوين والأوصاف، يُحدَّث تدريجياً مع كل جلب
+
+    البحث بعدة كلمات يعني وجودها كلها (AND)، والترتيب بحسب TF-IDF ثم الأحدث.
+    يُحتفظ بأحدث max_documents مقال (بتمثيل ArticleRecord المضغوط) ويُحذف الأقدم عند تجاوزه.
+    القائمة بدون استعلام تمشي على المفاتيح (published_ts, id) المرتبة من الأحدث حتى تكتمل
+    الصفحة، والعدد الكلي من عدادات (التصنيف، عاجل)، فلا تُرتب كل المقالات مع كل طلب.
+    """
+
+    def __init__(self, max_documents: int = 50000):
+        self.max_documents = max_documents
+        self._documents: "OrderedDict[str, ArticleRecord]" = OrderedDict()
+        self._document_terms: Dict[str, Dict[str, int]] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._keys: List[Tuple[int, str]] = []
+        self._counts: "Counter[Tuple[str, bool]]" = Counter()
+        # مفاتيح أُضيفت أو حُذفت في الدفعة الحالية (تُرتب مرة واحدة في نهايتها)
+        self._dirty_keys: Set[Tuple[int, str]] = set()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add_articles(self, articles: Iterable[Dict[str, Any]]):
+        """إضافة المقالات الجديدة وتحديث المقالات التي تغير نصها"""
+        for article in articles:
+            if article.get('is_placeholder'):
+                continue
+            article_id = article['id']
+            record = ArticleRecord.from_article(article)
+            existing = self._documents.get(article_id)
+            if existing is not None:
+                if existing.title == record.title and existing.description == record.description:
+                    self._untrack(existing)
+                    self._documents[article_id] = record
+                    self._track(record)
+                    continue
+                self._remove(article_id)
+            self._add(record)
+
+        while len(self._documents) > self.max_documents:
+            oldest_id = next(iter(self._documents))
+            self._remove(oldest_id)
+
+        if self._dirty_keys:
+            dirty = self._dirty_keys
+            self._keys = [key for key in self._keys if key not in dirty]
+            self._keys.extend(
+                key for key in dirty
+                if key[1] in self._documents and self._documents[key[1]].published_ts == key[0]
+            )
+            self._keys.sort()
+            self._dirty_keys = set()
+
+    def _track(self, record: ArticleRecord):
+        self._dirty_keys.add((record.published_ts, record.id))
+        self._counts[(record.category, record.is_breaking)] += 1
+
+    def _untrack(self, record: ArticleRecord):
+        self._dirty_keys.add((record.published_ts, record.id))
+        self._counts[(record.category, record.is_breaking)] -= 1
+
+    def _add(self, record: ArticleRecord):
+        weights: Dict[str, int] = {}
+        for weight, text in ((TITLE_WEIGHT, record.title), (1, record.description)):
+            for token in tokenize(text):
+                for variant in token_variants(token):
+                    weights[variant] = weights.get(variant, 0) + weight
+
+        article_id = record.id
+        self._documents[article_id] = record
+        self._track(record)
+        self._document_terms[article_id] = weights
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[article_id] = weight
+
+    def _remove(self, article_id: str):
+        record = self._documents.pop(article_id, None)
+        if record is not None:
+            self._untrack(record)
+        for term in self._document_terms.pop(article_id, {}):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(article_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def _term_matches(self, token: str) -> Dict[str, int]:
+        """المقالات المطابقة لكلمة من الاستعلام (بأي من أشكالها) مع وزنها"""
+        variants = token_variants(token)
+        if len(variants) == 1:
+            return self._postings.get(token, {})
+        matches: Dict[str, int] = {}
+        for variant in variants:
+            for article_id, weight in self._postings.get(variant, {}).items():
+                matches[article_id] = max(matches.get(article_id, 0), weight)
+        return matches
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        category: Optional[str] = None,
+        breaking_only: bool = False,
+        offset: int = 0,
+        limit: int = 20,
+    ) -> Tuple[int, List[ArticleRecord]]:
+        """البحث في الفهرس وإرجاع (العدد الكلي، صفحة النتائج)"""
+
+        def accepted(record: ArticleRecord) -> bool:
+            if category and record.category != category:
+                return False
+            if breaking_only and not record.is_breaking:
+                return False
+            return True
+
+        tokens = list(dict.fromkeys(tokenize(query))) if query else []
+        if not tokens:
+            total = sum(
+                count for (record_category, is_breaking), count in self._counts.items()
+                if (not category or record_category == category) and (not breaking_only or is_breaking)
+            )
+            results = []
+            matched = 0
+            for _, article_id in reversed(self._keys):
+                if matched >= offset + limit:
+                    break
+                record = self._documents[article_id]
+                if accepted(record):
+                    if matched >= offset:
+                        results.append(record)
+                    matched += 1
+            return total, results
+
+        term_matches = sorted((self._term_matches(token) for token in tokens), key=len)
+        if not term_matches[0]:
+            return 0, []
+
+        candidates = set(term_matches[0])
+        for matches in term_matches[1:]:
+            candidates.intersection_update(matches)
+            if not candidates:
+                return 0, []
+        if category or breaking_only:
+            candidates = {article_id for article_id in candidates if accepted(self._documents[article_id])}
+
+        total_documents = len(self._documents)
+        weighted = [(matches, math.log(1 + total_documents / len(matches))) for matches in term_matches]
+        ranked = heapq.nlargest(
+            offset + limit,
+            candidates,
+            key=lambda article_id: (
+                sum(matches[article_id] * idf for matches, idf in weighted),
+                self._documents[article_id].published_ts
+            )
+        )
+        return len(candidates), [self._documents[article_id] for article_id in ranked[offset:]]
@@ -0,0 +1,101 @@
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from services.feed_parsing import entry_image_url
+from services.metrics import FEED_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+
+def entry_key(entry: Any) -> str:
+    """مفتاح المدخل داخل الـ feed: GUID ثم الرابط ثم العنوان"""
+    return entry.get('id') or entry.get('link') or entry.get('title', '')
+
+
+def entry_digest(entry: Any) -> str:
+    """بصمة محتوى المدخل الخام: تتغير إذا عُدّل العنوان أو الوصف أو الرابط أو التاريخ أو الصورة"""
+    parts = (
+        entry.get('title', ''),
+        entry.get('summary', entry.get('description', '')),
+        entry.get('link', ''),
+        entry.get('published', ''),
+        entry.get('updated', ''),
+        entry_image_url(entry) or '',
+    )
+    return hashlib.blake2b("\x1f".join(parts).encode('utf-8'), digest_size=8).hexdigest()
+
+
+class ParsedEntry(NamedTuple):
+    """نتيجة مدخل واحد من منفذ التحليل
+
+    changed=False: المدخل لم يتغير منذ الجلب السابق ولم يُعالج (يُؤخذ من الفهرس).
+    article=None مع changed=True: المدخل عولج واستُبعد (مثلاً خبر غير سياسي).
+    """
+    key: str
+    digest: str
+    changed: bool
+    article: Optional[Dict[str, Any]]
+
+
+class SeenEntries:
+    """فهرس المدخلات المعالجة لكل مصدر (المفتاح ← البصمة والمقال الناتج)
+
+    يُرسل إلى منفذ التحليل قاموس البصمات فقط، فلا تُعاد إزالة HTML والتصنيف وبناء المقال
+    إلا للمدخلات الجديدة أو المعدلة، ثم تُدمج النتيجة مع المقالات المحفوظة بترتيب الـ feed.
+    فهرس كل مصدر يُستبدل بمدخلات آخر جلب فقط، فلا يكبر مع الوقت.
+    """
+
+    def __init__(self, feed: str):
+        self.feed = feed
+        self._entries: Dict[str, Dict[str, Tuple[str, Optional[Dict[str, Any]]]]] = {}
+        self._last_cycle: Dict[str, Dict[str, Any]] = {}
+
+    def digests(self, source_name: str) -> Dict[str, str]:
+        """بصمات المدخلات المعروفة للمصدر (تُمرر إلى دالة التحليل)"""
+        return {key: digest for key, (digest, _) in self._entries.get(source_name, {}).items()}
+
+    def merge(self, source_name: str, parsed: List[ParsedEntry]) -> List[Dict[str, Any]]:
+        """دمج نتيجة التحليل مع الفهرس وإرجاع مقالات المصدر بترتيب الـ feed"""
+        known = self._entries.get(source_name, {})
+        entries: Dict[str, Tuple[str, Optional[Dict[str, Any]]]] = {}
+        articles = []
+        processed = skipped = 0
+        for entry in parsed:
+            if entry.changed:
+                processed += 1
+                article = entry.article
+            else:
+                previous = known.get(entry.key)
+                if previous is None:
+                    # لا يحدث إلا إذا نُسي المصدر أثناء التحليل؛ يُعالج في الجلب التالي
+                    continue
+                skipped += 1
+                article = previous[1]
+            entries[entry.key] = (entry.digest, article)
+            if article is not None:
+                articles.append(dict(article))
+
+        self._entries[source_name] = entries
+        self._last_cycle[source_name] = {"processed": processed, "skipped": skipped, "at": datetime.now()}
+        FEED_ENTRIES.inc(processed, feed=self.feed, result="processed")
+        FEED_ENTRIES.inc(skipped, feed=self.feed, result="skipped")
+        if skipped:
+            logger.info(f"{source_name}: {processed} new or changed entries, {skipped} unchanged skipped")
+        return articles
+
+    def export(self) -> Dict[str, Dict[str, Tuple[str, Optional[Dict[str, Any]]]]]:
+        """الفهرس كاملاً (لحفظه مع لقطة القرص)"""
+        return dict(self._entries)
+
+    def restore(self, exported: Dict[str, Dict[str, Tuple[str, Optional[Dict[str, Any]]]]]):
+        for source_name, entries in exported.items():
+            self._entries.setdefault(source_name, entries)
+
+    def forget(self, source_name: str):
+        self._entries.pop(source_name, None)
+
+    def last_cycle(self, source_name: str) -> Optional[Dict[str, Any]]:
+        """عدد المدخلات المعالجة والمتجاوزة في آخر جلب للمصدر"""
+        return self._last_cycle.get(source_name)
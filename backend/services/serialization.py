@@ -0,0 +1,21 @@
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+
+JSON_MEDIA_TYPE = "application/json"
+
+# Z بدل +00:00 للتواريخ بتوقيت UTC كما يفعل Pydantic
+_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _default(value: Any) -> Any:
+    """ما لا يعرفه orjson مباشرة: نماذج Pydantic"""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """تحويل قيمة (قواميس، قوائم، تواريخ، نماذج Pydantic) إلى JSON بصيغة bytes"""
+    return orjson.dumps(value, default=_default, option=_OPTIONS)
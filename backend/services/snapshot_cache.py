@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from services.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class Snapshot:
+    """لقطة من البيانات مع وقت جلبها وصيغها المسلسلة الجاهزة للإرسال"""
+
+    def __init__(self, value: Any, fetched_at: Optional[datetime] = None):
+        self.value = value
+        # وقت البيانات نفسها إذا كانت أقدم من اللقطة (مثلاً عند الاستعادة)
+        self.fetched_at = fetched_at or datetime.now()
+        self._fetched_monotonic = time.monotonic()
+        self._rendered: Dict[str, Any] = {}
+
+    @property
+    def age(self) -> float:
+        """عمر اللقطة بالثواني"""
+        return time.monotonic() - self._fetched_monotonic
+
+    def rendered(self, key: str, render: Callable[["Snapshot"], Any]) -> Any:
+        """جسم الاستجابة للصيغة key، يُبنى مرة واحدة لكل لقطة ثم يُعاد كما هو
+
+        اللقطة لا تتغير بعد إنشائها (التحديث يستبدلها بلقطة جديدة)، فلا حاجة لإبطال.
+        """
+        body = self._rendered.get(key)
+        if body is None:
+            body = self._rendered[key] = render(self)
+        return body
+
+
+class SnapshotCache:
+    """ذاكرة مؤقتة داخل العملية للقطة واحدة من البيانات
+
+    - خلال مدة الصلاحية (ttl) تُقدَّم اللقطة مباشرة.
+    - بعدها وخلال مهلة stale_ttl تُقدَّم اللقطة القديمة ويبدأ تحديث في الخلفية.
+    - بعد ذلك ينتظر الطلب جلباً جديداً.
+    في كل الحالات لا يوجد إلا جلب واحد جارٍ مهما كان عدد الطلبات المتزامنة.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float = 60,
+        stale_ttl: float = 300,
+        name: str = "snapshot",
+    ):
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self._snapshot: Optional[Snapshot] = None
+        self._inflight: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> Optional[Snapshot]:
+        return self._snapshot
+
+    async def get(self) -> Snapshot:
+        """إرجاع اللقطة الحالية مع تحديثها عند الحاجة"""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            age = snapshot.age
+            if age < self.ttl:
+                CACHE_REQUESTS.inc(cache=self.name, result="hit")
+                return snapshot
+            if age < self.ttl + self.stale_ttl:
+                CACHE_REQUESTS.inc(cache=self.name, result="stale")
+                self._start_refresh()
+                return snapshot
+
+        CACHE_REQUESTS.inc(cache=self.name, result="miss")
+        # shield حتى لا يُلغى الجلب المشترك إذا أُلغي أحد الطلبات المنتظرة
+        return await asyncio.shield(self._start_refresh())
+
+    async def refresh(self) -> Snapshot:
+        """فرض جلب جديد (أو الانضمام إلى الجلب الجاري)"""
+        return await asyncio.shield(self._start_refresh())
+
+    def put(self, value: Any, fetched_at: Optional[datetime] = None) -> Snapshot:
+        """استبدال اللقطة بقيمة جاهزة (fetched_at: وقت جلب البيانات إن لم تكن جديدة)"""
+        self._snapshot = Snapshot(value, fetched_at)
+        return self._snapshot
+
+    def invalidate(self):
+        """إلغاء صلاحية اللقطة الحالية"""
+        self._snapshot = None
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._load())
+            self._inflight.add_done_callback(self._log_failure)
+        return self._inflight
+
+    async def _load(self) -> Snapshot:
+        try:
+            value = await self.loader()
+        except Exception as e:
+            if self._snapshot is not None:
+                logger.warning(f"Refreshing {self.name} cache failed, serving stale snapshot: {str(e)}")
+                return self._snapshot
+            raise
+        logger.info(f"Refreshed {self.name} cache")
+        return self.put(value)
+
+    def _log_failure(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Loading {self.name} cache failed: {task.exception()}")
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import mmap
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from services.state_file import decode_state, encode_state, open_private, write_private
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotSection(NamedTuple):
+    """جزء من لقطة القرص (مثلاً الأخبار العاجلة) بدوال تصديره واستعادته"""
+    export: Callable[[], Any]
+    restore: Callable[[Any, float], None]
+    version: Callable[[], Any]
+
+
+class SnapshotFile:
+    """آخر حالة معروفة (المقالات ومحددات التحقق وفهرس المدخلات) في ملف على القرص
+
+    يُحمّل الملف عند الإقلاع فتُخدم الطلبات الأولى من آخر البيانات فوراً بينما تحدّثها
+    الجدولة في الخلفية. الصيغة JSON (انظر state_file) يحللها orjson مباشرة من الملف المعيّن
+    بـ mmap دون نسخه إلى الذاكرة أولاً، ولا ينفذ تحميلها أي كود؛ ويُرفض الملف إذا كان رابطاً
+    رمزياً أو مملوكاً لمستخدم آخر أو قابلاً للكتابة من غيره.
+    يُحفظ دورياً (إذا تغيرت البيانات) وعند الإيقاف، بكتابة ملف مؤقت ثم استبدال ذري حتى لا
+    يُقرأ ملف ناقص.
+    """
+
+    def __init__(self, path: Optional[Path], interval: float = 60):
+        self.path = path
+        self.interval = interval
+        self._sections: Dict[str, SnapshotSection] = {}
+        self._saved_version = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "SnapshotFile":
+        path = os.environ.get('SNAPSHOT_FILE')
+        return cls(
+            path=Path(path) if path else None,
+            interval=float(os.environ.get('SNAPSHOT_FILE_INTERVAL', 60)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def register(
+        self, name: str, export: Callable[[], Any], restore: Callable[[Any, float], None], version: Callable[[], Any]
+    ):
+        self._sections[name] = SnapshotSection(export, restore, version)
+
+    def _version(self) -> tuple:
+        return tuple(section.version() for section in self._sections.values())
+
+    def load(self) -> List[str]:
+        """استعادة كل الأجزاء من الملف (يُستدعى من lifespan)؛ تُرجع أسماء الأجزاء المستعادة"""
+        if not self.enabled or not self.path.exists():
+            return []
+        started = time.perf_counter()
+        try:
+            with os.fdopen(open_private(self.path), "rb") as snapshot_file, \
+                    mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                    memoryview(mapped) as view:
+                payload = decode_state(view)
+        except Exception as e:
+            logger.error(f"Ignoring unreadable snapshot file {self.path}: {str(e)}")
+            return []
+
+        elapsed = max(0.0, time.time() - payload["saved_at"])
+        restored = []
+        for name, state in payload["sections"].items():
+            section = self._sections.get(name)
+            if section is None:
+                continue
+            try:
+                section.restore(state, elapsed)
+                restored.append(name)
+            except Exception as e:
+                logger.error(f"Restoring {name} from snapshot file failed: {str(e)}")
+        self._saved_version = self._version()
+        logger.info(
+            f"Restored {', '.join(restored) or 'nothing'} from {self.path} "
+            f"(saved {elapsed:.0f}s ago) in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return restored
+
+    async def save(self, force: bool = False) -> bool:
+        """حفظ الحالة إذا تغيرت منذ آخر حفظ"""
+        if not self.enabled:
+            return False
+        version = self._version()
+        if version == self._saved_version and not force:
+            return False
+        payload = encode_state({
+            "saved_at": time.time(),
+            "sections": {name: section.export() for name, section in self._sections.items()},
+        })
+        await asyncio.to_thread(self._write, payload)
+        self._saved_version = version
+        return True
+
+    def _write(self, payload: bytes):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_private(self.path, payload)
+
+    def start(self, should_save: Callable[[], bool] = lambda: True):
+        """الحفظ الدوري؛ should_save يمنع غير قائد الجلب من الكتابة عند تعدد العمال"""
+        if self._task is None and self.enabled and self.interval > 0:
+            self._task = asyncio.create_task(self._run(should_save))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, should_save: Callable[[], bool]):
+        while True:
+            await asyncio.sleep(self.interval)
+            if not should_save():
+                continue
+            try:
+                await self.save()
+            except Exception as e:
+                logger.error(f"Saving snapshot file failed: {str(e)}")
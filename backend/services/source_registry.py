@@ -0,0 +1,301 @@
+import asyncio
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import yaml
+except ImportError:  # اختياري: بدونه تُقبل ملفات JSON فقط
+    yaml = None
+
+logger = logging.getLogger(__name__)
+
+# ملف المصادر الافتراضي (يمكن استبداله بـ SOURCES_FILE، بصيغة JSON أو YAML)
+DEFAULT_SOURCES_FILE = Path(__file__).resolve().parent.parent / "sources.json"
+
+SLUG_SEPARATOR_RE = re.compile(r'[^\w]+')
+
+
+class SourceConfigError(ValueError):
+    """إعدادات مصادر غير صالحة (تُرفض كاملة وتبقى المصادر السابقة)"""
+
+
+def slugify(name: str) -> str:
+    """معرف مختصر للمصدر صالح للروابط (الحروف العربية تبقى كما هي)"""
+    return SLUG_SEPARATOR_RE.sub('-', name.strip().lower()).strip('-')
+
+
+def _validate(group: str, source: Dict[str, Any]) -> Dict[str, Any]:
+    name = source.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise SourceConfigError(f"{group}: source without a name: {source}")
+    if not isinstance(source.get("url"), str) or not source["url"].startswith(("http://", "https://")):
+        raise SourceConfigError(f"{group}/{name}: missing or invalid url")
+    for field in ("poll_interval", "limit"):
+        value = source.get(field)
+        if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0):
+            raise SourceConfigError(f"{group}/{name}: {field} must be a positive number")
+    if "priority" in source and not isinstance(source["priority"], int):
+        raise SourceConfigError(f"{group}/{name}: priority must be an integer")
+    for field in ("keywords", "breaking_keywords"):
+        value = source.get(field)
+        if value is not None and (not isinstance(value, list) or not all(isinstance(word, str) for word in value)):
+            raise SourceConfigError(f"{group}/{name}: {field} must be a list of strings")
+    source.setdefault("slug", slugify(name))
+    return source
+
+
+class SourceRegistry:
+    """مصادر مجموعة واحدة (مثلاً الأخبار العاجلة) مفهرسة بالاسم والمعرف المختصر
+
+    الحقول الاختيارية لكل مصدر: poll_interval (فترة التحديث بالثواني)، limit (عدد المدخلات
+    المأخوذة)، priority (الأعلى يُجلب أولاً عند تزاحم الطابور)، keywords / breaking_keywords
+    (بدل الكلمات الافتراضية). التحديث يستبدل القائمة كاملة ويُبلغ المستمعين بما تغير.
+    """
+
+    def __init__(
+        self,
+        group: str,
+        defaults: Optional[Dict[str, Any]] = None,
+        prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    ):
+        self.group = group
+        self.defaults: Dict[str, Any] = dict(defaults or {})
+        # إكمال الحقول الخاصة بالمجموعة (مثلاً الموقع الافتراضي للصحيفة)
+        self.prepare = prepare
+        self._sources: List[Dict[str, Any]] = []
+        self._by_name: Dict[str, Dict[str, Any]] = {}
+        self._by_slug: Dict[str, Dict[str, Any]] = {}
+        self._listeners: List[Callable[[List[str], List[str], List[str]], None]] = []
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._sources)
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    @property
+    def sources(self) -> List[Dict[str, Any]]:
+        return self._sources
+
+    def names(self) -> List[str]:
+        return [source["name"] for source in self._sources]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """المصدر بحسب اسمه أو معرفه المختصر"""
+        return self._by_name.get(key) or self._by_slug.get(key)
+
+    def add_listener(self, listener: Callable[[List[str], List[str], List[str]], None]):
+        """listener(added, removed, changed) بعد كل تحديث غيّر شيئاً"""
+        self._listeners.append(listener)
+
+    def validate(self, sources: List[Dict[str, Any]], defaults: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """المصادر بعد دمج القيم الافتراضية والتحقق منها؛ ترفع SourceConfigError إذا كانت غير صالحة"""
+        names, slugs = set(), set()
+        validated = []
+        for raw in sources:
+            if not isinstance(raw, dict):
+                raise SourceConfigError(f"{self.group}: expected a mapping, got {raw!r}")
+            source = _validate(self.group, {**defaults, **raw})
+            if self.prepare is not None:
+                source = self.prepare(source)
+            if source["name"] in names:
+                raise SourceConfigError(f"{self.group}: duplicate source name {source['name']}")
+            if source["slug"] in slugs:
+                raise SourceConfigError(f"{self.group}: duplicate source slug {source['slug']}")
+            names.add(source["name"])
+            slugs.add(source["slug"])
+            validated.append(source)
+        return validated
+
+    def replace(
+        self, sources: List[Dict[str, Any]], defaults: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[str], List[str], List[str]]:
+        """استبدال كل المصادر؛ ترفع SourceConfigError دون تغيير شيء إذا كانت القائمة غير صالحة"""
+        defaults = self.defaults if defaults is None else dict(defaults)
+        ordered = self.validate(sources, defaults)
+        by_name = {source["name"]: source for source in ordered}
+
+        added = [name for name in by_name if name not in self._by_name]
+        removed = [name for name in self._by_name if name not in by_name]
+        changed = [name for name in by_name if name in self._by_name and by_name[name] != self._by_name[name]]
+
+        # المصادر التي لم تتغير تبقى نفس الكائنات
+        ordered = [
+            self._by_name[source["name"]] if source["name"] in self._by_name and source["name"] not in changed else source
+            for source in ordered
+        ]
+        self.defaults = defaults
+        self._sources = ordered
+        self._by_name = {source["name"]: source for source in ordered}
+        self._by_slug = {source["slug"]: source for source in ordered}
+
+        if added or removed or changed:
+            logger.info(
+                f"{self.group} sources updated: {len(ordered)} sources "
+                f"({len(added)} added, {len(removed)} removed, {len(changed)} changed)"
+            )
+            for listener in self._listeners:
+                try:
+                    listener(added, removed, changed)
+                except Exception as e:
+                    logger.error(f"{self.group} sources listener failed: {str(e)}")
+        return added, removed, changed
+
+
+def load_source_file(path: Path) -> Dict[str, Dict[str, Any]]:
+    """قراءة ملف المصادر: لكل مجموعة قائمة مصادر، أو {defaults, sources}"""
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        if yaml is None:
+            raise SourceConfigError(f"{path}: PyYAML is not installed")
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+    if not isinstance(data, dict):
+        raise SourceConfigError(f"{path}: expected a mapping of groups")
+    return {group: _group_config(group, value) for group, value in data.items()}
+
+
+def _group_config(group: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, list):
+        value = {"sources": value}
+    if not isinstance(value, dict) or not isinstance(value.get("sources", []), list):
+        raise SourceConfigError(f"{group}: expected a list of sources")
+    return {"defaults": value.get("defaults") or {}, "sources": value.get("sources", [])}
+
+
+class SourceLoader:
+    """تحميل مجموعات المصادر من ملف (ومن MongoDB اختيارياً) وإعادة تحميلها دون إعادة التشغيل
+
+    الملف يُعاد قراءته عند تغير وقت تعديله، و MongoDB (مجموعة sources، مستند لكل مصدر
+    مع حقل group) يُقرأ في كل دورة؛ مصادر MongoDB تحل محل مصادر الملف للمجموعة نفسها.
+    """
+
+    def __init__(self, path: Path = DEFAULT_SOURCES_FILE, interval: float = 30):
+        self.path = Path(path)
+        self.interval = interval
+        self._registries: Dict[str, SourceRegistry] = {}
+        self._file_groups: Dict[str, Dict[str, Any]] = {}
+        self._mongo_groups: Dict[str, List[Dict[str, Any]]] = {}
+        self._file_mtime: Optional[float] = None
+        self._collection = None
+        self._task: Optional[asyncio.Task] = None
+        self.last_error: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "SourceLoader":
+        return cls(
+            path=Path(os.environ.get('SOURCES_FILE') or DEFAULT_SOURCES_FILE),
+            interval=float(os.environ.get('SOURCES_RELOAD_INTERVAL', 30)),
+        )
+
+    def registry(
+        self, group: str, prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+    ) -> SourceRegistry:
+        """مصادر المجموعة (تُحمّل من الملف عند أول طلب)"""
+        registry = self._registries.get(group)
+        if registry is None:
+            registry = self._registries[group] = SourceRegistry(group, prepare=prepare)
+            if self._file_mtime is None:
+                self._read_file()
+            self._apply(group)
+        return registry
+
+    def _read_file(self) -> bool:
+        """إعادة قراءة الملف إذا تغير؛ تُرجع True عند قراءة نسخة جديدة"""
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError as e:
+            self.last_error = f"{self.path}: {e.strerror}"
+            logger.error(f"Sources file unavailable: {self.last_error}")
+            return False
+        if mtime == self._file_mtime:
+            return False
+        try:
+            groups = load_source_file(self.path)
+            # الملف يُرفض كاملاً إذا كانت أي مجموعة فيه غير صالحة
+            for group, registry in self._registries.items():
+                if group in groups:
+                    registry.validate(groups[group]["sources"], groups[group]["defaults"])
+            self._file_groups = groups
+        except (ValueError, OSError) as e:
+            # لا نعيد المحاولة قبل تعديل الملف مجدداً
+            self._file_mtime = mtime
+            self.last_error = f"{self.path}: {str(e)}"
+            logger.error(f"Invalid sources file, keeping current sources: {self.last_error}")
+            return False
+        self._file_mtime = mtime
+        return True
+
+    def _apply(self, group: str):
+        registry = self._registries[group]
+        config = self._file_groups.get(group)
+        if config is None and group not in self._mongo_groups:
+            # مجموعة غير مذكورة في أي مكان: تبقى مصادرها الحالية
+            return
+        config = config or {"defaults": registry.defaults, "sources": []}
+        sources = self._mongo_groups.get(group) or config["sources"]
+        try:
+            registry.replace(sources, defaults=config["defaults"])
+        except SourceConfigError as e:
+            self.last_error = str(e)
+            logger.error(f"Invalid {group} sources, keeping current sources: {str(e)}")
+
+    async def _read_collection(self):
+        documents = await self._collection.find({}, {"_id": 0}).to_list(length=None)
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for document in documents:
+            group = document.pop("group", None)
+            if group:
+                groups.setdefault(group, []).append(document)
+        self._mongo_groups = groups
+
+    async def reload(self) -> Dict[str, int]:
+        """إعادة قراءة الملف و MongoDB وتطبيق التغييرات؛ تُرجع عدد مصادر كل مجموعة"""
+        self.last_error = None
+        self._read_file()
+        if self._collection is not None:
+            try:
+                await self._read_collection()
+            except Exception as e:
+                self.last_error = f"MongoDB: {str(e)}"
+                logger.error(f"Reading sources from MongoDB failed, keeping current sources: {str(e)}")
+        for group in self._registries:
+            self._apply(group)
+        return {group: len(registry) for group, registry in self._registries.items()}
+
+    async def attach(self, collection):
+        """استخدام مجموعة MongoDB كمصدر إضافي للإعدادات (عند توفر قاعدة البيانات)"""
+        self._collection = collection
+        await collection.create_index([("group", 1), ("name", 1)], unique=True)
+        await self.reload()
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._collection = None
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error(f"Reloading sources failed: {str(e)}")
+
+
+# المحمّل المشترك لكل مجموعات المصادر
+source_loader = SourceLoader.from_env()
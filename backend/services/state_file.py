@@ -0,0 +1,78 @@
+import errno
+import os
+import stat
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+# التواريخ تُحفظ كقاموس بمفتاح واحد حتى تُستعاد datetime وليس نصاً
+_DATETIME_TAG = "$datetime"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _restore(value: Any) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 1 and _DATETIME_TAG in value:
+            return datetime.fromisoformat(value[_DATETIME_TAG])
+        return {key: _restore(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_restore(item) for item in value]
+    return value
+
+
+def encode_state(value: Any) -> bytes:
+    """ترميز حالة محفوظة (قواميس، قوائم، تواريخ) بصيغة JSON؛ الصفوف (tuples) تُستعاد قوائم"""
+    return orjson.dumps(value, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+def decode_state(data: Any) -> Any:
+    """فك ترميز encode_state من bytes أو memoryview (مثلاً على ملف معيّن بـ mmap)
+
+    على عكس pickle لا ينفذ فك الترميز أي كود مهما كان محتوى الملف.
+    """
+    return _restore(orjson.loads(data))
+
+
+def ensure_private(info: os.stat_result, path: Path):
+    """رفض ملف ليس عادياً أو مملوكاً لمستخدم آخر أو قابلاً للكتابة من غيره"""
+    if not stat.S_ISREG(info.st_mode):
+        raise PermissionError(f"{path} is not a regular file")
+    if info.st_uid != os.getuid() or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"{path} must be owned by the service user and not writable by others")
+
+
+def open_private(path: Path) -> int:
+    """فتح ملف حالة للقراءة دون اتباع الروابط الرمزية والتحقق من ملكيته؛ تُرجع واصف الملف"""
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+    except OSError as e:
+        if e.errno == errno.ELOOP:
+            raise PermissionError(f"{path} is a symbolic link") from e
+        raise
+    try:
+        ensure_private(os.fstat(fd), path)
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def read_private(path: Path) -> bytes:
+    with os.fdopen(open_private(path), "rb") as state_file:
+        return state_file.read()
+
+
+def write_private(path: Path, payload: bytes):
+    """كتابة ملف مؤقت خاص بالمستخدم (0600) ثم استبدال ذري حتى لا يُقرأ ملف ناقص"""
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW, 0o600)
+    with os.fdopen(fd, "wb") as state_file:
+        state_file.write(payload)
+    os.replace(temporary, path)
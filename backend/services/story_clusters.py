@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import random
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from services.keyword_matcher import normalize_arabic
+from services.search_index import token_variants, tokenize
+
+logger = logging.getLogger(__name__)
+
+# عدد دوال التجزئة في توقيع MinHash = عدد الحزم × عدد الصفوف في كل حزمة (LSH)
+# 32 حزمة × صفان: زوج بتشابه 0.5 يلتقي في حزمة واحدة على الأقل باحتمال ~0.9999،
+# وبتشابه 0.3 باحتمال ~0.95 وبتشابه 0.1 باحتمال ~0.27 (ثم يُستبعد عند التحقق من التشابه التقديري)
+LSH_BANDS = 32
+LSH_ROWS = 2
+NUM_PERMUTATIONS = LSH_BANDS * LSH_ROWS
+
+# أدنى تشابه Jaccard تقديري بين المقال وممثل القصة
+STORY_SIMILARITY = 0.5
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# معاملات ثابتة (a*x + b) mod p لكل دالة تجزئة حتى تبقى التواقيع متطابقة بين العمليات
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+# كلمات شائعة لا تميز قصة عن أخرى
+STOP_WORDS = frozenset(normalize_arabic(word) for word in (
+    "في", "من", "على", "إلى", "الى", "عن", "أن", "إن", "ان", "مع", "بعد", "قبل", "بين",
+    "التي", "الذي", "الذين", "هذا", "هذه", "ذلك", "تلك", "كان", "كانت", "قد", "لا", "لم", "لن",
+    "ما", "هو", "هي", "أو", "ثم", "حتى", "عند", "كل", "أي", "غير", "منذ", "خلال", "حول", "ضد",
+    "عاجل", "بالفيديو", "بالصور", "شاهد", "فيديو",
+))
+
+
+def _words(text: str) -> Set[str]:
+    # أقصر صيغة هي الكلمة بعد حذف "ال" وحروف العطف والجر
+    return {
+        min(token_variants(token), key=len)
+        for token in tokenize(text)
+        if token not in STOP_WORDS
+    }
+
+
+def story_shingles(title: str, description: str = "") -> Set[str]:
+    """وحدات المقارنة: كلمات العنوان المطبّعة بعد حذف السوابق والكلمات الشائعة
+
+    الوصف لا يدخل إلا إذا خلا العنوان من الكلمات: كثير من المصادر تكرر نصاً ثابتاً في الوصف،
+    فيجمع بين عناوين مختلفة.
+    (بدون أزواج كلمات: في النصوص القصيرة تفرّق الأزواج بين صياغات مختلفة لنفس الخبر)
+    """
+    return _words(title) or _words(description)
+
+
+def minhash_signature(shingles: Iterable[str]) -> Tuple[int, ...]:
+    """توقيع MinHash: أصغر قيمة لكل دالة تجزئة على كل الوحدات"""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        for shingle in shingles
+    ]
+    if not hashes:
+        return ()
+    return tuple(
+        min((a * value + b) % _MERSENNE_PRIME for value in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimated_similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """تقدير تشابه Jaccard من نسبة القيم المتطابقة في التوقيعين"""
+    if not first or not second:
+        return 0.0
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+class StoryClusterer:
+    """تجميع المقالات المتشابهة من مصادر مختلفة في قصص واحدة
+
+    تواقيع MinHash تُحسب مرة واحدة لكل مقال (وتُخزن بحسب المعرف وبصمة النص المطبّع، فتعديل
+    العنوان يعيد حساب التوقيع)، ثم يجمع فهرس LSH
+    المقالات المرشحة للتشابه في حزم، فلا يُقارن إلا المرشحون بدل كل الأزواج.
+    كل مقال يُقارن بممثل القصة (أول مقالاتها) وليس بأي عضو فيها، فلا تتسلسل القصص
+    (أ يشبه ب و ب يشبه ج) إلى قصة واحدة تجمع أخباراً مختلفة.
+    """
+
+    def __init__(self, threshold: float = STORY_SIMILARITY, cache_size: int = 20000):
+        self.threshold = threshold
+        self.cache_size = cache_size
+        self._signatures: "OrderedDict[Tuple[str, int], Tuple[int, ...]]" = OrderedDict()
+
+    def signature(self, article: Dict[str, Any]) -> Tuple[int, ...]:
+        title, description = article['title'], article.get('description', '')
+        key = (article['id'], hash((normalize_arabic(title), normalize_arabic(description))))
+        signature = self._signatures.get(key)
+        if signature is None:
+            signature = minhash_signature(story_shingles(title, description))
+            self._signatures[key] = signature
+            if len(self._signatures) > self.cache_size:
+                self._signatures.popitem(last=False)
+        return signature
+
+    def cluster(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """تقسيم المقالات إلى قصص بترتيبها الأصلي
+
+        كل قصة: id (معرف المقال الممثل)، article (أول مقال في القصة بحسب الترتيب المعطى)،
+        articles (كل مقالات القصة) و sources (المصادر المختلفة التي نشرتها).
+        """
+        signatures = [self.signature(article) for article in articles]
+        # ممثل قصة كل مقال: أسبق مقال في القصة بحسب الترتيب المعطى
+        representative = list(range(len(articles)))
+
+        buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        for index, signature in enumerate(signatures):
+            if not signature:
+                continue
+            keys = [(band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]) for band in range(LSH_BANDS)]
+            candidates = {representative[other] for key in keys for other in buckets.get(key, ())}
+            best, best_similarity = None, 0.0
+            for candidate in sorted(candidates):
+                similarity = estimated_similarity(signature, signatures[candidate])
+                if similarity >= self.threshold and similarity > best_similarity:
+                    best, best_similarity = candidate, similarity
+            if best is not None:
+                representative[index] = best
+            for key in keys:
+                buckets.setdefault(key, []).append(index)
+
+        groups: Dict[int, List[int]] = {}
+        for index in range(len(articles)):
+            groups.setdefault(representative[index], []).append(index)
+
+        stories = []
+        for root, members in groups.items():
+            story_articles = [articles[index] for index in members]
+            stories.append({
+                'id': articles[root]['id'],
+                'article': articles[root],
+                'articles': story_articles,
+                'sources': list(dict.fromkeys(article['source'] for article in story_articles)),
+            })
+        return stories
+
+
+# مجمّع مشترك حتى تُعاد استخدام التواقيع المحسوبة بين اللقطات
+story_clusterer = StoryClusterer()
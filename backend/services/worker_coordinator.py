@@ -0,0 +1,257 @@
+import asyncio
+import fcntl
+import itertools
+import json
+import logging
+import os
+import stat
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from services.feed_scheduler import FeedScheduler
+from services.source_registry import slugify
+from services.state_file import decode_state, encode_state, read_private, write_private
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """قفل ملف حصري: العامل الذي يحصل عليه هو قائد الجلب
+
+    لا يُحرر القفل إلا بانتهاء العملية (ويحرره النظام تلقائياً إذا توقفت فجأة)،
+    فيحصل عليه أحد العمال الآخرين في محاولته التالية.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def try_acquire(self) -> bool:
+        if self._file is not None:
+            return True
+        lock_file = open(self.path, "a+")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+class SharedSection(NamedTuple):
+    """حالة إضافية تُنشر مع المخزن (مثلاً معرفات أحداث البث) بدالتي تصديرها واعتمادها"""
+    export: Callable[[], Any]
+    apply: Callable[[Any], None]
+
+
+class SharedFeed:
+    """حالة مجموعة مصادر (المخزن والمواعيد) في ملف مشترك يكتبه القائد ويقرؤه بقية العمال
+
+    الكتابة في ملف مؤقت ثم استبدال ذري، فلا يقرأ أي عامل ملفاً ناقصاً. القارئ لا يعيد
+    التحميل إلا إذا تغير وقت تعديل الملف أو حجمه.
+    الأقسام الإضافية تُعتمد قبل المخزن، فيراها مستمعو المخزن عند وصول المقالات.
+    طلبات التحديث من بقية العمال ملفات JSON صغيرة بجانب الملف ينفذها القائد ثم يحذفها.
+    """
+
+    def __init__(self, path: Path, scheduler: FeedScheduler):
+        self.path = path
+        self.scheduler = scheduler
+        self.sections: Dict[str, SharedSection] = {}
+        self._published_version: Optional[int] = None
+        self._signature = None
+        self._bump_requests = itertools.count()
+
+    async def publish(self) -> bool:
+        """نشر المخزن إذا تغير منذ آخر نشر"""
+        store = self.scheduler.store
+        if store.version == self._published_version:
+            return False
+        version = store.version
+        payload = encode_state({
+            "published_at": time.time(),
+            "sources": store.export(),
+            "schedule": self.scheduler.export_schedule(),
+            "sections": {name: section.export() for name, section in self.sections.items()},
+        })
+        await asyncio.to_thread(write_private, self.path, payload)
+        self._published_version = version
+        return True
+
+    async def sync(self) -> List[str]:
+        """اعتماد آخر حالة نشرها القائد؛ تُرجع المصادر التي وصلتها مقالات جديدة"""
+        try:
+            info = self.path.lstat()
+        except FileNotFoundError:
+            return []
+        signature = (info.st_mtime_ns, info.st_size)
+        if signature == self._signature:
+            return []
+        payload = decode_state(await asyncio.to_thread(read_private, self.path))
+        self._signature = signature
+
+        elapsed = max(0.0, time.time() - payload["published_at"])
+        for name, state in payload.get("sections", {}).items():
+            section = self.sections.get(name)
+            if section is not None:
+                section.apply(state)
+        store = self.scheduler.store
+        updated = [
+            name for name, exported in payload["sources"].items()
+            if store.apply(name, exported, elapsed)
+        ]
+        self.scheduler.apply_schedule(payload["schedule"], elapsed)
+        for name in updated:
+            self.scheduler.notify_update(name)
+        return updated
+
+    def request_bump(self, source_name: Optional[str] = None):
+        """طلب تحديث مصدر (أو كل المصادر) من القائد؛ يُستدعى على غير القائد بدل bump"""
+        request = self.path.with_name(f"{self.path.stem}.bump.{os.getpid()}.{next(self._bump_requests)}.json")
+        write_private(request, json.dumps({"source": source_name}).encode("utf-8"))
+
+    async def run_bumps(self) -> int:
+        """تنفيذ طلبات التحديث التي كتبها بقية العمال (على القائد)؛ تُرجع عددها"""
+        requests = await asyncio.to_thread(lambda: sorted(self.path.parent.glob(f"{self.path.stem}.bump.*.json")))
+        for request in requests:
+            try:
+                source_name = json.loads(read_private(request))["source"]
+                request.unlink()
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Ignoring unreadable refresh request {request.name}: {str(e)}")
+                request.unlink(missing_ok=True)
+                continue
+            self.scheduler.bump(source_name)
+        return len(requests)
+
+
+class WorkerCoordinator:
+    """تنسيق الجلب بين عدة عمال (uvicorn --workers) يتشاركون مجلد SHARED_STATE_DIR
+
+    عامل واحد فقط (حامل LeaderLock) يشغّل الجدولة ويجلب من المصادر وينشر المخازن،
+    وبقية العمال في وضع passive يقرؤون المنشور كل interval ثانية ويبنون منه لقطاتهم،
+    فيزيد عدد العمال قدرة الخدمة دون مضاعفة الطلبات على المصادر. عند توقف القائد
+    يحصل عامل آخر على القفل ويكمل من آخر مواعيد منشورة.
+    بدون مجلد مشترك (عامل واحد) تعمل الجدولة مباشرة كما في السابق.
+
+    الملفات المنشورة بصيغة JSON (انظر state_file) فلا يسمح ملف معدّل بتنفيذ كود، لكنه قد
+    يغير ما يُعرض؛ لذلك يجب أن يكون المجلد خاصاً بمستخدم الخدمة، ولا يبدأ التنسيق إذا كان
+    مملوكاً لمستخدم آخر أو قابلاً للكتابة من غيره، ولا يُقرأ أي ملف فيه إذا كان رابطاً رمزياً
+    أو مملوكاً لغير مستخدم الخدمة.
+    """
+
+    def __init__(self, schedulers: List[FeedScheduler], directory: Optional[Path] = None, interval: float = 1.0):
+        self.schedulers = schedulers
+        self.directory = directory
+        self.interval = interval
+        self.is_leader = False
+        self._lock: Optional[LeaderLock] = None
+        self._feeds: List[SharedFeed] = []
+        self._task: Optional[asyncio.Task] = None
+        if directory is not None:
+            self._lock = LeaderLock(directory / "leader.lock")
+            self._feeds = [
+                SharedFeed(directory / f"{slugify(scheduler.name)}.json", scheduler)
+                for scheduler in schedulers
+            ]
+
+    @classmethod
+    def from_env(cls, schedulers: List[FeedScheduler]) -> "WorkerCoordinator":
+        directory = os.environ.get('SHARED_STATE_DIR')
+        return cls(
+            schedulers,
+            directory=Path(directory) if directory else None,
+            interval=float(os.environ.get('SHARED_STATE_SYNC_INTERVAL', 1)),
+        )
+
+    @property
+    def shared(self) -> bool:
+        return self.directory is not None
+
+    def share(self, scheduler: FeedScheduler, name: str, export: Callable[[], Any], apply: Callable[[Any], None]):
+        """نشر حالة إضافية مع مخزن scheduler (export على القائد، apply على بقية العمال)"""
+        for feed in self._feeds:
+            if feed.scheduler is scheduler:
+                feed.sections[name] = SharedSection(export, apply)
+
+    def _prepare_directory(self):
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        info = self.directory.stat()
+        if info.st_uid != os.getuid() or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            raise RuntimeError(
+                f"SHARED_STATE_DIR {self.directory} must be owned by the service user and not writable by others"
+            )
+
+    async def start(self):
+        """تشغيل الجدولة (عامل واحد) أو الانضمام إلى الانتخاب (يُستدعى من lifespan)"""
+        if not self.shared:
+            self._become_leader()
+            return
+        self._prepare_directory()
+        for feed in self._feeds:
+            feed.scheduler.passive = True
+            feed.scheduler.forward_bump = feed.request_bump
+        await self._step()
+        if not self.is_leader:
+            logger.info(f"Worker {os.getpid()} serving snapshots published by the fetch leader")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.is_leader:
+            # آخر حالة قبل الإيقاف، ليكمل منها القائد التالي
+            for feed in self._feeds:
+                try:
+                    await feed.publish()
+                except Exception as e:
+                    logger.error(f"Publishing {feed.scheduler.name} state failed: {str(e)}")
+        if self._lock is not None:
+            self._lock.release()
+        self.is_leader = False
+
+    def _become_leader(self):
+        self.is_leader = True
+        for scheduler in self.schedulers:
+            scheduler.passive = False
+            scheduler.start()
+        if self.shared:
+            logger.info(f"Worker {os.getpid()} elected as fetch leader")
+
+    async def _step(self):
+        if not self.is_leader and self._lock.try_acquire():
+            # اعتماد آخر ما نشره القائد السابق قبل بدء الجلب
+            for feed in self._feeds:
+                await feed.sync()
+            self._become_leader()
+        for feed in self._feeds:
+            if self.is_leader:
+                await feed.run_bumps()
+                await feed.publish()
+            else:
+                await feed.sync()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self._step()
+            except Exception as e:
+                logger.error(f"Synchronizing shared feed state failed: {str(e)}")
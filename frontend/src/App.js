@@ -143,13 +143,24 @@ const Home = () => {
     fetchBreakingNews(true);
   }, [fetchBreakingNews]);
 
-  // تحديث تلقائي كل 5 دقائق
+  // استقبال الأخبار العاجلة الجديدة فور وصولها بدل التحديث الدوري
   useEffect(() => {
-    const interval = setInterval(() => {
-      fetchBreakingNews(false);
-    }, 300000); // 5 دقائق
+    if (typeof EventSource === 'undefined') {
+      // متصفحات بدون دعم SSE: تحديث تلقائي كل 5 دقائق
+      const interval = setInterval(() => {
+        fetchBreakingNews(false);
+      }, 300000); // 5 دقائق
+      
+      return () => clearInterval(interval);
+    }
     
-    return () => clearInterval(interval);
+    return newsAPI.subscribeBreakingNews((article) => {
+      setNews((current) => {
+        if (current.some((item) => item.id === article.id)) return current;
+        return [article, ...current].slice(0, 50);
+      });
+      setLastUpdated(new Date());
+    });
   }, [fetchBreakingNews]);
 
   // جميع الأخبار عاجلة (لأننا نجلب العاجل فقط)
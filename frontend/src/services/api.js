@@ -97,6 +97,21 @@ export const newsAPI = {
     }
   },
 
+  // الاشتراك في بث الأخبار العاجلة الجديدة (Server-Sent Events)
+  // يعيد المتصفح الاتصال تلقائياً ويرسل Last-Event-ID لاستكمال ما فات
+  subscribeBreakingNews: (onArticle, onError) => {
+    const source = new EventSource(`${API}/news/stream`);
+    source.addEventListener('breaking', (event) => {
+      try {
+        onArticle(JSON.parse(event.data));
+      } catch (error) {
+        console.error('Stream parse error:', error);
+      }
+    });
+    if (onError) source.onerror = onError;
+    return () => source.close();
+  },
+
   // فحص حالة الخدمة
   healthCheck: async () => {
     try {
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# الخدمات تُستورد كما في الخادم (from services...) من مجلد backend
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
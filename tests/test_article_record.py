@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from api.news_routes import to_news_article
+from services.article_record import ArticleRecord, from_timestamp, to_timestamp
+
+ARTICLE = {
+    'id': "1",
+    'title': "جلسة لمجلس الوزراء",
+    'description': "وصف",
+    'source': "النهار",
+    'published_at': datetime(2024, 5, 1, 9, 30),
+    'published_ts': to_timestamp(datetime(2024, 5, 1, 9, 30)),
+    'category': "سياسة",
+    'is_breaking': True,
+    'url': "https://example.com/1",
+    'image_url': None,
+    'created_at': datetime(2024, 5, 1, 9, 31),
+    'website': "https://example.com",
+}
+
+
+def test_record_round_trips_the_article_dict():
+    assert ArticleRecord.from_article(ARTICLE).to_article() == ARTICLE
+
+
+def test_record_reads_like_the_article_dict():
+    record = ArticleRecord.from_article(ARTICLE)
+
+    assert record['published_at'] == ARTICLE['published_at']
+    assert record.get('url') == ARTICLE['url']
+    assert record.get('published_ts', "hidden") == "hidden"
+    assert 'image_url' not in record
+    with pytest.raises(KeyError):
+        record['published_ts']
+    assert to_news_article(record) == to_news_article(ARTICLE)
+
+
+def test_repeated_strings_are_shared_and_no_instance_dict():
+    # نسخ منفصلة من نفس النص كما يعيدها فك ترميز MongoDB
+    first = ArticleRecord.from_article({**ARTICLE, 'source': "".join(["الن", "هار"])})
+    second = ArticleRecord.from_article({**ARTICLE, 'id': "2", 'source': "".join(["النه", "ار"])})
+
+    assert first.source is second.source
+    assert not hasattr(first, "__dict__")
+
+
+def test_timestamps_are_utc_seconds():
+    beirut = timezone(timedelta(hours=3))
+
+    assert to_timestamp(datetime(2024, 5, 1, 12, 30, tzinfo=beirut)) == to_timestamp(datetime(2024, 5, 1, 9, 30))
+    assert from_timestamp(to_timestamp(ARTICLE['published_at'])) == ARTICLE['published_at']
+    assert to_timestamp(None) is None and from_timestamp(None) is None
@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from mongomock_motor import AsyncMongoMockClient
+
+from services.article_store import ArticleStore
+from services.article_timeline import ArticleFilters
+
+BASE = datetime(2024, 5, 1, 12, 0, 0)
+
+
+def make_article(index, **fields):
+    article = {
+        'id': f"article-{index:03d}",
+        'title': f"عنوان {index}",
+        'description': "وصف",
+        'source': "المصدر",
+        'published_at': BASE - timedelta(minutes=index),
+        'category': "سياسة",
+        'is_breaking': False,
+        'url': f"https://example.com/{index}",
+    }
+    article.update(fields)
+    return article
+
+
+def new_store():
+    return ArticleStore(AsyncMongoMockClient()["news"])
+
+
+def test_upsert_inserts_new_and_updates_existing_articles():
+    async def scenario():
+        store = new_store()
+        inserted = await store.upsert_articles([make_article(1), make_article(2)])
+        updated = await store.upsert_articles([make_article(1, title="عنوان معدل"), make_article(3)])
+        documents = {document["_id"]: document async for document in store.collection.find()}
+        return inserted, updated, documents
+
+    inserted, updated, documents = asyncio.run(scenario())
+
+    assert (inserted, updated) == (2, 1)
+    assert sorted(documents) == ["article-001", "article-002", "article-003"]
+    assert documents["article-001"]["title"] == "عنوان معدل"
+
+
+def test_upsert_skips_placeholders():
+    async def scenario():
+        store = new_store()
+        inserted = await store.upsert_articles([make_article(1, is_placeholder=True)])
+        return inserted, await store.collection.count_documents({})
+
+    assert asyncio.run(scenario()) == (0, 0)
+
+
+def test_created_at_is_kept_from_the_first_insert():
+    first_seen = datetime(2024, 1, 1)
+
+    async def scenario():
+        store = new_store()
+        await store.upsert_articles([make_article(1, created_at=first_seen)])
+        await store.upsert_articles([make_article(1, created_at=datetime(2024, 2, 1), title="عنوان معدل")])
+        return await store.collection.find_one({"_id": "article-001"})
+
+    document = asyncio.run(scenario())
+
+    assert document["created_at"] == first_seen
+    assert document["title"] == "عنوان معدل"
+    assert document["updated_at"] > first_seen
+
+
+def test_keyset_pages_cover_every_article_once_with_equal_publish_times():
+    # مقالات بنفس وقت النشر: الترتيب الثانوي على _id يمنع التكرار أو الضياع بين الصفحات
+    articles = [make_article(index, published_at=BASE - timedelta(minutes=index // 3)) for index in range(20)]
+
+    async def scenario():
+        store = new_store()
+        await store.upsert_articles(articles)
+        pages, after = [], None
+        while True:
+            page, has_more = await store.page_articles(ArticleFilters(), after, limit=6)
+            pages.append([article['id'] for article in page])
+            if not has_more:
+                return pages
+            after = (page[-1]['published_at'], page[-1]['id'])
+
+    pages = asyncio.run(scenario())
+    expected = [
+        article['id'] for article in sorted(articles, key=lambda article: (article['published_at'], article['id']), reverse=True)
+    ]
+
+    assert [len(page) for page in pages] == [6, 6, 6, 2]
+    assert [article_id for page in pages for article_id in page] == expected
+
+
+def test_keyset_pages_apply_filters():
+    articles = [make_article(index, is_breaking=index % 2 == 0) for index in range(10)]
+
+    async def scenario():
+        store = new_store()
+        await store.upsert_articles(articles)
+        first, has_more = await store.page_articles(ArticleFilters(is_breaking=True), None, limit=3)
+        second, _ = await store.page_articles(
+            ArticleFilters(is_breaking=True), (first[-1]['published_at'], first[-1]['id']), limit=3
+        )
+        return first, has_more, second
+
+    first, has_more, second = asyncio.run(scenario())
+
+    assert has_more
+    assert [article['id'] for article in first + second] == [f"article-{index:03d}" for index in (0, 2, 4, 6, 8)]
+    assert all(article['published_ts'] is not None for article in first)
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from services import article_timeline
+from services.article_timeline import ArticleFilters, ArticleTimeline, InvalidCursor, decode_cursor, encode_cursor
+
+BASE = datetime(2024, 5, 1, 12, 0, 0)
+
+
+def make_article(index, minutes=None, **fields):
+    article = {
+        'id': f"article-{index:03d}",
+        'title': f"عنوان {index}",
+        'description': "وصف",
+        'source': "المصدر أ" if index % 2 else "المصدر ب",
+        'published_at': BASE - timedelta(minutes=index if minutes is None else minutes),
+        'category': "سياسة",
+        'is_breaking': index % 3 == 0,
+    }
+    article.update(fields)
+    return article
+
+
+def walk(timeline, filters, limit):
+    """كل الصفحات عبر المؤشرات المرمزة كما يستخدمها العميل"""
+    pages, cursor = [], None
+    while True:
+        after = decode_cursor(cursor) if cursor else None
+        page, has_more = timeline.page(filters, after, limit)
+        pages.append([record.id for record in page])
+        if not has_more:
+            return pages
+        cursor = encode_cursor(page[-1])
+
+
+def newest_first(articles):
+    return [
+        article['id'] for article in sorted(articles, key=lambda article: (article['published_at'], article['id']), reverse=True)
+    ]
+
+
+def test_cursor_pages_cover_every_article_once_with_equal_publish_times():
+    articles = [make_article(index, minutes=index // 4) for index in range(30)]
+    timeline = ArticleTimeline()
+    timeline.add_articles(articles)
+
+    pages = walk(timeline, ArticleFilters(), limit=7)
+
+    assert [len(page) for page in pages] == [7, 7, 7, 7, 2]
+    assert [article_id for page in pages for article_id in page] == newest_first(articles)
+
+
+def test_cursor_pages_apply_filters_and_time_range():
+    articles = [make_article(index) for index in range(30)]
+    timeline = ArticleTimeline()
+    timeline.add_articles(articles)
+    filters = ArticleFilters(
+        sources=("المصدر أ",), is_breaking=True,
+        since=BASE - timedelta(minutes=25), until=BASE - timedelta(minutes=2),
+    )
+
+    pages = walk(timeline, filters, limit=2)
+
+    expected = [
+        article for article in articles
+        if article['source'] == "المصدر أ" and article['is_breaking']
+        and filters.since <= article['published_at'] < filters.until
+    ]
+    assert [article_id for page in pages for article_id in page] == newest_first(expected)
+
+
+def test_updated_publish_time_moves_the_article():
+    timeline = ArticleTimeline()
+    timeline.add_articles([make_article(1), make_article(2)])
+    timeline.add_articles([make_article(2, minutes=-5)])
+
+    page, _ = timeline.page(ArticleFilters(), None, 10)
+
+    assert [record.id for record in page] == ["article-002", "article-001"]
+    assert len(timeline) == 2
+
+
+def test_oldest_articles_are_dropped_beyond_the_limit():
+    timeline = ArticleTimeline(max_articles=5)
+    timeline.add_articles([make_article(index) for index in range(8)])
+
+    page, has_more = timeline.page(ArticleFilters(), None, 10)
+
+    assert [record.id for record in page] == [f"article-{index:03d}" for index in range(5)]
+    assert not has_more
+
+
+def test_cursor_round_trip_and_invalid_cursors():
+    article = make_article(1)
+
+    assert decode_cursor(encode_cursor(article)) == (article['published_at'], article['id'])
+    for cursor in ("not-a-cursor", encode_cursor(article)[:-3], "W10"):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor)
+
+
+# 1: كل دفعة تُلحق ثم تُرتب؛ 64: الإدراج بالبحث الثنائي
+@pytest.mark.parametrize("batch_sort_min", [1, 64])
+def test_filtered_pages_match_a_full_scan_after_edits_and_trimming(monkeypatch, batch_sort_min):
+    monkeypatch.setattr(article_timeline, "BATCH_SORT_MIN", batch_sort_min)
+    timeline = ArticleTimeline(max_articles=40)
+    batches = [
+        [make_article(index, source=f"المصدر {index % 4}") for index in range(30)],
+        # تعديل التصنيف والمصدر ووقت النشر لمقالات موجودة، ومقالات جديدة تتجاوز الحد
+        [make_article(index, category="اقتصاد") for index in range(0, 30, 5)]
+        + [make_article(index, minutes=-index, source="المصدر 9") for index in range(30, 45)],
+    ]
+    latest = {}
+    for batch in batches:
+        timeline.add_articles(batch)
+        latest.update({article['id']: article for article in batch})
+    kept = newest_first(latest.values())[:40]
+    kept_articles = [latest[article_id] for article_id in kept]
+
+    for filters in (
+        ArticleFilters(category="اقتصاد"),
+        ArticleFilters(sources=("المصدر 1", "المصدر 9")),
+        ArticleFilters(sources=("المصدر 2",), is_breaking=False, until=BASE - timedelta(minutes=3)),
+        ArticleFilters(is_breaking=True, category="سياسة"),
+    ):
+        pages = walk(timeline, filters, limit=3)
+
+        expected = [
+            article for article in kept_articles
+            if (not filters.sources or article['source'] in filters.sources)
+            and (filters.category is None or article['category'] == filters.category)
+            and (filters.is_breaking is None or article['is_breaking'] == filters.is_breaking)
+            and (filters.until is None or article['published_at'] < filters.until)
+        ]
+        assert [article_id for page in pages for article_id in page] == newest_first(expected), filters
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from services.circuit_breaker import (
+    STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker, CircuitBreakers, CircuitOpenError,
+)
+from services.lebanon_news_service import headlines_failure
+
+
+def expire(breaker):
+    breaker.open_until -= breaker.retry_after() + 1
+
+
+def test_opens_after_consecutive_failures_and_rejects_requests():
+    breaker = CircuitBreaker("المصدر", failure_threshold=3, open_seconds=60)
+
+    breaker.record_failure(0.1, "timeout")
+    breaker.record_success(0.1)
+    breaker.record_failure(0.1, "timeout")
+    breaker.record_failure(0.1, "timeout")
+    assert breaker.state == STATE_CLOSED
+
+    breaker.record_failure(0.1, "timeout")
+
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow()
+    assert 59 < breaker.retry_after() <= 60
+
+
+def test_half_open_allows_a_single_trial():
+    breaker = CircuitBreaker("المصدر", failure_threshold=1)
+    breaker.record_failure(0.1, "timeout")
+    expire(breaker)
+
+    assert breaker.allow()
+    assert breaker.state == STATE_HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_successful_trial_closes_the_circuit():
+    breaker = CircuitBreaker("المصدر", failure_threshold=1)
+    breaker.record_failure(0.1, "timeout")
+    expire(breaker)
+    breaker.allow()
+
+    breaker.record_success(0.1)
+
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow()
+    assert breaker.consecutive_failures == 0
+
+
+def test_failed_trial_reopens_for_longer_up_to_the_limit():
+    breaker = CircuitBreaker("المصدر", failure_threshold=1, open_seconds=60, max_open_seconds=200)
+    breaker.record_failure(0.1, "timeout")
+    durations = []
+    for _ in range(3):
+        expire(breaker)
+        assert breaker.allow()
+        breaker.record_failure(0.1, "timeout")
+        durations.append(round(breaker.retry_after()))
+
+    assert breaker.state == STATE_OPEN
+    assert durations == [120, 200, 200]
+
+
+def test_call_uses_the_failure_predicate_and_raises_when_open():
+    breakers = CircuitBreakers(failure_threshold=2)
+
+    async def placeholder():
+        return [{'is_placeholder': True}]
+
+    def failed(result):
+        return "placeholder" if result[0].get('is_placeholder') else None
+
+    async def scenario():
+        results = [await breakers.call("المصدر", placeholder, failed=failed) for _ in range(2)]
+        with pytest.raises(CircuitOpenError):
+            await breakers.call("المصدر", placeholder, failed=failed)
+        return results
+
+    results = asyncio.run(scenario())
+    health = breakers.health(["المصدر"])["المصدر"]
+
+    assert len(results) == 2
+    assert health["state"] == STATE_OPEN
+    assert health["error_rate"] == 1.0
+    assert health["rejected"] == 1
+    assert health["last_error"] == "placeholder"
+
+
+def test_cancelled_trial_releases_the_half_open_slot():
+    breakers = CircuitBreakers(failure_threshold=1)
+    breaker = breakers.get("المصدر")
+    breaker.record_failure(0.1, "timeout")
+    expire(breaker)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def scenario():
+        task = asyncio.create_task(breakers.call("المصدر", hang))
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow()
+
+
+def test_quiet_feeds_do_not_open_the_circuit():
+    breakers = CircuitBreakers(failure_threshold=2)
+
+    async def no_political_headlines():
+        return []
+
+    async def scenario():
+        for _ in range(3):
+            await breakers.call("الصحيفة", no_political_headlines, failed=headlines_failure)
+
+    asyncio.run(scenario())
+
+    assert breakers.get("الصحيفة").state == STATE_CLOSED
+    assert breakers.get("الصحيفة").consecutive_failures == 0
@@ -0,0 +1,84 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from services.rss_service import RSSService, prepare_rss_source
+from services.source_registry import SourceRegistry
+
+RSS = (
+    '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>t</title>'
+    '<item><title>عاجل: جلسة طارئة للحكومة</title><link>https://example.com/1</link></item>'
+    '</channel></rss>'
+).encode("utf-8")
+
+
+class FakeContent:
+    def __init__(self, body):
+        self.body = body
+
+    async def iter_chunked(self, size):
+        yield self.body
+
+
+class FakeResponse:
+    def __init__(self, status, headers, body=b""):
+        self.url = "https://example.com/rss"
+        self.status = status
+        self.headers = headers
+        self.content = FakeContent(body)
+
+
+class FakeHttp:
+    """يرد 200 مع ETag أول مرة، ثم 304 لكل طلب يرسل If-None-Match مطابقاً"""
+
+    def __init__(self, etag='"v1"'):
+        self.etag = etag
+        self.requests = []
+
+    @asynccontextmanager
+    async def get(self, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.requests.append(headers)
+        if headers.get("If-None-Match") == self.etag:
+            yield FakeResponse(304, {"ETag": self.etag})
+        else:
+            yield FakeResponse(200, {"ETag": self.etag}, RSS)
+
+
+def make_service(http):
+    sources = SourceRegistry("breaking", prepare=prepare_rss_source)
+    sources.replace([{"name": "المصدر", "url": "https://example.com/rss"}])
+    return RSSService(http=http, sources=sources)
+
+
+def test_not_modified_reuses_the_parsed_articles():
+    http = FakeHttp()
+    service = make_service(http)
+    source = service.rss_sources[0]
+
+    async def scenario():
+        return await service.fetch_rss_feed(source), await service.fetch_rss_feed(source)
+
+    first, second = asyncio.run(scenario())
+
+    assert [article['title'] for article in first] == ["عاجل: جلسة طارئة للحكومة"]
+    assert second is first
+    assert http.requests == [{}, {"If-None-Match": '"v1"'}]
+    stats = service.conditional_get.stats
+    assert (stats["not_modified"], stats["parses_saved"], stats["bytes_saved"]) == (1, 1, len(RSS))
+
+
+def test_changed_validator_fetches_the_full_feed_again():
+    http = FakeHttp()
+    service = make_service(http)
+    source = service.rss_sources[0]
+
+    async def scenario():
+        await service.fetch_rss_feed(source)
+        http.etag = '"v2"'
+        return await service.fetch_rss_feed(source)
+
+    articles = asyncio.run(scenario())
+
+    assert [article['title'] for article in articles] == ["عاجل: جلسة طارئة للحكومة"]
+    assert service.conditional_get.stats["not_modified"] == 0
+    assert service.conditional_get.request_headers(source["url"]) == {"If-None-Match": '"v2"'}
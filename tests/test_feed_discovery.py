@@ -0,0 +1,86 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from services.feed_discovery import FeedDiscovery, find_feed_links
+
+NEWSPAPER = {"name": "الصحيفة", "url": "https://example.com/old-rss", "website": "https://example.com"}
+HOMEPAGE = (
+    '<html><head><link rel="alternate" type="application/rss+xml" href="/arabic/feed.xml">'
+    '<link rel="stylesheet" href="/style.css"></head><body>'
+    '<link rel="alternate" type="application/rss+xml" href="/ignored.xml"></body></html>'
+)
+FEED = b'<rss><channel><item><title>t</title></item></channel></rss>'
+
+
+class FakeContent:
+    def __init__(self, body):
+        self.body = body
+
+    async def iter_chunked(self, size):
+        yield self.body
+
+    async def read(self, size):
+        body, self.body = self.body, b""
+        return body
+
+
+class FakeResponse:
+    request_info = None
+    history = ()
+    charset = "utf-8"
+
+    def __init__(self, url, status, body=b""):
+        self.url = url
+        self.status = status
+        self.content = FakeContent(body)
+
+
+class FakeHttp:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    @asynccontextmanager
+    async def get(self, url, **kwargs):
+        self.requested.append(url)
+        body = self.pages.get(url)
+        yield FakeResponse(url, 404 if body is None else 200, body or b"")
+
+
+async def validate(content):
+    return ["headline"] if b"<item>" in content else None
+
+
+def test_homepage_links_are_resolved_until_the_body():
+    assert find_feed_links(HOMEPAGE, "https://example.com/") == ["https://example.com/arabic/feed.xml"]
+
+
+def test_feed_found_through_the_homepage_is_remembered():
+    http = FakeHttp({"https://example.com": HOMEPAGE.encode(), "https://example.com/arabic/feed.xml": FEED})
+    discovery = FeedDiscovery(http=http)
+
+    found = asyncio.run(discovery.discover(NEWSPAPER, validate, exclude=(NEWSPAPER["url"],)))
+
+    assert found == ("https://example.com/arabic/feed.xml", ["headline"])
+    assert NEWSPAPER["url"] not in http.requested
+    assert discovery.feed_url(NEWSPAPER) == "https://example.com/arabic/feed.xml"
+    # عودة الرابط الأساسي تلغي البديل
+    discovery.confirm(NEWSPAPER, NEWSPAPER["url"])
+    assert discovery.feed_url(NEWSPAPER) == NEWSPAPER["url"]
+
+
+def test_source_without_any_feed_waits_for_the_cooldown():
+    http = FakeHttp({"https://example.com": b"<html><head></head></html>", "https://example.com/rss": b"<html>not a feed"})
+    discovery = FeedDiscovery(http=http, cooldown=600)
+
+    async def scenario():
+        first = await discovery.discover(NEWSPAPER, validate)
+        requested = len(http.requested)
+        return first, requested, await discovery.discover(NEWSPAPER, validate)
+
+    first, requested, second = asyncio.run(scenario())
+
+    assert first is None and second is None
+    assert requested == len(discovery.candidate_urls(NEWSPAPER)) + 1
+    assert len(http.requested) == requested
+    assert discovery.in_cooldown(NEWSPAPER["name"])
@@ -0,0 +1,224 @@
+import asyncio
+
+import pytest
+
+from services.feed_scheduler import SOURCE_FRESH, SOURCE_MISSING, SOURCE_STALE, FeedScheduler
+from services.feed_store import FeedStore
+from services.lebanon_news_service import headlines_failure
+from services.source_registry import SourceRegistry
+
+
+def make_scheduler(fetch, names=("أ", "ب"), **options):
+    sources = SourceRegistry("test")
+    sources.replace([{"name": name, "url": f"https://example.com/{index}"} for index, name in enumerate(names)])
+    options.setdefault("interval", 100)
+    options.setdefault("jitter", 0)
+    return FeedScheduler("test", sources, fetch, FeedStore(), **options)
+
+
+def article(source_name, number=1):
+    return {'id': f"{source_name}-{number}", 'title': "عنوان", 'source': source_name, 'published_ts': number}
+
+
+def remaining(scheduler, name):
+    return scheduler.export_schedule()[name]
+
+
+def test_failures_back_off_exponentially_up_to_the_limit():
+    async def fetch(source):
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        scheduler = make_scheduler(fetch, max_backoff=500)
+        delays = []
+        for _ in range(4):
+            await scheduler.poll("أ")
+            delays.append(remaining(scheduler, "أ"))
+        return scheduler, delays, scheduler.source_status("أ")
+
+    scheduler, delays, status = asyncio.run(scenario())
+
+    assert [round(delay) for delay in delays] == [200, 400, 500, 500]
+    assert scheduler.store.get("أ").consecutive_failures == 4
+    assert status == SOURCE_MISSING
+
+
+def test_success_resets_the_backoff():
+    results = [RuntimeError("upstream down"), [article("أ")]]
+
+    async def fetch(source):
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def scenario():
+        scheduler = make_scheduler(fetch)
+        await scheduler.poll("أ")
+        await scheduler.poll("أ")
+        return scheduler, remaining(scheduler, "أ"), scheduler.source_status("أ")
+
+    scheduler, delay, status = asyncio.run(scenario())
+
+    assert round(delay) == 100
+    assert scheduler.store.get("أ").consecutive_failures == 0
+    assert status == SOURCE_FRESH
+
+
+def test_bump_moves_sources_to_the_front_of_the_queue():
+    fetched = []
+
+    async def fetch(source):
+        fetched.append(source["name"])
+        return [article(source["name"])]
+
+    async def scenario():
+        scheduler = make_scheduler(fetch)
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        initial = list(fetched)
+        assert not scheduler.due_sources()
+        bumped = scheduler.bump("ب")
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+        return initial, bumped, fetched[len(initial):]
+
+    initial, bumped, after_bump = asyncio.run(scenario())
+
+    assert sorted(initial) == ["أ", "ب"]
+    assert bumped
+    assert after_bump == ["ب"]
+
+
+def test_bump_rejects_unknown_sources():
+    async def fetch(source):
+        return []
+
+    async def scenario():
+        return make_scheduler(fetch).bump("غير موجود")
+
+    assert asyncio.run(scenario()) is False
+
+
+def test_concurrent_polls_of_one_source_share_the_fetch():
+    calls = 0
+
+    async def fetch(source):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return [article(source["name"])]
+
+    async def scenario():
+        scheduler = make_scheduler(fetch)
+        await asyncio.gather(*(scheduler.poll("أ") for _ in range(5)))
+
+    asyncio.run(scenario())
+
+    assert calls == 1
+
+
+def test_failed_result_keeps_the_last_real_articles():
+    placeholder = [{'id': "placeholder", 'is_placeholder': True}]
+    results = [[article("أ")], placeholder]
+
+    async def fetch(source):
+        return results.pop(0)
+
+    async def scenario():
+        scheduler = make_scheduler(
+            fetch, failed=lambda articles: "placeholder" if articles and articles[0].get('is_placeholder') else None
+        )
+        await scheduler.poll("أ")
+        await scheduler.poll("أ")
+        return scheduler, scheduler.source_status("أ")
+
+    scheduler, status = asyncio.run(scenario())
+
+    assert [item['id'] for item in scheduler.store.get("أ").articles] == ["أ-1"]
+    assert status == SOURCE_STALE
+
+
+def test_poll_due_returns_sources_still_fetching_after_the_deadline():
+    release = None
+
+    async def fetch(source):
+        if source["name"] == "ب":
+            await release.wait()
+        return [article(source["name"])]
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        scheduler = make_scheduler(fetch)
+        pending = await scheduler.poll_due(deadline=0.05)
+        stored_before = scheduler.store.get("ب")
+        release.set()
+        await asyncio.sleep(0.01)
+        return pending, stored_before, scheduler, scheduler.source_status("أ")
+
+    pending, stored_before, scheduler, status = asyncio.run(scenario())
+
+    assert pending == ["ب"]
+    assert stored_before is None
+    assert [item['id'] for item in scheduler.store.get("ب").articles] == ["ب-1"]
+    assert status == SOURCE_FRESH
+
+
+def test_passive_bump_is_forwarded_to_the_leader():
+    async def fetch(source):
+        raise AssertionError("passive schedulers do not fetch")
+
+    async def scenario():
+        scheduler = make_scheduler(fetch)
+        scheduler.passive = True
+        forwarded = []
+        scheduler.forward_bump = forwarded.append
+        results = (scheduler.bump("أ"), scheduler.bump())
+        return results, forwarded, scheduler.export_schedule()
+
+    results, forwarded, schedule = asyncio.run(scenario())
+
+    assert results == (True, True)
+    assert forwarded == ["أ", None]
+    assert schedule == {}
+
+
+def test_passive_bump_without_a_leader_is_an_error():
+    async def fetch(source):
+        return []
+
+    async def scenario():
+        scheduler = make_scheduler(fetch)
+        scheduler.passive = True
+        scheduler.bump("أ")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scenario())
+
+
+def test_empty_result_is_fresh_and_a_placeholder_is_missing():
+    results = [[], [{'id': "placeholder", 'published_ts': 1714557600, 'is_placeholder': True}]]
+
+    async def fetch(source):
+        return results.pop(0)
+
+    async def scenario():
+        scheduler = make_scheduler(fetch, failed=headlines_failure)
+        await scheduler.poll("أ")
+        statuses = [scheduler.source_status("أ"), round(remaining(scheduler, "أ"))]
+        await scheduler.poll("أ")
+        return statuses + [scheduler.source_status("أ")]
+
+    assert asyncio.run(scenario()) == [SOURCE_FRESH, 100, SOURCE_MISSING]
+
+
+def test_placeholder_headline_has_an_epoch_publish_time():
+    from services.article_record import to_timestamp
+    from services.lebanon_news_service import LebanonNewsService
+
+    newspaper = {"name": "النهار", "website": "https://example.com", "category": "سياسة"}
+    [placeholder] = LebanonNewsService().placeholder_headlines(newspaper)
+
+    assert isinstance(placeholder['published_ts'], int)
+    assert to_timestamp(placeholder['published_at']) == placeholder['published_ts']
@@ -0,0 +1,106 @@
+import asyncio
+
+import feedparser
+import pytest
+
+from services.feed_stream import FeedTooLarge, read_feed
+
+
+class FakeContent:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def iter_chunked(self, size):
+        for chunk in self.chunks:
+            yield chunk
+
+
+class FakeResponse:
+    url = "https://example.com/rss"
+
+    def __init__(self, chunks):
+        self.content = FakeContent(chunks)
+
+
+def rss(items, closing_tag="</item>"):
+    entries = "".join(
+        f"<item><title>خبر {index}</title><link>https://example.com/{index}</link>{closing_tag}"
+        for index in range(items)
+    )
+    return f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>t</title>{entries}</channel></rss>'.encode("utf-8")
+
+
+def split_at(body, *offsets):
+    bounds = [0, *offsets, len(body)]
+    return [body[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def read(chunks, **options):
+    return asyncio.run(read_feed(FakeResponse(chunks), **options))
+
+
+def test_entry_end_split_across_chunks_is_counted_once():
+    body = rss(5)
+    third_end = [index for index in range(len(body)) if body.startswith(b"</item>", index)][2]
+
+    # تقسيم البايتات في كل موضع داخل وسم النهاية الثالث وحوله
+    for offset in range(third_end - 2, third_end + len(b"</item>") + 2):
+        result = read(split_at(body, offset), max_entries=3)
+        parsed = feedparser.parse(result.content)
+        assert result.truncated, offset
+        assert result.entries == 3, offset
+        assert [entry.title for entry in parsed.entries] == ["خبر 0", "خبر 1", "خبر 2"], offset
+        assert not parsed.bozo, offset
+
+
+def test_one_byte_chunks_match_a_single_chunk():
+    body = rss(4)
+
+    whole = read([body])
+    bytewise = read([body[index:index + 1] for index in range(len(body))])
+
+    assert (whole.content, whole.entries, whole.truncated) == (body, 4, False)
+    assert (bytewise.content, bytewise.entries, bytewise.truncated) == (body, 4, False)
+
+
+def test_truncated_atom_feed_is_closed_as_a_document():
+    entries = "".join(f"<entry><title>خبر {index}</title></entry >" for index in range(4))
+    body = f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'.encode("utf-8")
+
+    result = read(split_at(body, 40, 80), max_entries=2)
+
+    assert result.content.endswith(b"</entry ></feed>")
+    assert [entry.title for entry in feedparser.parse(result.content).entries] == ["خبر 0", "خبر 1"]
+
+
+def test_max_bytes_keeps_only_complete_entries():
+    body = rss(50)
+
+    result = read(split_at(body, 300, 600, 900), max_bytes=600)
+
+    parsed = feedparser.parse(result.content)
+    assert result.truncated
+    assert result.bytes_read == 600
+    assert len(parsed.entries) == result.entries
+    assert result.content.endswith(b"</item></channel></rss>")
+
+
+def test_entry_end_inside_cdata_or_comment_is_not_counted():
+    description = "<description><![CDATA[نص يذكر </item> داخل الوصف]]></description><!-- </item> -->"
+    body = rss(3, closing_tag=description + "</item>")
+    inner = body.index(b"</item> \xd8")
+
+    # تقسيم البايتات داخل قسم CDATA وعند نهايته
+    for offset in (inner - 3, inner + 3, body.index(b"]]>") + 1):
+        result = read(split_at(body, offset), max_entries=2)
+        parsed = feedparser.parse(result.content)
+        assert result.entries == 2, offset
+        assert [entry.title for entry in parsed.entries] == ["خبر 0", "خبر 1"], offset
+        assert not parsed.bozo, offset
+
+
+def test_max_bytes_before_the_first_entry_fails_instead_of_parsing_a_fragment():
+    body = rss(1, closing_tag="<description>" + "x" * 2000 + "</description></item>")
+
+    with pytest.raises(FeedTooLarge):
+        read(split_at(body, 300, 600, 900), max_bytes=600)
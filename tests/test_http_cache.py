@@ -0,0 +1,116 @@
+import gzip
+from datetime import datetime, timedelta
+
+from starlette.requests import Request
+
+from services.http_cache import COMPRESS_MIN_BYTES, RenderedBody, cached_response, http_date
+
+CACHE_CONTROL = "public, max-age=30"
+LAST_MODIFIED = datetime(2024, 5, 1, 12, 0, 0)
+LARGE = RenderedBody(b'{"items": "' + b"x" * COMPRESS_MIN_BYTES + b'"}')
+SMALL = RenderedBody(b'{"items": []}')
+
+
+def make_request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_full_response_carries_validators():
+    response = cached_response(make_request(), SMALL, CACHE_CONTROL, last_modified=LAST_MODIFIED)
+
+    assert response.status_code == 200
+    assert response.body == SMALL.content
+    assert response.headers["etag"] == SMALL.etag()
+    assert response.headers["cache-control"] == CACHE_CONTROL
+    assert response.headers["last-modified"] == http_date(LAST_MODIFIED)
+    assert "content-encoding" not in response.headers
+
+
+def test_matching_etag_returns_304_without_a_body():
+    response = cached_response(make_request(if_none_match=f'W/"x", {SMALL.etag()}'), SMALL, CACHE_CONTROL)
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == SMALL.etag()
+
+
+def test_etag_of_a_compressed_copy_matches_the_same_content():
+    request = make_request(if_none_match=LARGE.etag("gzip"), accept_encoding="identity")
+
+    assert cached_response(request, LARGE, CACHE_CONTROL).status_code == 304
+
+
+def test_changed_content_is_sent_again():
+    response = cached_response(make_request(if_none_match=SMALL.etag()), LARGE, CACHE_CONTROL)
+
+    assert response.status_code == 200
+
+
+def test_if_modified_since_is_used_without_if_none_match():
+    fresh = make_request(if_modified_since=http_date(LAST_MODIFIED))
+    old = make_request(if_modified_since=http_date(LAST_MODIFIED - timedelta(seconds=1)))
+    both = make_request(if_modified_since=http_date(LAST_MODIFIED), if_none_match='"other"')
+
+    assert cached_response(fresh, SMALL, CACHE_CONTROL, last_modified=LAST_MODIFIED).status_code == 304
+    assert cached_response(old, SMALL, CACHE_CONTROL, last_modified=LAST_MODIFIED).status_code == 200
+    assert cached_response(both, SMALL, CACHE_CONTROL, last_modified=LAST_MODIFIED).status_code == 200
+
+
+def test_large_bodies_are_compressed_once_per_encoding():
+    response = cached_response(make_request(accept_encoding="gzip, deflate"), LARGE, CACHE_CONTROL)
+    again = cached_response(make_request(accept_encoding="gzip"), LARGE, CACHE_CONTROL)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == LARGE.etag("gzip")
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert gzip.decompress(response.body) == LARGE.content
+    assert again.body is response.body
+
+
+def test_small_bodies_and_refused_encodings_are_sent_uncompressed():
+    small = cached_response(make_request(accept_encoding="gzip"), SMALL, CACHE_CONTROL)
+    refused = cached_response(make_request(accept_encoding="gzip;q=0, br;q=0"), LARGE, CACHE_CONTROL)
+
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in refused.headers
+    assert refused.body == LARGE.content
+
+
+def test_rendered_articles_do_not_change_between_requests():
+    from api.lebanon_routes import to_headline_article
+    from services.serialization import dumps
+
+    # عنوان مستعاد بدون created_at: يُشتق من وقت النشر لا من وقت الطلب
+    headline = {
+        'id': "1", 'title': "جلسة لمجلس الوزراء", 'description': "", 'source': "النهار",
+        'published_at': datetime(2024, 5, 1, 9, 30), 'category': "سياسة",
+    }
+
+    def render():
+        return RenderedBody(dumps(to_headline_article(headline).model_dump()))
+
+    first = render()
+    assert render().etag() == first.etag()
+
+
+def test_repeated_failures_keep_the_same_placeholder():
+    from services.feed_store import FeedStore
+
+    def placeholder():
+        return [{
+            'id': "placeholder", 'title': "لا يمكن جلب الأخبار", 'description': "", 'source': "النهار",
+            'published_at': datetime.utcnow(), 'category': "سياسة", 'is_placeholder': True,
+        }]
+
+    store = FeedStore()
+    assert store.record_failure("النهار", "placeholder headline", fallback=placeholder())
+    shown = store.get("النهار").articles
+
+    assert not store.record_failure("النهار", "placeholder headline", fallback=placeholder())
+    assert store.get("النهار").articles is shown
+    assert shown[0]['created_at'] is not None
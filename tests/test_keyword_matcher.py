@@ -0,0 +1,68 @@
+import random
+
+from services.keyword_matcher import KeywordMatcher, normalize_arabic
+
+GROUPS = {
+    "عاجل": ["عاجل", "عاجل جداً", "الآن"],
+    "أمن": ["انفجار", "غارة", "غارات", "اشتباك", "اشتباكات"],
+    "سياسة": ["الحكومة", "حكومة", "رئيس الحكومة", "مجلس النواب", "النواب", "وزير"],
+    "اقتصاد": ["الليرة", "سعر الصرف", "صرف"],
+}
+
+FILLER = ["في", "بيروت", "اليوم", "مع", "و", "لبنان", "جنوب", "إعلان", "ال", "ة", " "]
+
+
+def naive_match(groups, text):
+    """المرجع: البحث عن كل كلمة مفتاحية في النص المطبّع واحدة واحدة"""
+    text = normalize_arabic(text)
+    keywords = set()
+    matched_groups = set()
+    for group, group_keywords in groups.items():
+        for keyword in group_keywords:
+            normalized = normalize_arabic(keyword)
+            if normalized and normalized in text:
+                keywords.add(normalized)
+                matched_groups.add(group)
+    return matched_groups, keywords
+
+
+def random_text(rng):
+    words = [keyword for keywords in GROUPS.values() for keyword in keywords] + FILLER
+    # بدون مسافات أحياناً حتى تتداخل الكلمات المفتاحية
+    separator = rng.choice([" ", "", "ـ"])
+    return separator.join(rng.choice(words) for _ in range(rng.randint(0, 8)))
+
+
+def test_match_agrees_with_a_naive_scan():
+    matcher = KeywordMatcher(GROUPS)
+    rng = random.Random(20240501)
+
+    for _ in range(2000):
+        text = random_text(rng)
+        result = matcher.match(text)
+        expected_groups, expected_keywords = naive_match(GROUPS, text)
+        assert (set(result.groups), set(result.keywords)) == (expected_groups, expected_keywords), text
+        assert matcher.matches_any(text) == bool(expected_groups), text
+
+
+def test_match_normalizes_letters_and_diacritics():
+    matcher = KeywordMatcher(GROUPS)
+
+    result = matcher.match("اجتماعُ رئيسِ الحكومةِ مع وزيرٍ")
+
+    assert result.groups == {"سياسة"}
+    assert normalize_arabic("رئيس الحكومة") in result.keywords
+
+
+def test_first_group_follows_the_given_order():
+    result = KeywordMatcher(GROUPS).match("عاجل: غارة على الجنوب")
+
+    assert result.first_group(["أمن", "عاجل"]) == "أمن"
+    assert result.first_group(["عاجل", "أمن"]) == "عاجل"
+    assert result.first_group(["اقتصاد"]) is None
+
+
+def test_empty_groups_and_text_match_nothing():
+    assert not KeywordMatcher({}).match("عاجل").groups
+    assert not KeywordMatcher(GROUPS).match("").groups
+    assert not KeywordMatcher(GROUPS).matches_any("")
@@ -0,0 +1,34 @@
+import asyncio
+
+from services.metrics import MetricsRegistry
+from services.parse_pool import ParsePool
+from services.rss_service import parse_rss_entries, prepare_rss_source
+
+RSS = (
+    '<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>t</title>'
+    '<item><title>عاجل: جلسة للحكومة</title><link>https://example.com/1</link></item>'
+    '</channel></rss>'
+).encode("utf-8")
+
+
+def test_function_backed_counter_is_rendered_as_a_counter():
+    registry = MetricsRegistry()
+    registry.counter("conditional_get_total", "Conditional GET counters", ("kind",), function=lambda: {("hit",): 3})
+
+    assert registry.render() == (
+        "# HELP conditional_get_total Conditional GET counters\n"
+        "# TYPE conditional_get_total counter\n"
+        'conditional_get_total{kind="hit"} 3\n'
+    )
+
+
+def test_stage_timings_come_back_from_a_process_pool():
+    pool = ParsePool("process", workers=1)
+    source = prepare_rss_source({"name": "مصدر", "url": "https://example.com/rss"})
+    try:
+        entries, stages = asyncio.run(pool.run_timed(parse_rss_entries, RSS, source, None))
+    finally:
+        pool.shutdown()
+
+    assert [entry.article['title'] for entry in entries] == ["عاجل: جلسة للحكومة"]
+    assert set(stages.totals) == {"parse", "strip_html", "classify"}
@@ -0,0 +1,66 @@
+import asyncio
+import json
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import news_routes
+from services.news_hub import NewsHub
+
+
+def make_articles(*numbers, is_breaking=True):
+    return [
+        {'id': f"article-{number}", 'title': f"عاجل {number}", 'is_breaking': is_breaking,
+         'published_at': datetime(2024, 5, 1, 12, 0, number)}
+        for number in numbers
+    ]
+
+
+def test_last_event_id_replays_only_missed_events():
+    hub = NewsHub()
+    hub.publish(make_articles(1, 2))
+    first_batch = [event.id for event in hub._history]
+    hub.publish(make_articles(2, 3, 4) + make_articles(5, is_breaking=False))
+
+    async def missed():
+        subscription = hub.subscribe(last_event_id=first_batch[-1])
+        return await subscription.next_events(timeout=0)
+
+    events = asyncio.run(missed())
+
+    # المقال 2 نُشر سابقاً ولا يتكرر، والخبر غير العاجل لا يُبث
+    assert [event.article_id for event in events] == ["article-3", "article-4"]
+    assert events[0].id == first_batch[-1] + 1
+    assert events[0].sse.startswith(f"id: {events[0].id}\nevent: breaking\ndata: ")
+
+
+def test_slow_subscriber_is_dropped_and_resumes_from_history():
+    hub = NewsHub(max_pending=2)
+
+    async def scenario():
+        subscription = hub.subscribe()
+        hub.publish(make_articles(1, 2, 3))
+        received = await subscription.next_events(timeout=0)
+        resumed = hub.subscribe(last_event_id=received[-1].id)
+        return subscription.overflowed, hub.subscriber_count, received, await resumed.next_events(timeout=0)
+
+    overflowed, subscribers, received, resumed = asyncio.run(scenario())
+
+    assert overflowed
+    assert subscribers == 1
+    assert [event.article_id for event in received] == ["article-1", "article-2"]
+    assert [event.article_id for event in resumed] == ["article-3"]
+
+
+def test_websocket_resumes_after_last_event_id():
+    news_routes.news_hub.publish(make_articles(31, 32, 33))
+    first, second, third = list(news_routes.news_hub._history)[-3:]
+    app = FastAPI()
+    app.include_router(news_routes.router)
+
+    with TestClient(app).websocket_connect(f"/news/stream/ws?last_event_id={first.id}") as websocket:
+        messages = [json.loads(websocket.receive_text()) for _ in range(2)]
+
+    assert [(message["type"], message["id"]) for message in messages] == [("breaking", second.id), ("breaking", third.id)]
+    assert messages[0]["article"]["id"] == "article-32"
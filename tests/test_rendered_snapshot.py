@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import news_routes
+
+
+def make_snapshot_value(*titles):
+    return {
+        "articles": [
+            {'id': str(index), 'title': title, 'description': "", 'source': "المصدر", 'category': "سياسة",
+             'is_breaking': True, 'published_at': datetime(2024, 5, 1, 12, index)}
+            for index, title in enumerate(titles)
+        ],
+        "sources_status": {"المصدر": "fresh"},
+    }
+
+
+def test_snapshot_body_is_rendered_once_and_replaced_with_the_snapshot(monkeypatch):
+    renders = []
+    render = news_routes.render_breaking_news
+    monkeypatch.setattr(
+        news_routes, "render_breaking_news", lambda snapshot, group=None: renders.append(group) or render(snapshot, group)
+    )
+    app = FastAPI()
+    app.include_router(news_routes.router)
+    client = TestClient(app)
+
+    news_routes.breaking_cache.put(make_snapshot_value("جلسة للحكومة", "ارتفاع الأسعار"))
+    first = client.get("/news/breaking")
+    second = client.get("/news/breaking")
+    not_modified = client.get("/news/breaking", headers={"If-None-Match": first.headers["etag"]})
+    client.get("/news/breaking?group=stories")
+
+    assert first.status_code == second.status_code == 200
+    assert second.content == first.content
+    assert not_modified.status_code == 304
+    assert [article['title'] for article in first.json()["breaking_news"]] == ["جلسة للحكومة", "ارتفاع الأسعار"]
+    # صيغة واحدة لكل لقطة تُبنى مرة واحدة مهما كان عدد الطلبات
+    assert renders == [None, "stories"]
+
+    news_routes.breaking_cache.put(make_snapshot_value("جلسة للحكومة"))
+    updated = client.get("/news/breaking")
+
+    assert updated.headers["etag"] != first.headers["etag"]
+    assert updated.json()["count"] == 1
+    assert renders == [None, "stories", None]
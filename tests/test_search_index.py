@@ -0,0 +1,99 @@
+import random
+
+from services.search_index import SearchIndex, tokenize, token_variants
+
+CATEGORIES = ["سياسة", "اقتصاد", "أمن"]
+
+
+def make_article(index, published_ts=None, **fields):
+    article = {
+        'id': f"article-{index:03d}",
+        'title': f"عنوان الخبر {index}",
+        'description': "وصف",
+        'source': "المصدر",
+        'published_ts': 1_700_000_000 + index if published_ts is None else published_ts,
+        'category': CATEGORIES[index % len(CATEGORIES)],
+        'is_breaking': index % 2 == 0,
+    }
+    article.update(fields)
+    return article
+
+
+def naive_listing(articles, category=None, breaking_only=False):
+    latest = {article['id']: article for article in articles}
+    matches = [
+        article for article in latest.values()
+        if (not category or article['category'] == category) and (not breaking_only or article['is_breaking'])
+    ]
+    return [article['id'] for article in sorted(matches, key=lambda article: (article['published_ts'], article['id']), reverse=True)]
+
+
+def ids(records):
+    return [record.id for record in records]
+
+
+def test_listing_without_query_matches_a_full_sort():
+    rng = random.Random(7)
+    articles = [make_article(index, published_ts=rng.randrange(1000)) for index in range(200)]
+    # تحديثات: وقت نشر وتصنيف مختلفان لنفس المعرف
+    articles += [make_article(index, published_ts=rng.randrange(1000), category="أمن") for index in range(0, 200, 7)]
+    index = SearchIndex()
+    for start in range(0, len(articles), 37):
+        index.add_articles(articles[start:start + 37])
+
+    for category in (None, "أمن", "اقتصاد"):
+        for breaking_only in (False, True):
+            expected = naive_listing(articles, category, breaking_only)
+            for offset in (0, 5, len(expected) - 3):
+                total, page = index.search(category=category, breaking_only=breaking_only, offset=offset, limit=10)
+                assert total == len(expected)
+                assert ids(page) == expected[offset:offset + 10]
+
+
+def test_listing_follows_evictions():
+    index = SearchIndex(max_documents=5)
+    index.add_articles([make_article(number) for number in range(8)])
+
+    total, page = index.search(limit=10)
+
+    assert total == 5
+    assert ids(page) == [f"article-{number:03d}" for number in (7, 6, 5, 4, 3)]
+
+
+def test_query_requires_every_word_and_ranks_titles_first():
+    index = SearchIndex()
+    index.add_articles([
+        make_article(1, title="انفجار في مرفأ بيروت", description="تفاصيل"),
+        make_article(2, title="أخبار اليوم", description="انفجار قرب مرفأ بيروت"),
+        make_article(3, title="انفجار في صيدا", description="تفاصيل"),
+    ])
+
+    total, page = index.search("انفجار بيروت")
+
+    assert total == 2
+    assert ids(page) == ["article-001", "article-002"]
+
+
+def test_query_matches_words_with_attached_prefixes():
+    index = SearchIndex()
+    index.add_articles([make_article(1, title="الحكومة تجتمع"), make_article(2, title="بالحكومة ثقة جديدة")])
+
+    assert index.search("حكومة")[0] == 2
+    assert "حكومه" in token_variants(tokenize("بالحكومة")[0])
+
+
+def test_changed_text_is_reindexed():
+    index = SearchIndex()
+    index.add_articles([make_article(1, title="زلزال في تركيا")])
+    index.add_articles([make_article(1, title="فيضانات في تركيا")])
+
+    assert index.search("زلزال")[0] == 0
+    assert ids(index.search("فيضانات")[1]) == ["article-001"]
+    assert len(index) == 1
+
+
+def test_placeholders_are_not_indexed():
+    index = SearchIndex()
+    index.add_articles([make_article(1, is_placeholder=True)])
+
+    assert index.search() == (0, [])
@@ -0,0 +1,75 @@
+from services.seen_entries import ParsedEntry, SeenEntries
+
+
+def article(key, title):
+    return {'id': key, 'title': title}
+
+
+def test_unchanged_entries_reuse_the_stored_articles():
+    seen = SeenEntries("test")
+    seen.merge("المصدر", [
+        ParsedEntry("a", "1", True, article("a", "أ")),
+        ParsedEntry("b", "1", True, article("b", "ب")),
+    ])
+
+    articles = seen.merge("المصدر", [
+        ParsedEntry("c", "1", True, article("c", "ج")),
+        ParsedEntry("a", "1", False, None),
+        ParsedEntry("b", "2", True, article("b", "ب معدل")),
+    ])
+
+    assert [item['title'] for item in articles] == ["ج", "أ", "ب معدل"]
+    assert seen.digests("المصدر") == {"c": "1", "a": "1", "b": "2"}
+    assert seen.last_cycle("المصدر")["processed"] == 2
+    assert seen.last_cycle("المصدر")["skipped"] == 1
+
+
+def test_excluded_entries_are_remembered_without_articles():
+    seen = SeenEntries("test")
+    seen.merge("المصدر", [ParsedEntry("a", "1", True, None)])
+
+    articles = seen.merge("المصدر", [ParsedEntry("a", "1", False, None)])
+
+    assert articles == []
+    assert seen.digests("المصدر") == {"a": "1"}
+
+
+def test_entries_missing_from_the_feed_are_dropped():
+    seen = SeenEntries("test")
+    seen.merge("المصدر", [ParsedEntry("a", "1", True, article("a", "أ"))])
+    seen.merge("المصدر", [ParsedEntry("b", "1", True, article("b", "ب"))])
+
+    assert seen.digests("المصدر") == {"b": "1"}
+
+
+def test_unknown_unchanged_entries_are_skipped():
+    # المصدر نُسي أثناء التحليل: المدخل يُعالج في الجلب التالي
+    seen = SeenEntries("test")
+    seen.merge("المصدر", [ParsedEntry("a", "1", True, article("a", "أ"))])
+    seen.forget("المصدر")
+
+    assert seen.merge("المصدر", [ParsedEntry("a", "1", False, None)]) == []
+    assert seen.digests("المصدر") == {}
+
+
+def test_returned_articles_are_copies():
+    seen = SeenEntries("test")
+    first = seen.merge("المصدر", [ParsedEntry("a", "1", True, article("a", "أ"))])
+    first[0]['created_at'] = "changed"
+
+    second = seen.merge("المصدر", [ParsedEntry("a", "1", False, None)])
+
+    assert 'created_at' not in second[0]
+
+
+def test_restore_keeps_newer_entries():
+    seen = SeenEntries("test")
+    seen.merge("المصدر", [ParsedEntry("a", "2", True, article("a", "أ معدل"))])
+
+    seen.restore({
+        "المصدر": {"a": ("1", article("a", "أ"))},
+        "مصدر آخر": {"b": ("1", article("b", "ب"))},
+    })
+
+    assert seen.digests("المصدر") == {"a": "2"}
+    assert seen.digests("مصدر آخر") == {"b": "1"}
@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from services.snapshot_cache import SnapshotCache
+
+
+class CountingLoader:
+    """مصدر بيانات يعدّ مرات الجلب ويتوقف حتى يُسمح له بالانتهاء"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.fail = False
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return self.calls
+
+
+def age(cache, seconds):
+    cache.snapshot._fetched_monotonic -= seconds
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        loader = CountingLoader()
+        cache = SnapshotCache(loader, ttl=60, stale_ttl=300)
+        requests = [asyncio.create_task(cache.get()) for _ in range(20)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        snapshots = await asyncio.gather(*requests)
+        return loader.calls, {snapshot.value for snapshot in snapshots}
+
+    assert asyncio.run(scenario()) == (1, {1})
+
+
+def test_fresh_snapshot_is_served_without_loading():
+    async def scenario():
+        loader = CountingLoader()
+        loader.release.set()
+        cache = SnapshotCache(loader, ttl=60, stale_ttl=300)
+        first = await cache.get()
+        second = await cache.get()
+        return loader.calls, first is second
+
+    assert asyncio.run(scenario()) == (1, True)
+
+
+def test_stale_snapshot_is_served_while_one_refresh_runs():
+    async def scenario():
+        loader = CountingLoader()
+        loader.release.set()
+        cache = SnapshotCache(loader, ttl=60, stale_ttl=300)
+        first = await cache.get()
+        age(cache, 120)
+
+        loader.release.clear()
+        stale = await asyncio.gather(*(cache.get() for _ in range(5)))
+        await asyncio.sleep(0)
+        calls_while_refreshing = loader.calls
+        loader.release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return first, stale, calls_while_refreshing, cache.snapshot.value
+
+    first, stale, calls_while_refreshing, refreshed = asyncio.run(scenario())
+
+    assert all(snapshot is first for snapshot in stale)
+    assert calls_while_refreshing == 2
+    assert refreshed == 2
+
+
+def test_expired_snapshot_waits_for_a_new_load():
+    async def scenario():
+        loader = CountingLoader()
+        loader.release.set()
+        cache = SnapshotCache(loader, ttl=60, stale_ttl=300)
+        await cache.get()
+        age(cache, 400)
+        return (await cache.get()).value
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_failed_refresh_keeps_serving_the_last_snapshot():
+    async def scenario():
+        loader = CountingLoader()
+        loader.release.set()
+        cache = SnapshotCache(loader, ttl=60, stale_ttl=300)
+        first = await cache.get()
+        loader.fail = True
+        return first, await cache.refresh()
+
+    first, refreshed = asyncio.run(scenario())
+
+    assert refreshed is first
+
+
+def test_first_load_failure_is_raised():
+    async def scenario():
+        loader = CountingLoader()
+        loader.release.set()
+        loader.fail = True
+        await SnapshotCache(loader).get()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scenario())
+
+
+def test_put_keeps_the_data_time():
+    cache = SnapshotCache(CountingLoader())
+    fetched_at = datetime(2024, 5, 1, 12, 0)
+
+    assert cache.put("restored", fetched_at=fetched_at).fetched_at == fetched_at
+    assert cache.put("fresh").fetched_at > fetched_at
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import pickle
+from datetime import datetime
+
+from services.snapshot_file import SnapshotFile
+
+SAVED = {
+    "sources": {"المصدر": {"articles": [{'id': "1", 'published_at': datetime(2024, 5, 1, 12, 0)}]}},
+    "validators": {"https://example.com/rss": ('"etag"', None, 1200, [])},
+}
+
+
+class Section:
+    def __init__(self, state=None):
+        self.state = state
+        self.version = 0
+        self.restored = []
+
+    def register(self, snapshot_file, name="breaking"):
+        snapshot_file.register(
+            name, lambda: self.state, lambda state, elapsed: self.restored.append(state), lambda: self.version
+        )
+
+
+def test_sections_round_trip_with_dates(tmp_path):
+    path = tmp_path / "snapshot.json"
+    writer = SnapshotFile(path)
+    Section(SAVED).register(writer)
+    assert asyncio.run(writer.save())
+    # بدون تغيير في البيانات لا يُعاد الحفظ
+    assert not asyncio.run(writer.save())
+
+    reader, section = SnapshotFile(path), Section()
+    section.register(reader)
+
+    assert reader.load() == ["breaking"]
+    [state] = section.restored
+    assert state["sources"] == SAVED["sources"]
+    # الصفوف تُستعاد قوائم
+    assert state["validators"] == {"https://example.com/rss": ['"etag"', None, 1200, []]}
+    assert os.stat(path).st_mode & 0o777 == 0o600
+
+
+def test_pickle_symlinked_and_shared_files_are_not_loaded(tmp_path):
+    saved = tmp_path / "saved.json"
+    writer = SnapshotFile(saved)
+    Section(SAVED).register(writer)
+    asyncio.run(writer.save())
+
+    class Exploit:
+        def __reduce__(self):
+            return (print, ("executed",))
+
+    pickled = tmp_path / "pickled.json"
+    pickled.write_bytes(pickle.dumps({"saved_at": 0, "sections": {"breaking": Exploit()}}))
+    linked = tmp_path / "linked.json"
+    linked.symlink_to(saved)
+    shared = tmp_path / "shared.json"
+    shared.write_bytes(saved.read_bytes())
+    os.chmod(shared, 0o666)
+
+    for path in (pickled, linked, shared):
+        reader, section = SnapshotFile(path), Section()
+        section.register(reader)
+        assert reader.load() == [], path
+        assert section.restored == [], path
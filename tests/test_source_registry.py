@@ -0,0 +1,58 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from services.source_registry import SourceConfigError, SourceLoader, SourceRegistry
+
+
+def write_sources(path, breaking, mtime):
+    path.write_text(json.dumps({"breaking": breaking}, ensure_ascii=False), encoding="utf-8")
+    # وقت تعديل صريح حتى لا تتطابق كتابتان في نفس اللحظة
+    os.utime(path, (mtime, mtime))
+
+
+def source(name, **fields):
+    return {"name": name, "url": f"https://example.com/{len(name)}", **fields}
+
+
+def test_reload_applies_changes_and_reports_them(tmp_path):
+    path = tmp_path / "sources.json"
+    write_sources(path, [source("أ"), source("بب")], 1000)
+    loader = SourceLoader(path)
+    registry = loader.registry("breaking")
+    changes = []
+    registry.add_listener(lambda added, removed, changed: changes.append((added, removed, changed)))
+    unchanged = registry.get("أ")
+
+    write_sources(path, [source("أ"), source("بب", poll_interval=30), source("ججج")], 2000)
+    counts = asyncio.run(loader.reload())
+
+    assert counts == {"breaking": 3}
+    assert changes == [(["ججج"], [], ["بب"])]
+    assert registry.get("بب")["poll_interval"] == 30
+    # المصادر التي لم تتغير تبقى نفس الكائنات
+    assert registry.get("أ") is unchanged
+
+
+def test_invalid_file_keeps_the_current_sources(tmp_path):
+    path = tmp_path / "sources.json"
+    write_sources(path, [source("أ")], 1000)
+    loader = SourceLoader(path)
+    registry = loader.registry("breaking")
+
+    write_sources(path, [source("أ"), {"name": "بب", "url": "ftp://example.com"}], 2000)
+    asyncio.run(loader.reload())
+
+    assert registry.names() == ["أ"]
+    assert "missing or invalid url" in loader.last_error
+
+
+def test_duplicate_slugs_are_rejected_without_changes():
+    registry = SourceRegistry("breaking")
+    registry.replace([source("أ")])
+
+    with pytest.raises(SourceConfigError):
+        registry.replace([source("News"), {"name": "news", "url": "https://example.com/other"}])
+    assert registry.names() == ["أ"]
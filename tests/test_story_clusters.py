@@ -0,0 +1,64 @@
+from services.story_clusters import StoryClusterer, story_shingles
+
+# نص ثابت تكرره بعض المصادر في وصف كل مقالاتها
+BOILERPLATE = "تفاصيل إضافية عن الحكومة والاقتصاد والأمن في لبنان والمنطقة. " * 6
+
+
+def make_articles(titles, description=BOILERPLATE):
+    return [
+        {'id': str(index), 'title': title, 'description': description, 'source': f"مصدر {index}"}
+        for index, title in enumerate(titles)
+    ]
+
+
+def story_titles(stories):
+    return [[article['title'] for article in story['articles']] for story in stories]
+
+
+def test_shared_description_does_not_merge_distinct_headlines():
+    articles = make_articles([
+        "ارتفاع أسعار الذهب",
+        "ارتفاع أسعار الخبز في لبنان",
+        "ارتفاع أسعار الذهب عالمياً",
+        "رئيس الحكومة يلتقي وزير الخارجية الفرنسي في بيروت",
+        "رئيس الحكومة يلتقي وزير الخارجية الفرنسي",
+    ])
+
+    assert story_titles(StoryClusterer().cluster(articles)) == [
+        ["ارتفاع أسعار الذهب", "ارتفاع أسعار الذهب عالمياً"],
+        ["ارتفاع أسعار الخبز في لبنان"],
+        ["رئيس الحكومة يلتقي وزير الخارجية الفرنسي في بيروت", "رئيس الحكومة يلتقي وزير الخارجية الفرنسي"],
+    ]
+
+
+def test_stories_do_not_chain_through_intermediate_headlines():
+    # كل عنوان يشبه جاره فقط؛ الربط بأي عضو كان سيجمعها في قصة واحدة
+    articles = make_articles([
+        "انقطاع الكهرباء في بيروت بسبب أزمة الوقود",
+        "انقطاع الكهرباء في طرابلس بسبب أزمة الوقود",
+        "انقطاع المياه في طرابلس بسبب أزمة الوقود",
+        "انقطاع المياه في طرابلس بسبب أعطال الشبكة",
+        "انقطاع المياه في صيدا بسبب أعطال الشبكة",
+    ], description="")
+
+    story_of = {
+        title: index for index, titles in enumerate(story_titles(StoryClusterer().cluster(articles))) for title in titles
+    }
+
+    assert story_of["انقطاع الكهرباء في بيروت بسبب أزمة الوقود"] != story_of["انقطاع المياه في صيدا بسبب أعطال الشبكة"]
+
+
+def test_description_is_used_when_title_has_no_words():
+    assert story_shingles("عاجل", "زلزال يضرب جنوب تركيا") == story_shingles("", "زلزال يضرب جنوب تركيا")
+    assert story_shingles("عاجل", "زلزال يضرب جنوب تركيا")
+
+
+def test_edited_headline_gets_a_new_signature():
+    clusterer = StoryClusterer()
+    articles = make_articles(["ارتفاع أسعار الذهب", "انقطاع الكهرباء في بيروت"], description="")
+    assert len(clusterer.cluster(articles)) == 2
+
+    # المصدر عدّل العنوان مع بقاء المعرف نفسه
+    articles[1]['title'] = "ارتفاع أسعار الذهب عالمياً"
+
+    assert story_titles(clusterer.cluster(articles)) == [["ارتفاع أسعار الذهب", "ارتفاع أسعار الذهب عالمياً"]]
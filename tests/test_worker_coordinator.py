@@ -0,0 +1,132 @@
+import asyncio
+import os
+from datetime import datetime
+
+import pytest
+
+from services.circuit_breaker import CircuitBreakers
+from services.feed_scheduler import FeedScheduler
+from services.feed_store import FeedStore
+from services.news_hub import NewsHub
+from services.source_registry import SourceRegistry
+from services.worker_coordinator import SharedFeed, WorkerCoordinator
+
+
+class Worker:
+    """عامل واحد: جدولة ومخزن وموزع أحداث كما في news_routes"""
+
+    def __init__(self, directory):
+        self.fetched = []
+        self.failing = set()
+        self.breakers = CircuitBreakers(failure_threshold=1)
+        sources = SourceRegistry("test")
+        sources.replace([{"name": "أ", "url": "https://example.com/a"}, {"name": "ب", "url": "https://example.com/b"}])
+        store = FeedStore()
+        self.hub = NewsHub()
+        store.add_listener(lambda source_name, articles: self.hub.publish(articles))
+        self.scheduler = FeedScheduler(
+            "test", sources, lambda source: self.breakers.call(source["name"], self.fetch, source), store, interval=1000
+        )
+        self.coordinator = WorkerCoordinator([self.scheduler], directory, interval=0.02)
+        self.coordinator.share(self.scheduler, "news_hub", self.hub.export_ids, self.hub.adopt_ids)
+        self.coordinator.share(self.scheduler, "breakers", self.breakers.export, self.breakers.apply)
+
+    async def fetch(self, source):
+        self.fetched.append(source["name"])
+        if source["name"] in self.failing:
+            raise OSError("connection refused")
+        number = len(self.fetched)
+        return [{
+            'id': f"{source['name']}-{number}", 'title': "عاجل", 'is_breaking': True,
+            'published_at': datetime(2024, 5, 1, 12, 0, number),
+        }]
+
+    def event_ids(self):
+        return [(event.article_id, event.id) for event in self.hub._history]
+
+
+async def run_workers(directory, scenario):
+    leader, follower = Worker(directory), Worker(directory)
+    await leader.coordinator.start()
+    await follower.coordinator.start()
+    try:
+        await asyncio.sleep(0.2)
+        return await scenario(leader, follower)
+    finally:
+        for worker in (follower, leader):
+            await worker.coordinator.stop()
+            await worker.scheduler.stop()
+
+
+def test_follower_reuses_the_leader_event_ids(tmp_path):
+    async def scenario(leader, follower):
+        return leader.coordinator.is_leader, follower.coordinator.is_leader, leader.event_ids(), follower.event_ids()
+
+    leader_elected, follower_elected, leader_ids, follower_ids = asyncio.run(run_workers(tmp_path / "shared", scenario))
+
+    assert (leader_elected, follower_elected) == (True, False)
+    assert len(leader_ids) == 2
+    assert follower_ids == leader_ids
+
+
+def test_follower_refresh_is_run_by_the_leader(tmp_path):
+    async def scenario(leader, follower):
+        fetched_before = len(leader.fetched)
+        assert follower.scheduler.bump("ب")
+        await asyncio.sleep(0.2)
+        return leader.fetched[fetched_before:], follower.fetched, follower.event_ids(), leader.event_ids()
+
+    leader_fetched, follower_fetched, follower_ids, leader_ids = asyncio.run(run_workers(tmp_path / "shared", scenario))
+
+    assert leader_fetched == ["ب"]
+    assert follower_fetched == []
+    assert follower_ids == leader_ids
+    assert list(tmp_path.joinpath("shared").glob("*.bump.*")) == []
+
+
+def test_shared_directory_writable_by_others_is_refused(tmp_path):
+    directory = tmp_path / "shared"
+    directory.mkdir()
+    os.chmod(directory, 0o777)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(WorkerCoordinator([], directory).start())
+
+
+def test_follower_mirrors_articles_and_circuit_breakers(tmp_path):
+    async def scenario(leader, follower):
+        leader.failing.add("ب")
+        leader.scheduler.bump("ب")
+        await asyncio.sleep(0.2)
+        return (
+            follower.scheduler.store.articles_by_source(["أ"]), leader.scheduler.store.articles_by_source(["أ"]),
+            follower.breakers.health(["ب"])["ب"], leader.breakers.health(["ب"])["ب"],
+        )
+
+    follower_articles, leader_articles, follower_health, leader_health = asyncio.run(
+        run_workers(tmp_path / "shared", scenario)
+    )
+
+    assert follower_articles == leader_articles
+    assert isinstance(follower_articles["أ"][0]['published_at'], datetime)
+    assert follower_health["state"] == leader_health["state"] == "open"
+    assert follower_health["last_error"] == "connection refused"
+    assert 0 < follower_health["retry_after"] <= leader_health["retry_after"] + 1
+
+
+def test_shared_files_that_are_symlinks_or_writable_by_others_are_refused(tmp_path):
+    async def publish_and_sync(path, tamper):
+        leader = Worker(tmp_path / "unused")
+        await leader.scheduler.poll("أ")
+        await SharedFeed(path, leader.scheduler).publish()
+        tamper(path)
+        return await SharedFeed(path, Worker(tmp_path / "unused").scheduler).sync()
+
+    def symlink(path):
+        target = path.with_name("elsewhere.json")
+        path.rename(target)
+        path.symlink_to(target)
+
+    for name, tamper in (("symlink.json", symlink), ("shared.json", lambda path: os.chmod(path, 0o666))):
+        with pytest.raises(PermissionError):
+            asyncio.run(publish_and_sync(tmp_path / name, tamper))